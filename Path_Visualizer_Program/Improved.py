@@ -1,9 +1,24 @@
+import time
+STARTUP_TIME = time.perf_counter()
+
+import argparse
+import os
+import sys
 import pygame
 import math
 import random
-import time
 from queue import PriorityQueue, Queue, LifoQueue
 
+# Modules shared by both visualizers live in the top-level shared/ directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from fonts import LazyFont
+from instrumentation import Hooks, ChromeTraceListener, IdleMeter
+from landmarks import LandmarkCache, snapshot
+from strokes import BRUSH_SIZES, TOOLS, Stroke
+
 # Initialize pygame
 pygame.init()
 
@@ -28,9 +43,14 @@ TURQUOISE = (64, 224, 208)
 PINK = (255, 192, 203)
 LIGHT_GREY = (200, 200, 200)
 
-# Fonts
-FONT = pygame.font.SysFont('Arial', 16)
-LARGE_FONT = pygame.font.SysFont('Arial', 20)
+# Hook points fired by the search algorithms (see shared/instrumentation.py)
+SEARCH_HOOKS = ("on_push", "on_pop", "on_expand", "on_relax")
+
+IDLE_TIMEOUT = 500  # Milliseconds the main loop sleeps waiting for input before checking again
+
+# Fonts - resolved through an on-disk cache and loaded on first render
+FONT = LazyFont('Arial', 16)
+LARGE_FONT = LazyFont('Arial', 20)
 
 class Button:
     """Button class for UI elements"""
@@ -62,11 +82,13 @@ class Button:
         return False
     
     def update(self, pos):
-        """Update button appearance based on mouse position"""
+        """Update button appearance based on mouse position, returning whether it changed"""
+        previous = self.current_color
         if self.is_over(pos):
             self.current_color = self.hover_color
         else:
             self.current_color = self.color
+        return self.current_color != previous
             
     def handle_event(self, event, pos):
         """Handle mouse events on the button"""
@@ -229,6 +251,17 @@ class PathfindingVisualizer:
         self.execution_time = 0
         self.visualization_speed = 25  # Milliseconds between frames
         self.maze_density = 0.65  # Controls how many walls are created (lower = fewer walls)
+        self.maze_delay = 2  # Milliseconds to pause after drawing each maze wall
+        self.hooks = Hooks(*SEARCH_HOOKS)
+        self.use_alt = False  # A* with ALT landmark heuristic instead of plain distance
+        self.landmarks = LandmarkCache(k=8)
+        self.alt_report = None  # (expansions with plain heuristic, expansions with ALT)
+        self.idle = IdleMeter()  # CPU used while the main loop waits for input
+        self.tool = TOOLS[0]  # Painting tool of left (paint) and right (erase) drags
+        self.brush = 0  # Index into BRUSH_SIZES
+        self.stroke = None  # Drag in progress, if any
+        self.edits = {}  # (row, col) -> True to paint a barrier, False to erase; applied once per frame
+        self.edited = False  # Barriers changed since the landmark tables were last prefetched
         
         # Create the buttons - increased width and adjusted spacing
         button_width = UI_WIDTH - 20  # Wider buttons
@@ -281,13 +314,13 @@ class PathfindingVisualizer:
         # Draw current algorithm and settings
         # Create a box for metrics - INCREASED HEIGHT FOR TEXT
         metrics_y = 50 + 8*45  # Position after all buttons
-        metrics_height = 180  # Increased from 150 to 180
+        metrics_height = 190
         pygame.draw.rect(self.win, LIGHT_GREY, 
                         (self.grid_width + 10, metrics_y, self.ui_width - 20, metrics_height), 0, 5)
         
         # Current algorithm info - INCREASED LINE SPACING
         padding = 15  # Increased left padding
-        line_height = 30  # Increased from 25 to 30
+        line_height = 20
         
         y_offset = metrics_y + 10
         curr_algo = FONT.render(f"Current Algorithm: {self.algorithm}", True, BLACK)
@@ -302,6 +335,17 @@ class PathfindingVisualizer:
         density = FONT.render(f"Maze Density: {int(self.maze_density * 100)}%", True, BLACK)
         self.win.blit(density, (self.grid_width + padding, y_offset))
         
+        y_offset += line_height
+        heuristic_name = "ALT landmarks" if self.use_alt else ("Chebyshev" if self.allow_diagonal else "Manhattan")
+        heuristic = FONT.render(f"A* Heuristic: {heuristic_name}", True, BLACK)
+        self.win.blit(heuristic, (self.grid_width + padding, y_offset))
+        
+        y_offset += line_height
+        size = BRUSH_SIZES[self.brush]
+        tool_name = self.tool if self.tool == "Rectangle" else f"{self.tool} {size}x{size}"
+        tool = FONT.render(f"Paint Tool: {tool_name}", True, BLACK)
+        self.win.blit(tool, (self.grid_width + padding, y_offset))
+        
         # Performance metrics
         if self.path_found:
             metrics = [
@@ -309,6 +353,9 @@ class PathfindingVisualizer:
                 f"Path Length: {self.path_length}",
                 f"Execution Time: {self.execution_time:.4f} s"
             ]
+            if self.alt_report:
+                plain, alt = self.alt_report
+                metrics.append(f"ALT Expanded: {alt} (saved {plain - alt})")
             for metric in metrics:
                 y_offset += line_height
                 text = FONT.render(metric, True, BLACK)
@@ -316,16 +363,18 @@ class PathfindingVisualizer:
                 
         # Instructions
         instr_y = metrics_y + metrics_height + 10
-        instr_height = 160  # Increased height for instructions
+        instr_height = 175  # Increased height for instructions
         pygame.draw.rect(self.win, LIGHT_GREY, 
                         (self.grid_width + 10, instr_y, self.ui_width - 20, instr_height), 0, 5)
                         
         instructions = [
-            "Left Click: Place start/end/barriers",
-            "Right Click: Remove spot",
+            "Left Drag: Place start/end/barriers",
+            "Right Drag: Erase",
+            "T / [ ]: Paint tool / brush size",
             "Space: Run algorithm",
             "C: Clear the grid",
-            "+/-: Adjust maze density"
+            "+/-: Adjust maze density",
+            "L: Toggle ALT heuristic for A*"
         ]
         
         # Draw instruction title
@@ -335,7 +384,7 @@ class PathfindingVisualizer:
         # Draw instructions with more spacing
         for i, instr in enumerate(instructions):
             text = FONT.render(instr, True, BLACK)
-            self.win.blit(text, (self.grid_width + padding, instr_y + 35 + i * 25))
+            self.win.blit(text, (self.grid_width + padding, instr_y + 35 + i * 20))
             
     def draw(self):
         """Draw the entire application window"""
@@ -346,14 +395,64 @@ class PathfindingVisualizer:
             for spot in row:
                 spot.draw(self.win)
                 
+        # Cells a line or rectangle drag will cover when released
+        if self.stroke is not None:
+            color = GREY if self.stroke.paint else LIGHT_GREY
+            for row, col in self.stroke.shape():
+                spot = self.grid[row][col]
+                pygame.draw.rect(self.win, color, (spot.x, spot.y, spot.size, spot.size))
+                
         self.draw_grid_lines()
         self.draw_ui()
         pygame.display.update()
         
+    def draw_spots(self, spots):
+        """Redraw only the given spots, with the grid lines along their top and left edges"""
+        rects = []
+        for spot in spots:
+            spot.draw(self.win)
+            pygame.draw.line(self.win, GREY, (spot.x, spot.y), (spot.x + spot.size - 1, spot.y))
+            pygame.draw.line(self.win, GREY, (spot.x, spot.y), (spot.x, spot.y + spot.size - 1))
+            rects.append((spot.x, spot.y, spot.size, spot.size))
+        pygame.display.update(rects)
+        
+    def grid_cell(self, pos):
+        """Grid position under pos, clamped to the grid so a drag can leave it"""
+        gap = self.grid_width // self.rows
+        last = self.rows - 1
+        return min(max(pos[0] // gap, 0), last), min(max(pos[1] // gap, 0), last)
+        
+    def queue_edits(self, cells, paint):
+        """Queue barriers to paint (or erase) on cells, for the next apply_edits()"""
+        self.edits.update(dict.fromkeys(cells, paint))
+        
+    def apply_edits(self):
+        """Apply the edits queued this frame as one batch and return the spots that changed"""
+        changed = []
+        for (row, col), paint in self.edits.items():
+            spot = self.grid[row][col]
+            if paint:
+                if spot.is_barrier() or spot == self.start or spot == self.end:
+                    continue
+                spot.make_barrier()
+            else:
+                if spot.color == WHITE:
+                    continue
+                spot.reset()
+                if spot == self.start:
+                    self.start = None
+                elif spot == self.end:
+                    self.end = None
+            changed.append(spot)
+        self.edits.clear()
+        return changed
+        
     def get_clicked_pos(self, pos):
         """Convert mouse position to grid position"""
         if pos[0] >= self.grid_width:  # Click is in UI area
             return None, None
+        if pos[1] >= self.grid_width:  # Click is below the last row
+            return None, None
             
         gap = self.grid_width // self.rows
         x, y = pos
@@ -405,15 +504,38 @@ class PathfindingVisualizer:
             # Manhattan distance for 4-connectivity
             return abs(x1 - x2) + abs(y1 - y2)
             
+    def landmark_tables(self, wait=True):
+        """ALT tables for the current barrier layout (built in the background)"""
+        return self.landmarks.get(snapshot(self.grid), self.rows, self.allow_diagonal, wait)
+        
+    def prefetch_landmarks(self):
+        """Start building ALT tables for the current layout without waiting"""
+        if self.use_alt:
+            self.landmarks.prefetch(snapshot(self.grid), self.rows, self.allow_diagonal)
+        
+    def alt_heuristic(self):
+        """Heuristic with the same signature as heuristic() that adds the ALT bound"""
+        tables = self.landmark_tables()
+        row, col = self.end.get_pos()
+        alt = tables.heuristic(row * self.rows + col)
+        rows = self.rows
+        base = self.heuristic
+        return lambda p1, p2: max(base(p1, p2), alt(p1[0] * rows + p1[1]))
+        
     def astar(self):
         """Implement the A* algorithm"""
         self.nodes_visited = 0
         start_time = time.time()
         
+        on_push, on_pop, on_expand, on_relax = (self.hooks.on_push, self.hooks.on_pop,
+                                                self.hooks.on_expand, self.hooks.on_relax)
+        
         count = 0
         open_set = PriorityQueue()
         open_set.put((0, count, self.start))
         open_set_hash = {self.start}
+        if on_push:
+            on_push(self.start, 0)
         
         # Initialize distances
         g_score = {spot: float("inf") for row in self.grid for spot in row}
@@ -421,7 +543,8 @@ class PathfindingVisualizer:
         
         # Initialize estimated total cost
         f_score = {spot: float("inf") for row in self.grid for spot in row}
-        f_score[self.start] = self.heuristic(self.start.get_pos(), self.end.get_pos())
+        heuristic = self.alt_heuristic() if self.use_alt else self.heuristic
+        f_score[self.start] = heuristic(self.start.get_pos(), self.end.get_pos())
         
         while not open_set.empty():
             # Check for pygame events
@@ -433,6 +556,8 @@ class PathfindingVisualizer:
             # Get the node with lowest f_score
             current = open_set.get()[2]
             open_set_hash.remove(current)
+            if on_pop:
+                on_pop(current)
             
             # If we reached the end
             if current == self.end:
@@ -444,6 +569,8 @@ class PathfindingVisualizer:
                 return True
                 
             # Process neighbors
+            if on_expand:
+                on_expand(current)
             for neighbor in current.neighbors:
                 temp_g_score = g_score[current] + 1  # Assume uniform cost of 1
                 
@@ -451,12 +578,16 @@ class PathfindingVisualizer:
                 if temp_g_score < g_score[neighbor]:
                     neighbor.parent = current
                     g_score[neighbor] = temp_g_score
-                    f_score[neighbor] = temp_g_score + self.heuristic(neighbor.get_pos(), self.end.get_pos())
+                    f_score[neighbor] = temp_g_score + heuristic(neighbor.get_pos(), self.end.get_pos())
+                    if on_relax:
+                        on_relax(current, neighbor, temp_g_score)
                     
                     if neighbor not in open_set_hash:
                         count += 1
                         open_set.put((f_score[neighbor], count, neighbor))
                         open_set_hash.add(neighbor)
+                        if on_push:
+                            on_push(neighbor, f_score[neighbor])
                         neighbor.make_open()
                         self.nodes_visited += 1
                         
@@ -477,9 +608,14 @@ class PathfindingVisualizer:
         self.nodes_visited = 0
         start_time = time.time()
         
+        on_push, on_pop, on_expand, on_relax = (self.hooks.on_push, self.hooks.on_pop,
+                                                self.hooks.on_expand, self.hooks.on_relax)
+        
         # Initialize priority queue with start node
         pq = PriorityQueue()
         pq.put((0, 0, self.start))  # (distance, count, node)
+        if on_push:
+            on_push(self.start, 0)
         
         # Distance dictionary
         distances = {spot: float("inf") for row in self.grid for spot in row}
@@ -499,6 +635,8 @@ class PathfindingVisualizer:
             # Get the node with lowest distance
             current_distance, _, current = pq.get()
             in_queue.remove(current)
+            if on_pop:
+                on_pop(current)
             
             # If we reached the end
             if current == self.end:
@@ -510,6 +648,8 @@ class PathfindingVisualizer:
                 return True
                 
             # Process neighbors
+            if on_expand:
+                on_expand(current)
             for neighbor in current.neighbors:
                 distance = current_distance + 1  # Uniform cost of 1
                 
@@ -517,11 +657,15 @@ class PathfindingVisualizer:
                 if distance < distances[neighbor]:
                     neighbor.parent = current
                     distances[neighbor] = distance
+                    if on_relax:
+                        on_relax(current, neighbor, distance)
                     
                     if neighbor not in in_queue:
                         count += 1
                         pq.put((distance, count, neighbor))
                         in_queue.add(neighbor)
+                        if on_push:
+                            on_push(neighbor, distance)
                         neighbor.make_open()
                         self.nodes_visited += 1
                         
@@ -542,10 +686,15 @@ class PathfindingVisualizer:
         self.nodes_visited = 0
         start_time = time.time()
         
+        on_push, on_pop, on_expand, on_relax = (self.hooks.on_push, self.hooks.on_pop,
+                                                self.hooks.on_expand, self.hooks.on_relax)
+        
         # Initialize queue with start node
         queue = Queue()
         queue.put(self.start)
         visited = {self.start}
+        if on_push:
+            on_push(self.start, 0)
         
         while not queue.empty():
             # Check for pygame events
@@ -556,6 +705,8 @@ class PathfindingVisualizer:
                     
             # Get the next node
             current = queue.get()
+            if on_pop:
+                on_pop(current)
             
             # If we reached the end
             if current == self.end:
@@ -567,11 +718,17 @@ class PathfindingVisualizer:
                 return True
                 
             # Process neighbors
+            if on_expand:
+                on_expand(current)
             for neighbor in current.neighbors:
                 if neighbor not in visited:
                     neighbor.parent = current
+                    if on_relax:
+                        on_relax(current, neighbor, None)
                     visited.add(neighbor)
                     queue.put(neighbor)
+                    if on_push:
+                        on_push(neighbor, None)
                     neighbor.make_open()
                     self.nodes_visited += 1
                     
@@ -592,10 +749,15 @@ class PathfindingVisualizer:
         self.nodes_visited = 0
         start_time = time.time()
         
+        on_push, on_pop, on_expand, on_relax = (self.hooks.on_push, self.hooks.on_pop,
+                                                self.hooks.on_expand, self.hooks.on_relax)
+        
         # Initialize stack with start node
         stack = LifoQueue()
         stack.put(self.start)
         visited = {self.start}
+        if on_push:
+            on_push(self.start, 0)
         
         while not stack.empty():
             # Check for pygame events
@@ -606,6 +768,8 @@ class PathfindingVisualizer:
                     
             # Get the next node
             current = stack.get()
+            if on_pop:
+                on_pop(current)
             
             # If we reached the end
             if current == self.end:
@@ -617,11 +781,17 @@ class PathfindingVisualizer:
                 return True
                 
             # Process neighbors
+            if on_expand:
+                on_expand(current)
             for neighbor in current.neighbors:
                 if neighbor not in visited:
                     neighbor.parent = current
+                    if on_relax:
+                        on_relax(current, neighbor, None)
                     visited.add(neighbor)
                     stack.put(neighbor)
+                    if on_push:
+                        on_push(neighbor, None)
                     neighbor.make_open()
                     self.nodes_visited += 1
                     
@@ -710,7 +880,7 @@ class PathfindingVisualizer:
                             
                     # Draw and pause
                     self.draw()
-                    pygame.time.delay(2)
+                    pygame.time.delay(self.maze_delay)
                     
                 # Recursive calls for sub-sections
                 if width > 5:  # Only divide further if enough space
@@ -731,7 +901,7 @@ class PathfindingVisualizer:
                             
                     # Draw and pause
                     self.draw()
-                    pygame.time.delay(2)
+                    pygame.time.delay(self.maze_delay)
                     
                 # Recursive calls for sub-sections
                 if height > 5:  # Only divide further if enough space
@@ -758,6 +928,7 @@ class PathfindingVisualizer:
                         
         # Check and fix maze navigability
         self.ensure_navigable_maze()
+        self.prefetch_landmarks()
         
     def ensure_navigable_maze(self):
         """Make sure the maze has possible paths by removing some barriers if needed"""
@@ -825,8 +996,16 @@ class PathfindingVisualizer:
         self.update_neighbors()
         
         # Run the selected algorithm
+        self.alt_report = None
         if self.algorithm == "A*":
-            return self.astar()
+            found = self.astar()
+            if self.use_alt:
+                # Replay the query off-screen with both heuristics to show what ALT saved
+                tables = self.landmark_tables()
+                start_row, start_col = self.start.get_pos()
+                end_row, end_col = self.end.get_pos()
+                self.alt_report = tables.compare(start_row * self.rows + start_col, end_row * self.rows + end_col)
+            return found
         elif self.algorithm == "Dijkstra":
             return self.dijkstra()
         elif self.algorithm == "BFS":
@@ -838,12 +1017,25 @@ class PathfindingVisualizer:
         """Main loop for the visualizer"""
         self.running = True
         
+        # Report how long it took from process start to the first frame
+        self.draw()
+        print(f"Time to first frame: {(time.perf_counter() - STARTUP_TIME) * 1000:.1f} ms")
+        
+        dirty = False  # Whether the window shows an older state than the grid
         while self.running:
-            # Draw the current state
-            self.draw()
+            # Draw the current state, only after something changed
+            if dirty:
+                self.draw()
+                dirty = False
             
-            # Handle events
-            for event in pygame.event.get():
+            # Handle events, sleeping until the next one when none are waiting
+            events = pygame.event.get()
+            if not events:
+                with self.idle:
+                    events = [pygame.event.wait(IDLE_TIMEOUT)]
+            for event in events:
+                if event.type == pygame.NOEVENT:
+                    continue
                 if event.type == pygame.QUIT:
                     self.running = False
                     
@@ -851,8 +1043,15 @@ class PathfindingVisualizer:
                 pos = pygame.mouse.get_pos()
                 
                 # Update buttons
+                hover_changed = False
                 for button in self.buttons:
-                    button.update(pos)
+                    hover_changed |= button.update(pos)
+                    
+                # A plain mouse move only needs a redraw when it moves the hover or a shape's outline;
+                # brush strokes redraw just the cells they paint
+                shaping = self.stroke is not None and self.stroke.tool != "Brush"
+                if event.type != pygame.MOUSEMOTION or hover_changed or shaping:
+                    dirty = True
                     
                 # Handle mouse clicks
                 if pygame.mouse.get_pressed()[0]:  # Left click
@@ -877,30 +1076,30 @@ class PathfindingVisualizer:
                             elif i == 7:  # Start Algorithm
                                 self.run_algorithm()
                                 
-                    # Check if clicked on grid
-                    row, col = self.get_clicked_pos(pos)
+                # Paint on the grid: the first two left clicks place the start and end,
+                # then left drags paint barriers and right drags erase
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 3) and self.stroke is None:
+                    row, col = self.get_clicked_pos(event.pos)
                     if row is not None and col is not None:
                         spot = self.grid[row][col]
-                        # Place start, end or barrier
-                        if not self.start and spot != self.end:
+                        if event.button == 1 and not self.start and spot != self.end:
                             self.start = spot
                             self.start.make_start()
-                        elif not self.end and spot != self.start:
+                        elif event.button == 1 and not self.end and spot != self.start:
                             self.end = spot
                             self.end.make_end()
-                        elif spot != self.end and spot != self.start:
-                            spot.make_barrier()
-                            
-                elif pygame.mouse.get_pressed()[2]:  # Right click
-                    row, col = self.get_clicked_pos(pos)
-                    if row is not None and col is not None:
-                        spot = self.grid[row][col]
-                        spot.reset()
-                        if spot == self.start:
-                            self.start = None
-                        elif spot == self.end:
-                            self.end = None
-                            
+                        else:
+                            self.stroke = Stroke(self.tool, BRUSH_SIZES[self.brush], self.rows, (row, col),
+                                                 paint=event.button == 1)
+                            self.queue_edits(self.stroke.begin(), self.stroke.paint)
+                elif event.type == pygame.MOUSEMOTION and self.stroke is not None:
+                    self.queue_edits(self.stroke.move(self.grid_cell(event.pos)), self.stroke.paint)
+                elif (event.type == pygame.MOUSEBUTTONUP and self.stroke is not None
+                      and event.button == (1 if self.stroke.paint else 3)):
+                    self.queue_edits(self.stroke.move(self.grid_cell(event.pos)), self.stroke.paint)
+                    self.queue_edits(self.stroke.shape(), self.stroke.paint)
+                    self.stroke = None
+                    
                 # Keyboard shortcuts
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE and self.start and self.end:
@@ -918,6 +1117,23 @@ class PathfindingVisualizer:
                     if event.key == pygame.K_d:
                         # Toggle diagonal movement
                         self.allow_diagonal = not self.allow_diagonal
+                        self.prefetch_landmarks()
+                        
+                    if event.key == pygame.K_l:
+                        # Toggle the ALT landmark heuristic for A*
+                        self.use_alt = not self.use_alt
+                        self.prefetch_landmarks()
+                        
+                    if event.key == pygame.K_t:
+                        # Cycle the painting tool
+                        self.tool = TOOLS[(TOOLS.index(self.tool) + 1) % len(TOOLS)]
+                        
+                    # Adjust the brush size
+                    if event.key == pygame.K_LEFTBRACKET:
+                        self.brush = max(0, self.brush - 1)
+                        
+                    if event.key == pygame.K_RIGHTBRACKET:
+                        self.brush = min(len(BRUSH_SIZES) - 1, self.brush + 1)
                         
                     # Adjust maze density
                     if event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS or event.key == pygame.K_EQUALS:
@@ -926,13 +1142,36 @@ class PathfindingVisualizer:
                     if event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
                         self.maze_density = max(0.1, self.maze_density - 0.05)
                         
+            # Apply this frame's edits as one batch, drawing only their cells unless the window is redrawn anyway
+            changed = self.apply_edits()
+            if changed:
+                self.edited = True
+                if not dirty:
+                    self.draw_spots(changed)
+                    
+            # Landmark tables are only worth building for the layout a finished edit leaves
+            if self.edited and self.stroke is None:
+                self.prefetch_landmarks()
+                self.edited = False
+                
         pygame.quit()
 
 
 def main():
     """Main function to start the application"""
+    parser = argparse.ArgumentParser(description="Pathfinding Algorithm Visualizer")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record search hooks as Chrome trace-event JSON to FILE on exit")
+    args = parser.parse_args()
+    
     visualizer = PathfindingVisualizer(WIN, WIDTH)
+    if args.trace:
+        listener = visualizer.hooks.attach(ChromeTraceListener(SEARCH_HOOKS, "Pathfinding Visualizer"))
     visualizer.run()
+    print(visualizer.idle.report())
+    if args.trace:
+        listener.save(args.trace)
+        print(f"Trace written to {args.trace}")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import pygame
 import math
-from queue import PriorityQueue
+
+import search_engine
 
 Width = 700
 Win = pygame.display.set_mode((Width,Width))
@@ -83,56 +84,9 @@ def h(p1,p2):
     x2,y2 = p2
     return abs(x1-x2) + abs(y1-y2)
 
-def reconstruct_path(parent,curr,draw):
-    while curr in parent:
-        curr = parent[curr]
-        curr.make_path()
-        draw()
-
 def algorithm(draw,grid,start,end):
-    que = PriorityQueue()
-    que.put((0,start))
-    parent = {}
-    g_score = {spot: float("inf") for row in grid for spot in row}
-    g_score[start] = 0
-    f_score = {spot: float("inf") for row in grid for spot in row}
-    f_score[start] = h(start.get_pos(),end.get_pos())
-    open_set = {start}
-
-    while not que.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        curr = que.get()[1]
-        open_set.remove(curr)
-
-        if curr == end:
-            for row in grid:
-                for spot in row:
-                    if spot.is_open() or spot.is_closed():
-                        spot.color = White
-            reconstruct_path(parent,end,draw)
-            end.make_end()
-            return True
-        
-        for neighbor in curr.neighbors:
-            temp_g = g_score[curr]+1
-            if temp_g < g_score[neighbor]:
-                parent[neighbor] = curr
-                g_score[neighbor] = temp_g
-                f_score[neighbor] = temp_g + h(neighbor.get_pos(),end.get_pos())
-                if neighbor not in open_set:
-                    que.put((f_score[neighbor],neighbor))
-                    open_set.add(neighbor)
-                    neighbor.make_open()
-        draw()
-
-        if curr != start:
-            curr.make_closed()
-
-    return False
-        
+    return search_engine.run(draw,grid,start,end,lambda spot: h(spot.get_pos(),end.get_pos()))
+
 
 
 def make_grid(rows,width):
@@ -210,7 +164,8 @@ def main(win,width):
                             spot.update_neighbors(grid)
                             if spot.is_path():
                                 spot.color = White
-                    algorithm(lambda: draw(win,grid,Rows,width),grid,start,end)
+                    if algorithm(lambda: draw(win,grid,Rows,width),grid,start,end) is None:
+                        run = False
 
                 if event.key == pygame.K_c:
                     start = None
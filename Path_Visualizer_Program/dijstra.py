@@ -1,6 +1,7 @@
 import pygame
 import math
-from queue import PriorityQueue
+
+import search_engine
 
 Width = 700
 Win = pygame.display.set_mode((Width,Width))
@@ -78,53 +79,9 @@ class Spot:
     def __lt__(self,other):
         return False
 
-def reconstruct_path(parent,curr,draw):
-    while curr in parent:
-        curr = parent[curr]
-        curr.make_path()
-        draw()
-
 def algorithm(draw,grid,start,end):
-    que = PriorityQueue()
-    que.put((0,start))
-    parent = {}
-    distance = {spot: float("inf") for row in grid for spot in row}
-    distance[start] = 0
-    open_set = {start}
-
-    while que:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        curr = que.get()[1]
-        open_set.remove(curr)
-
-        if curr == end:
-            for row in grid:
-                for spot in row:
-                    if spot.is_open() or spot.is_closed():
-                        spot.color = White
-            reconstruct_path(parent,end,draw)
-            end.make_end()
-            return True
-        
-        for neighbor in curr.neighbors:
-            dis = distance[curr] +1
-            if dis < distance[neighbor]:
-                parent[neighbor] = curr
-                distance[neighbor] = dis
-                if neighbor not in open_set:
-                    que.put((dis,neighbor))
-                    open_set.add(neighbor)
-                    neighbor.make_open()
-        draw()
-
-        if curr != start:
-            curr.make_closed()
-
-    return False
-        
+    return search_engine.run(draw,grid,start,end)
+
 
 
 def make_grid(rows,width):
@@ -202,7 +159,8 @@ def main(win,width):
                             spot.update_neighbors(grid)
                             if spot.is_path():
                                 spot.color = White
-                    algorithm(lambda: draw(win,grid,Rows,width),grid,start,end)
+                    if algorithm(lambda: draw(win,grid,Rows,width),grid,start,end) is None:
+                        run = False
 
                 if event.key == pygame.K_c:
                     start = None
@@ -0,0 +1,201 @@
+"""ALT heuristics (A*, Landmarks, Triangle inequality) for static grids
+
+For a handful of landmark cells L we store the exact BFS distance d(L, v) to
+every cell. On an undirected grid the triangle inequality gives
+
+    dist(v, t) >= |d(L, t) - d(L, v)|
+
+for every landmark, and the largest of these bounds is an admissible
+heuristic that "sees" walls, unlike Manhattan or Chebyshev distance.
+
+Tables are built on a background thread and cached per grid fingerprint
+(barrier layout, size and diagonal setting). Editing the grid changes the
+fingerprint, so stale tables are never used: the next query simply builds,
+or waits for, the tables of the new layout.
+"""
+import hashlib
+import heapq
+import itertools
+import threading
+from collections import OrderedDict, deque
+
+INF = float("inf")
+ORTHOGONAL = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIAGONAL = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def snapshot(grid):
+    """Barrier bitmap of a grid of spots, one byte per cell in row-major order"""
+    return bytes(1 if spot.is_barrier() else 0 for row in grid for spot in row)
+
+
+def fingerprint(walls, rows, allow_diagonal):
+    """Identify a grid layout for caching"""
+    digest = hashlib.blake2b(walls, digest_size=16)
+    digest.update(f"{rows}:{int(allow_diagonal)}".encode())
+    return digest.hexdigest()
+
+
+def adjacency(walls, rows, allow_diagonal):
+    """Neighbour lists matching Spot.update_neighbors (no corner cutting)"""
+    adj = [()] * (rows * rows)
+    for r in range(rows):
+        for c in range(rows):
+            i = r * rows + c
+            if walls[i]:
+                continue
+            out = []
+            for dr, dc in ORTHOGONAL:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < rows and not walls[nr * rows + nc]:
+                    out.append(nr * rows + nc)
+            if allow_diagonal:
+                for dr, dc in DIAGONAL:
+                    nr, nc = r + dr, c + dc
+                    if (0 <= nr < rows and 0 <= nc < rows and not walls[nr * rows + nc]
+                            and not walls[nr * rows + c] and not walls[r * rows + nc]):
+                        out.append(nr * rows + nc)
+            adj[i] = out
+    return adj
+
+
+def bfs(adj, source):
+    """Unit-cost distances from source to every cell (INF where unreachable)"""
+    dist = [INF] * len(adj)
+    dist[source] = 0
+    queue = deque([source])
+    while queue:
+        i = queue.popleft()
+        d = dist[i] + 1
+        for j in adj[i]:
+            if dist[j] == INF:
+                dist[j] = d
+                queue.append(j)
+    return dist
+
+
+class LandmarkTables:
+    """Landmarks and their distance tables for one grid layout"""
+
+    def __init__(self, walls, rows, allow_diagonal, k):
+        """Pick up to k landmarks by farthest-point selection and run a BFS from each"""
+        self.rows = rows
+        self.allow_diagonal = allow_diagonal
+        self.adj = adjacency(walls, rows, allow_diagonal)
+        self.landmarks = []
+        self.tables = []
+
+        open_cells = [i for i in range(rows * rows) if not walls[i]]
+        if not open_cells:
+            return
+
+        # Start from the cell farthest from an arbitrary one, then keep adding the
+        # cell farthest from every landmark chosen so far. Cells in components no
+        # landmark reaches are infinitely far, so every component gets covered.
+        seed = bfs(self.adj, open_cells[0])
+        candidate = max(open_cells, key=lambda i: seed[i] if seed[i] != INF else -1)
+        nearest = [INF] * (rows * rows)
+        for _ in range(k):
+            table = bfs(self.adj, candidate)
+            self.landmarks.append(candidate)
+            self.tables.append(table)
+            nearest = [min(a, b) for a, b in zip(nearest, table)]
+            candidate = max(open_cells, key=nearest.__getitem__)
+            if nearest[candidate] == 0:
+                break
+
+    def heuristic(self, goal):
+        """Return h(cell) = max over landmarks of |d(L, goal) - d(L, cell)|"""
+        pairs = [(table, table[goal]) for table in self.tables if table[goal] != INF]
+
+        def h(i):
+            best = 0
+            for table, to_goal in pairs:
+                d = table[i]
+                if d != INF:
+                    diff = d - to_goal if d > to_goal else to_goal - d
+                    if diff > best:
+                        best = diff
+            return best
+
+        return h
+
+    def base_heuristic(self, goal):
+        """Manhattan (or Chebyshev with diagonals) distance to goal on cell indices"""
+        rows = self.rows
+        gr, gc = divmod(goal, rows)
+        if self.allow_diagonal:
+            return lambda i: max(abs(i // rows - gr), abs(i % rows - gc))
+        return lambda i: abs(i // rows - gr) + abs(i % rows - gc)
+
+    def count_expansions(self, start, goal, h):
+        """Cells a plain A* with heuristic h expands going from start to goal"""
+        tie = itertools.count()
+        frontier = [(h(start), next(tie), start)]
+        g_score = {start: 0}
+        closed = set()
+        while frontier:
+            _, _, i = heapq.heappop(frontier)
+            if i in closed:
+                continue
+            closed.add(i)
+            if i == goal:
+                break
+            g = g_score[i] + 1
+            for j in self.adj[i]:
+                if g < g_score.get(j, INF):
+                    g_score[j] = g
+                    heapq.heappush(frontier, (g + h(j), next(tie), j))
+        return len(closed)
+
+    def compare(self, start, goal):
+        """(expansions with the base heuristic, expansions with ALT) for one query"""
+        base = self.base_heuristic(goal)
+        alt = self.heuristic(goal)
+        return (self.count_expansions(start, goal, base),
+                self.count_expansions(start, goal, lambda i: max(base(i), alt(i))))
+
+
+class LandmarkCache:
+    """Builds LandmarkTables on a background thread, keyed by grid fingerprint"""
+
+    def __init__(self, k=8, capacity=8):
+        """Keep tables with k landmarks for up to `capacity` recent layouts"""
+        self.k = k
+        self.capacity = capacity
+        self._tables = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, walls, rows, allow_diagonal):
+        """Start building tables for this layout unless they exist or are in progress"""
+        key = fingerprint(walls, rows, allow_diagonal)
+        with self._lock:
+            if key not in self._tables and key not in self._pending:
+                thread = threading.Thread(target=self._build, args=(key, walls, rows, allow_diagonal),
+                                          daemon=True)
+                self._pending[key] = thread
+                thread.start()
+        return key
+
+    def _build(self, key, walls, rows, allow_diagonal):
+        tables = LandmarkTables(walls, rows, allow_diagonal, self.k)
+        with self._lock:
+            self._tables[key] = tables
+            while len(self._tables) > self.capacity:
+                self._tables.popitem(last=False)
+            del self._pending[key]
+
+    def get(self, walls, rows, allow_diagonal, wait=True):
+        """Tables for this layout; builds them if needed, waiting unless wait=False"""
+        key = self.prefetch(walls, rows, allow_diagonal)
+        with self._lock:
+            if key in self._tables:
+                self._tables.move_to_end(key)
+                return self._tables[key]
+            thread = self._pending.get(key)
+        if thread is not None and wait:
+            thread.join()
+            with self._lock:
+                return self._tables.get(key)
+        return None
@@ -0,0 +1,99 @@
+"""Step-wise grid search used by the legacy dijstra.py and a_star.py scripts
+
+The search is a generator over a heapq frontier, so it stops as soon as the
+frontier runs dry instead of blocking on an empty queue. run() drives it a few
+expansions per frame, redraws once per frame and keeps the window responsive.
+"""
+import heapq
+import itertools
+
+import pygame
+
+FPS = 60
+STEPS_PER_FRAME = 4
+NO_PATH_SUFFIX = " - no path to target"
+
+
+def search(start, end, heuristic=None):
+    """Expand one spot per step; the generator returns the parent map, or None if unreachable"""
+    h = heuristic or (lambda spot: 0)
+    tie = itertools.count()
+    frontier = [(h(start), next(tie), start)]
+    g_score = {start: 0}
+    parent = {}
+    closed = set()
+
+    while frontier:
+        _, _, curr = heapq.heappop(frontier)
+        if curr in closed:
+            continue  # Stale entry left behind by a later, cheaper push
+        closed.add(curr)
+
+        if curr == end:
+            return parent
+
+        for neighbor in curr.neighbors:
+            temp_g = g_score[curr] + 1
+            if temp_g < g_score.get(neighbor, float("inf")):
+                parent[neighbor] = curr
+                g_score[neighbor] = temp_g
+                heapq.heappush(frontier, (temp_g + h(neighbor), next(tie), neighbor))
+                if neighbor != end:
+                    neighbor.make_open()
+
+        if curr != start:
+            curr.make_closed()
+        yield
+
+    return None
+
+
+def reconstruct_path(parent, start, end):
+    """Colour the spots between start and end along the parent chain"""
+    curr = parent.get(end)
+    while curr is not None and curr != start:
+        curr.make_path()
+        curr = parent.get(curr)
+
+
+def run(draw, grid, start, end, heuristic=None, steps_per_frame=STEPS_PER_FRAME, fps=FPS):
+    """Animate a search; returns True/False for found/unreachable, or None if the window was closed"""
+    title = pygame.display.get_caption()[0]
+    if title.endswith(NO_PATH_SUFFIX):
+        title = title[:-len(NO_PATH_SUFFIX)]
+        pygame.display.set_caption(title)
+
+    clock = pygame.time.Clock()
+    steps = search(start, end, heuristic)
+    parent = None
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return None
+
+        try:
+            for _ in range(steps_per_frame):
+                next(steps)
+        except StopIteration as done:
+            parent = done.value
+            break
+
+        draw()
+        clock.tick(fps)
+
+    if parent is None:
+        draw()
+        pygame.display.set_caption(title + NO_PATH_SUFFIX)
+        print("No path: the target is unreachable from the start")
+        return False
+
+    for row in grid:
+        for spot in row:
+            if spot.is_open() or spot.is_closed():
+                spot.reset()
+    start.make_start()
+    end.make_end()
+    reconstruct_path(parent, start, end)
+    draw()
+    return True
@@ -0,0 +1,88 @@
+"""Mouse strokes of the barrier painting tools, rasterized into grid cells
+
+Mouse motion arrives as a few events per frame at best, so a fast drag jumps
+several cells between two of them. A brush Stroke joins each position to the
+last with a Bresenham line and stamps the brush on every cell of it, so no
+cell along the way is skipped. Line and rectangle strokes only follow the
+pointer and cover their whole shape once the button is released.
+
+Cells are (row, col) pairs, as PathfindingVisualizer.get_clicked_pos() gives
+them, and every cell returned lies inside a rows x rows grid.
+"""
+TOOLS = ("Brush", "Line", "Rectangle")
+BRUSH_SIZES = (1, 2, 3, 5, 8)  # Side of the square brush, in cells
+
+
+def line_cells(start, end):
+    """Cells of the Bresenham line from start to end, both included"""
+    r0, c0 = start
+    r1, c1 = end
+    dr, dc = abs(r1 - r0), -abs(c1 - c0)
+    step_r = 1 if r0 < r1 else -1
+    step_c = 1 if c0 < c1 else -1
+    error = dr + dc
+    while True:
+        yield r0, c0
+        if r0 == r1 and c0 == c1:
+            return
+        double = 2 * error
+        if double >= dc:
+            error += dc
+            r0 += step_r
+        if double <= dr:
+            error += dr
+            c0 += step_c
+
+
+def brush_cells(cell, size, rows):
+    """Cells of a size x size square brush centred on cell, clipped to the grid"""
+    row, col = cell
+    low = -(size // 2)
+    return [(r, c)
+            for r in range(max(0, row + low), min(rows, row + low + size))
+            for c in range(max(0, col + low), min(rows, col + low + size))]
+
+
+def rectangle_cells(corner, opposite):
+    """Cells of the filled rectangle between two opposite corners"""
+    (r0, c0), (r1, c1) = corner, opposite
+    return [(r, c)
+            for r in range(min(r0, r1), max(r0, r1) + 1)
+            for c in range(min(c0, c1), max(c0, c1) + 1)]
+
+
+class Stroke:
+    """One drag of a painting tool, from the button press to its release"""
+
+    def __init__(self, tool, size, rows, cell, paint=True):
+        """Start a stroke of tool with a brush of `size` at cell; paint=False erases"""
+        self.tool = tool
+        self.size = size
+        self.rows = rows
+        self.paint = paint
+        self.start = self.last = cell
+
+    def begin(self):
+        """Cells the press itself covers"""
+        return set(brush_cells(self.start, self.size, self.rows)) if self.tool == "Brush" else set()
+
+    def move(self, cell):
+        """Follow the pointer to cell and return the cells the brush covered on the way"""
+        last, self.last = self.last, cell
+        if self.tool != "Brush" or cell == last:
+            return set()
+        covered = set()
+        for point in line_cells(last, cell):
+            covered.update(brush_cells(point, self.size, self.rows))
+        return covered
+
+    def shape(self):
+        """Cells a line or rectangle stroke covers if released where the pointer is"""
+        if self.tool == "Line":
+            covered = set()
+            for point in line_cells(self.start, self.last):
+                covered.update(brush_cells(point, self.size, self.rows))
+            return covered
+        if self.tool == "Rectangle":
+            return set(rectangle_cells(self.start, self.last))
+        return set()
@@ -1,8 +1,108 @@
+import time
+STARTUP_TIME = time.perf_counter()
+
+import argparse
+import os
+import sys
 import pygame
-import random
 import math
+from array import array
+from copy import copy
+from functools import partial
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # Large arrays then fall back to drawing one line per pixel column
+    np = None
+
+# Modules shared by both visualizers live in the top-level shared/ directory
+SHARED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shared")
+if SHARED_DIR not in sys.path:
+    sys.path.insert(0, SHARED_DIR)
+
+from fonts import LazyFont
+from instrumentation import Hooks, ChromeTraceListener, IdleMeter
+from counting import CountingArray, Tally
+from operations import OpCounter, notify, record_batch, run_headless, COMPARE, SWAP, WRITE, PIVOT, AUX, STAGE, BLOCK, IDLE, RANGE
+from algorithms import (ALGORITHMS, DESCRIPTIONS, OPTIONS, NON_COMPARISON, NETWORKS, PARALLEL, EXTERNAL, SELECTION,
+                        REPLAYABLE)
+from datasets import DISTRIBUTIONS, generate_array, generate_list, generate_starting_list
+from race import MAX_ENTRANTS, Race
+from recording import Recording
+
 pygame.init()
 
+# Hook points fired for each operation of a running sort (see shared/instrumentation.py)
+SORT_HOOKS = ("on_compare", "on_swap", "on_write", "on_read", "on_aux", "on_stage", "on_block", "on_range")
+hooks = Hooks(*SORT_HOOKS)
+
+# Speed is measured in algorithm operations per rendered frame
+SPEEDS = [0.125, 0.25, 0.5] + [2 ** i for i in range(21)]
+DEFAULT_SPEED = SPEEDS.index(1)
+LARGE_SPEED = SPEEDS.index(2 ** 16)
+STEP_CHUNK = 4096  # Operations run between checks of the frame deadline
+FRAME_BUDGET = 0.75  # Share of a frame the sort may use before it is drawn
+FINISH_SLICE = 0.1  # Seconds F runs the sort for between two reads of the window's events
+IDLE_TIMEOUT = 500  # Milliseconds the main loop sleeps waiting for input when nothing moves
+
+# Large-array mode: compact int buffers drawn as a per-pixel-column envelope
+LARGE_SIZES = [10_000, 100_000, 250_000, 500_000, 1_000_000]
+LARGE_MAX_VAL = 1_000_000
+
+# Strip under the bars where the non-comparison sorts show their counters or buckets,
+# and the external sort its runs
+AUX_HEIGHT = 70
+AUX_GAP = 8
+
+# Bars owned by a worker of a parallel sort take that worker's color
+WORKER_COLORS = [(230, 25, 75), (60, 180, 75), (0, 130, 200), (245, 130, 48),
+                 (145, 30, 180), (70, 190, 190), (240, 50, 230), (170, 110, 40)]
+
+# Race mode: the entrants' panes, in up to RACE_COLUMNS columns with their labels above the bars
+RACE_COLUMNS = 3
+RACE_GAP = 20
+RACE_LABEL = 60
+RACE_LINEUP = ("Quick Sort", "Merge Sort", "Heap Sort", "Shell Sort")  # Raced when fewer than two are picked
+PLACES = ("1st", "2nd", "3rd", "4th", "5th", "6th")
+
+RECORDING_FILE = "sort.rec"  # Saved with Ctrl+S and loaded with Ctrl+O unless --recording is given
+
+# Key that selects each algorithm, in the order shown in the header
+ALGORITHM_KEYS = {
+    pygame.K_i: "Insertion Sort",
+    pygame.K_b: "Bubble Sort",
+    pygame.K_q: "Quick Sort",
+    pygame.K_m: "Merge Sort",
+    pygame.K_u: "Bottom-Up Merge Sort",
+    pygame.K_s: "Selection Sort",
+    pygame.K_h: "Heap Sort",
+    pygame.K_e: "Shell Sort",
+    pygame.K_c: "Comb Sort",
+    pygame.K_n: "Natural Merge Sort",
+    pygame.K_o: "Counting Sort",
+    pygame.K_x: "LSD Radix Sort",
+    pygame.K_z: "MSD Radix Sort",
+    pygame.K_k: "Bucket Sort",
+    pygame.K_v: "Bitonic Sort",
+    pygame.K_w: "Odd-Even Merge Sort",
+    pygame.K_j: "Parallel Sample Sort",
+    pygame.K_g: "Parallel Merge Sort",
+    pygame.K_y: "External Merge Sort",
+    pygame.K_F1: "Quickselect",
+    pygame.K_F2: "Introselect",
+    pygame.K_F3: "Heap Top-k",
+}
+ALGORITHM_KEYS = {key: name for key, name in ALGORITHM_KEYS.items() if name in ALGORITHMS}  # Networks need NumPy
+
+# The selection algorithms are compared with a full quick sort of the same input,
+# with pivots that keep it O(n log n) on every distribution
+REFERENCE_SORT = partial(ALGORITHMS["Quick Sort"], pivot="median-of-3", introsort=True)
+
+# Number keys cycle through the options (algorithms.OPTIONS) of the selected algorithm
+OPTION_KEYS = (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
+               pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9)
+
 class DrawInformation:
     # Basic colors
     BLACK = 0, 0, 0
@@ -42,11 +142,15 @@ class DrawInformation:
         }
     }
     
-    FONT = pygame.font.SysFont('Georgia', 20)
-    LARGE_FONT = pygame.font.SysFont('Verdana', 30)
+    # Resolved through an on-disk cache and loaded on first render
+    FONT = LazyFont('Georgia', 20)
+    LARGE_FONT = LazyFont('Verdana', 30)
+    SMALL_FONT = LazyFont('Georgia', 16)
+
+    FADED_COLORS = {}  # Theme name -> its bar colors blended into its background, worked out once
 
     SIDE_PAD = 100
-    TOP_PAD = 200  # Increased to give more space for UI elements
+    TOP_PAD = 225  # Increased to give more space for UI elements
     BOTTOM_PAD = 60  # Space for metrics at the bottom
 
     def __init__(self, width, height, lst):
@@ -59,6 +163,12 @@ class DrawInformation:
         
         self.window = pygame.display.set_mode((width, height))
         pygame.display.set_caption("Sorting Algorithm Visualization")
+        self.aux = array('i')  # Counters of the running non-comparison sort
+        self.aux_height = 0
+        self.owners = array('b')  # Worker that last wrote each element in a parallel sort, or -1
+        self.stats = {}  # Timings of the last parallel sort, or I/O of the last external one
+        self.runs = array('i')  # Start, merge cursor and stop of each run of an external sort's pass
+        self.active = None  # (low, high) still searched by a selection algorithm, or None
         self.set_list(lst)
 
     def set_theme(self, theme_name):
@@ -71,6 +181,11 @@ class DrawInformation:
             self.HIGHLIGHT2 = theme["highlight2"]
             self.PIVOT = theme["pivot"]
             self.GRADIENTS = theme["gradients"]
+            # Bars a selection algorithm has ruled out, blended into the background
+            if theme_name not in self.FADED_COLORS:
+                self.FADED_COLORS[theme_name] = [tuple((c + 3 * bg) // 4 for c, bg in zip(color, self.BACKGROUND_COLOR))
+                                                 for color in self.GRADIENTS]
+            self.FADED = self.FADED_COLORS[theme_name]
             return True
         return False
     
@@ -83,289 +198,710 @@ class DrawInformation:
 
     def set_list(self, lst):
         self.lst = lst
+        del self.aux[:]
+        del self.owners[:]
+        del self.runs[:]
+        self.stats.clear()
+        self.active = None
         self.min_val = min(lst)
         self.max_val = max(lst)
 
-        self.block_width = round((self.width - self.SIDE_PAD) / len(lst))
+        # More elements than pixel columns: draw a min/max envelope instead of bars
+        self.large = len(lst) > self.width - self.SIDE_PAD
+        self.block_width = max(1, round((self.width - self.SIDE_PAD) / len(lst)))
         # Adjust the height calculation to leave room at the bottom
-        available_height = self.height - self.TOP_PAD - self.BOTTOM_PAD
+        self.bottom = self.height - self.BOTTOM_PAD - self.aux_height
+        available_height = self.bottom - self.TOP_PAD
         self.block_height = math.floor(available_height / (self.max_val - self.min_val + 1))
         self.start_x = self.SIDE_PAD // 2
 
+    def pane(self, lst, left, top, width, bottom):
+        """A copy that draws lst in its own rectangle of the window, for race mode"""
+        pane = copy(self)
+        pane.aux, pane.owners, pane.runs, pane.stats = array('i'), array('b'), array('i'), {}
+        pane.aux_height = 0
+        pane.TOP_PAD = top
+        pane.SIDE_PAD = self.width - width
+        pane.height = bottom + self.BOTTOM_PAD
+        pane.set_list(lst)
+        pane.start_x = left
+        pane.block_width = max(1, width // len(lst))  # Rounding down keeps the bars inside the pane
+        return pane
 
-def draw(draw_info, algo_name, ascending, speed, comparisons=0, swaps=0, distribution_name="Random"):
-    draw_info.window.fill(draw_info.BACKGROUND_COLOR)
+    def show_aux(self, shown):
+        """Make room under the bars for the auxiliary array, or give it back"""
+        self.aux_height = AUX_HEIGHT if shown else 0
+        self.set_list(self.lst)
+
+
+def wrap_parts(font, parts, max_width, separator=" | "):
+    """Join parts with separator into as few lines as fit in max_width"""
+    lines = []
+    for part in parts:
+        if lines and font.size(lines[-1] + separator + part)[0] <= max_width:
+            lines[-1] += separator + part
+        else:
+            lines.append(part)
+    return lines
+
+
+def format_options(options):
+    """One line describing an algorithm's options and the number keys that cycle them"""
+    parts = []
+    for number, (name, value) in enumerate(options.items(), start=1):
+        if isinstance(value, bool):
+            value = "On" if value else "Off"
+        parts.append(f"{number} - {name.replace('_', ' ').title()}: {value}")
+    return " | ".join(parts)
+
+
+def format_bytes(count):
+    """A byte count in B, KB, MB or GB"""
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+_header_layers = {}  # Theme name -> (what it shows, surface) of the last header drawn in that theme
+HEADER_HEIGHT = DrawInformation.TOP_PAD - 12  # Leaves the strip above the bars to the playback track
+
+
+def header_layer(draw_info, algo_name, ascending, speed, distribution_name="Random", k=None, panes=None, playback=None):
+    """The text above the bars as one surface, rendered again only when something it shows changes
+
+    Each theme keeps its own layer, so switching back to a theme whose
+    text has not changed reuses it.
+    """
+    shown = (algo_name, ascending, speed, len(draw_info.lst), distribution_name,
+             k if algo_name in SELECTION else None, tuple(pane.name for pane in panes or ()), bool(playback))
+    cached = _header_layers.get(draw_info.current_theme)
+    if cached is not None and cached[0] == shown:
+        return cached[1]
+
+    layer = pygame.Surface((draw_info.width, HEADER_HEIGHT)).convert()
+    layer.fill(draw_info.BACKGROUND_COLOR)
 
     # Title with sorting direction
-    title = draw_info.LARGE_FONT.render(f"{algo_name} - {'Ascending' if ascending else 'Descending'}", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(title, (draw_info.width/2 - title.get_width()/2, 5))
+    title = draw_info.LARGE_FONT.render(f"{'Race' if panes else algo_name} - {'Ascending' if ascending else 'Descending'}", 1, draw_info.TEXT_COLOR)
+    layer.blit(title, (draw_info.width/2 - title.get_width()/2, 5))
 
     # Controls information
-    controls = draw_info.FONT.render("R - Reset | SPACE - Start Sorting | A - Ascending | D - Descending", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(controls, (draw_info.width/2 - controls.get_width()/2, 45))
+    controls = draw_info.FONT.render("R - Reset | SPACE - Start Sorting | A - Ascending | D - Descending | TAB - Race", 1, draw_info.TEXT_COLOR)
+    layer.blit(controls, (draw_info.width/2 - controls.get_width()/2, 45))
 
-    # Algorithm selection controls
-    sorting = draw_info.FONT.render("I - Insertion Sort | B - Bubble Sort | Q - Quick Sort | M - Merge Sort | S - Selection Sort", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(sorting, (draw_info.width/2 - sorting.get_width()/2, 75))
+    # Algorithm selection controls, wrapped to fit the window
+    y = 75
+    keys = [f"{pygame.key.name(key).upper()} - {name.replace(' Sort', '')}" for key, name in ALGORITHM_KEYS.items()]
+    for line in wrap_parts(draw_info.FONT, keys, draw_info.width - 40):
+        sorting = draw_info.FONT.render(line, 1, draw_info.TEXT_COLOR)
+        layer.blit(sorting, (draw_info.width/2 - sorting.get_width()/2, y))
+        y += 24
 
     # Speed and size controls
-    speed_txt = draw_info.FONT.render(f"Speed: {speed:.1f}x (+ / - to adjust)", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(speed_txt, (draw_info.width/2 - speed_txt.get_width()/2, 105))
+    hint = "LEFT / RIGHT to step, UP / DOWN to play" if playback else "F to finish instantly, Esc to stop"
+    speed_txt = draw_info.FONT.render(f"Speed: {speed:g} ops/frame (+ / - to adjust, {hint})", 1, draw_info.TEXT_COLOR)
+    layer.blit(speed_txt, (draw_info.width/2 - speed_txt.get_width()/2, y + 6))
     
     # Array size
-    size_txt = draw_info.FONT.render(f"Array Size: {len(draw_info.lst)} ([ / ] to adjust)", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(size_txt, (draw_info.width/2 - size_txt.get_width()/2, 135))
+    size = f"Array Size: {len(draw_info.lst):,} ([ / ] to adjust, L for large arrays)"
+    if algo_name in SELECTION and k is not None:
+        size += f" | k: {k:,} (, / . to adjust)"
+    size_txt = draw_info.FONT.render(size, 1, draw_info.TEXT_COLOR)
+    layer.blit(size_txt, (draw_info.width/2 - size_txt.get_width()/2, y + 36))
     
     # Distribution info
     dist_txt = draw_info.FONT.render(f"Distribution: {distribution_name} (P to change)", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(dist_txt, (20, 20))
+    layer.blit(dist_txt, (20, 20))
     
     # Theme info
     theme_txt = draw_info.FONT.render(f"Theme: {draw_info.current_theme} (T to change)", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(theme_txt, (draw_info.width - 280, 20))
+    layer.blit(theme_txt, (draw_info.width - 280, 20))
     
     # Algorithm description - Moved to above the array visualization
-    algorithm_descriptions = {
-        "Bubble Sort": "O(n²) - Simple comparison-based algorithm that repeatedly steps through the list, comparing adjacent elements.",
-        "Insertion Sort": "O(n²) - Builds the final sorted array one item at a time, efficient for small data sets.",
-        "Quick Sort": "O(n log n) average - Divides array around pivot, recursively sorts the sub-arrays.",
-        "Merge Sort": "O(n log n) - Divides array, sorts the parts recursively, then merges them.",
-        "Selection Sort": "O(n²) - Repeatedly finds the minimum element and places it at the beginning."
-    }
-    
-    if algo_name in algorithm_descriptions:
-        algo_desc = draw_info.FONT.render(algorithm_descriptions[algo_name], 1, draw_info.TEXT_COLOR)
-        draw_info.window.blit(algo_desc, (draw_info.width/2 - algo_desc.get_width()/2, 165))
+    if panes:
+        entrants = ", ".join(pane.name.replace(' Sort', '') for pane in panes)
+        race_txt = draw_info.FONT.render(f"Race: {entrants} (ENTER adds or removes {algo_name}, TAB to leave)", 1, draw_info.TEXT_COLOR)
+        layer.blit(race_txt, (draw_info.width/2 - race_txt.get_width()/2, y + 66))
+    elif algo_name in DESCRIPTIONS:
+        algo_desc = draw_info.FONT.render(DESCRIPTIONS[algo_name], 1, draw_info.TEXT_COLOR)
+        layer.blit(algo_desc, (draw_info.width/2 - algo_desc.get_width()/2, y + 66))
     
+    _header_layers[draw_info.current_theme] = (shown, layer)
+    return layer
+
+
+def draw(draw_info, algo_name, ascending, speed, counter=None, distribution_name="Random", options=None, tally=None,
+         k=None, panes=None, playback=None):
+    # Everything under the header is drawn afresh; the header is one cached surface
+    draw_info.window.fill(draw_info.BACKGROUND_COLOR, (0, HEADER_HEIGHT, draw_info.width, draw_info.height - HEADER_HEIGHT))
+    draw_info.window.blit(header_layer(draw_info, algo_name, ascending, speed, distribution_name, k, panes, playback),
+                          (0, 0))
+
+    # Options of the selected algorithm, just under the bars
+    if options:
+        options_txt = draw_info.FONT.render(format_options(options), 1, draw_info.TEXT_COLOR)
+        draw_info.window.blit(options_txt, (draw_info.width/2 - options_txt.get_width()/2, draw_info.height - 55))
+
     # Performance metrics - Position at the bottom of the window
-    metrics = draw_info.FONT.render(f"Comparisons: {comparisons} | Swaps: {swaps}", 1, draw_info.TEXT_COLOR)
-    draw_info.window.blit(metrics, (draw_info.width/2 - metrics.get_width()/2, draw_info.height - 30))
+    if not panes:
+        draw_metrics(draw_info, metrics_text(draw_info, algo_name, counter, tally, playback))
 
-    # Draw the actual list visualization
-    draw_list(draw_info)
+    # Draw the actual list visualization, or each entrant's in race mode
+    if panes:
+        for pane in panes:
+            draw_list(pane.draw_info)
+            pane.draw_label()
+    else:
+        draw_list(draw_info)
+        if draw_info.aux_height:
+            draw_aux(draw_info)
+        if playback:
+            playback.draw()
     pygame.display.update()
 
 
+def metrics_text(draw_info, algo_name, counter=None, tally=None, playback=None):
+    """The counts of the last run, worded for its algorithm"""
+    counter = counter or OpCounter()
+    if tally is not None:
+        # Exact element traffic, counted by the CountingArray the sort ran on
+        text = (f"Comparisons: {tally.comparisons} | Reads: {tally.reads} | Writes: {tally.writes}"
+                f" | Swaps: {counter.swaps} | Extra Memory: {tally.peak_aux} elements")
+    elif algo_name in NON_COMPARISON:
+        # Comparisons mean nothing to counting and radix sorts; show the memory traffic instead
+        text = f"Reads: {counter.reads} | Writes: {counter.writes} | Counter Writes: {counter.aux_writes}"
+        if counter.comparisons:
+            text += f" | Comparisons: {counter.comparisons}"
+    else:
+        text = f"Comparisons: {counter.comparisons} | Swaps: {counter.swaps} | Writes: {counter.writes}"
+        if algo_name in NETWORKS:
+            text += f" | Stages: {counter.stages}"
+    if algo_name in PARALLEL and draw_info.stats:
+        stats = draw_info.stats
+        text += (f" | Wall: {stats['wall']:.2f} s | Serial: {stats['serial']:.2f} s | Speedup: {stats['speedup']:.2f}x"
+                 f" | Efficiency: {stats['efficiency']:.0%}")
+    if algo_name in EXTERNAL and draw_info.stats:
+        stats = draw_info.stats
+        text = (f"Runs: {stats['runs']} | Passes: {stats['passes']} | Read: {format_bytes(stats['bytes_read'])}"
+                f" | Written: {format_bytes(stats['bytes_written'])}")
+    if algo_name in SELECTION and draw_info.stats:
+        reference = draw_info.stats["reference"]
+        text += f" | vs Full Quick Sort: {counter.comparisons / max(1, reference):.0%} of its {reference} comparisons"
+    if playback:
+        text = f"Step: {playback.position:,} / {len(playback.recording):,} | {text}"
+    return text
+
+
+def draw_metrics(draw_info, text):
+    """Draw the metrics line over its strip of background and return the strip's rect"""
+    strip = pygame.Rect(0, draw_info.height - 30, draw_info.width, 30)
+    pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, strip)
+    metrics = draw_info.FONT.render(text, 1, draw_info.TEXT_COLOR)
+    draw_info.window.blit(metrics, (draw_info.width/2 - metrics.get_width()/2, draw_info.height - 30))
+    return strip
+
+
 def draw_list(draw_info, color_positions={}, clear_bg=False):
     lst = draw_info.lst
 
+    if draw_info.large:
+        area = draw_envelope(draw_info)
+        if clear_bg:
+            pygame.display.update(area)
+        return
+
     if clear_bg:
-        clear_rect = (draw_info.SIDE_PAD//2, draw_info.TOP_PAD, 
-                     draw_info.width - draw_info.SIDE_PAD, draw_info.height - draw_info.TOP_PAD - draw_info.BOTTOM_PAD)
+        clear_rect = (draw_info.start_x, draw_info.TOP_PAD,
+                      max(draw_info.width - draw_info.SIDE_PAD, len(lst) * draw_info.block_width),
+                      draw_info.bottom - draw_info.TOP_PAD)
         pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, clear_rect)
 
+    owners = draw_info.owners
+    low, high = draw_info.active or (0, len(lst) - 1)
     for i, val in enumerate(lst):
         x = draw_info.start_x + i * draw_info.block_width
-        y = draw_info.height - draw_info.BOTTOM_PAD - (val - draw_info.min_val + 1) * draw_info.block_height
+        y = draw_info.bottom - (val - draw_info.min_val + 1) * draw_info.block_height
 
         color = draw_info.GRADIENTS[i % 3]
+        if owners and owners[i] >= 0:
+            color = WORKER_COLORS[owners[i] % len(WORKER_COLORS)]
+        elif not low <= i <= high:
+            color = draw_info.FADED[i % 3]
 
         if i in color_positions:
             color = color_positions[i]
 
-        pygame.draw.rect(draw_info.window, color, (x, y, draw_info.block_width, draw_info.height - y - draw_info.BOTTOM_PAD))
+        pygame.draw.rect(draw_info.window, color, (x, y, draw_info.block_width, draw_info.bottom - y))
 
     if clear_bg:
-        pygame.display.update()
+        pygame.display.update(clear_rect)
 
 
-def generate_starting_list(n, min_val, max_val):
-    lst = []
-    for _ in range(n):
-        val = random.randint(min_val, max_val)
-        lst.append(val)
-    return lst
+def draw_bar(draw_info, i, color=None):
+    """Redraw bar i over its own strip of background and return the strip's rect"""
+    x = draw_info.start_x + i * draw_info.block_width
+    bottom = draw_info.bottom
+    column = pygame.Rect(x, draw_info.TOP_PAD, draw_info.block_width, bottom - draw_info.TOP_PAD)
+    pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, column)
 
+    if color is None:
+        owners = draw_info.owners
+        active = draw_info.active
+        if owners and owners[i] >= 0:
+            color = WORKER_COLORS[owners[i] % len(WORKER_COLORS)]
+        elif active and not active[0] <= i <= active[1]:
+            color = draw_info.FADED[i % 3]
+        else:
+            color = draw_info.GRADIENTS[i % 3]
+    y = bottom - (draw_info.lst[i] - draw_info.min_val + 1) * draw_info.block_height
+    pygame.draw.rect(draw_info.window, color, (x, y, draw_info.block_width, bottom - y))
+    return column
 
-def generate_nearly_sorted_list(n, min_val, max_val, swap_percent=10):
-    lst = sorted(generate_starting_list(n, min_val, max_val))
-    swaps = int((n * swap_percent) / 100)
-    
-    for _ in range(swaps):
-        i = random.randint(0, n-2)
-        lst[i], lst[i+1] = lst[i+1], lst[i]
-        
-    return lst
 
+_envelope_surfaces = {}  # 8-bit palette surfaces reused by draw_envelope, keyed by size
 
-def generate_reversed_list(n, min_val, max_val):
-    return sorted(generate_starting_list(n, min_val, max_val), reverse=True)
 
+def draw_envelope(draw_info):
+    """Draw arrays wider than the window as one min/max envelope per pixel column
 
-def bubble_sort(draw_info, ascending=True):
+    Each column covers about n / width elements. It is filled solid up to the
+    smallest of them and shaded up to the largest, so unsorted regions show as
+    tall bands and sorted ones as a thin rising edge. During a parallel sort a
+    column takes the color of the worker owning its first element. Returns the
+    area drawn.
+    """
     lst = draw_info.lst
-    comparisons = 0
-    swaps = 0
+    n = len(lst)
+    width = draw_info.width - draw_info.SIDE_PAD
+    height = draw_info.bottom - draw_info.TOP_PAD
+    area = pygame.Rect(draw_info.start_x, draw_info.TOP_PAD, width, height)
+    scale = height / (draw_info.max_val - draw_info.min_val + 1)
+    solid, band = draw_info.GRADIENTS[0], draw_info.GRADIENTS[2]
+    owners = draw_info.owners
+    background = draw_info.BACKGROUND_COLOR
+    worker_bands = [tuple((c + b) // 2 for c, b in zip(color, background)) for color in WORKER_COLORS]
 
-    for i in range(len(lst) - 1):
-        for j in range(len(lst) - 1 - i):
-            num1 = lst[j]
-            num2 = lst[j + 1]
-            comparisons += 1
+    if np is not None:
+        values = np.frombuffer(lst, dtype=f"i{lst.itemsize}")
+        starts = np.arange(width) * n // width
+        lo_top = height - ((np.minimum.reduceat(values, starts) - draw_info.min_val + 1) * scale).astype(np.int32)
+        hi_top = height - ((np.maximum.reduceat(values, starts) - draw_info.min_val + 1) * scale).astype(np.int32)
+        rows = np.arange(height, dtype=np.int32)[None, :]
 
-            if (num1 > num2 and ascending) or (num1 < num2 and not ascending):
-                lst[j], lst[j + 1] = lst[j + 1], lst[j]
-                swaps += 1
-                draw_list(draw_info, {j: draw_info.HIGHLIGHT1, j + 1: draw_info.HIGHLIGHT2}, True)
-                yield comparisons, swaps
+        # Palette indices: 0 background, 1 inside the min/max band, 2 below the minimum
+        shade = (rows >= hi_top[:, None]).view(np.uint8) + (rows >= lo_top[:, None]).view(np.uint8)
+        palette = [background, band, solid]
+        if owners:
+            # Owned columns move on to their worker's pair of palette entries
+            owner = np.frombuffer(owners, dtype=np.int8)[starts].astype(np.int32)
+            offset = np.where(owner >= 0, 2 * (owner % len(WORKER_COLORS)) + 2, 0).astype(np.uint8)
+            shade += (shade > 0) * offset[:, None]
+            for color, worker_band in zip(WORKER_COLORS, worker_bands):
+                palette += [worker_band, color]
+        surface = _envelope_surfaces.get((width, height))
+        if surface is None:
+            surface = _envelope_surfaces[(width, height)] = pygame.Surface((width, height), depth=8)
+        surface.set_palette(palette)
+        pygame.surfarray.blit_array(surface, shade)
+        draw_info.window.blit(surface, area)
+        return area
 
-    return lst
+    pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, area)
+    bottom = area.bottom - 1
+    for x in range(width):
+        column = lst[x * n // width:(x + 1) * n // width]
+        lo_top = bottom - int((min(column) - draw_info.min_val + 1) * scale)
+        hi_top = bottom - int((max(column) - draw_info.min_val + 1) * scale)
+        column_band, column_solid = band, solid
+        if owners and owners[x * n // width] >= 0:
+            worker = owners[x * n // width] % len(WORKER_COLORS)
+            column_band, column_solid = worker_bands[worker], WORKER_COLORS[worker]
+        pygame.draw.line(draw_info.window, column_band, (area.x + x, hi_top), (area.x + x, bottom))
+        pygame.draw.line(draw_info.window, column_solid, (area.x + x, lo_top), (area.x + x, bottom))
+    return area
 
 
-def insertion_sort(draw_info, ascending=True):
-    lst = draw_info.lst
-    comparisons = 0
-    swaps = 0
+def draw_aux(draw_info, highlight=-1):
+    """Draw the auxiliary array as small bars under the main ones and return the area drawn
 
-    for i in range(1, len(lst)):
-        current = lst[i]
-        j = i
-        comparisons += 1
+    Each bar is scaled to the largest entry. With more entries than pixel
+    columns, each column shows the largest entry it covers. During an
+    external sort the strip shows its runs instead (see draw_runs()).
+    """
+    area = pygame.Rect(draw_info.start_x, draw_info.bottom + AUX_GAP,
+                       draw_info.width - draw_info.SIDE_PAD, draw_info.aux_height - AUX_GAP - 2)
+    pygame.draw.rect(draw_info.window, draw_info.BACKGROUND_COLOR, area)
+    if draw_info.runs:
+        draw_runs(draw_info, area)
+        return area
+    aux = draw_info.aux
+    m = len(aux)
+    if m == 0:
+        return area
 
-        while j > 0 and ((lst[j - 1] > current and ascending) or (lst[j - 1] < current and not ascending)):
-            lst[j] = lst[j - 1]
-            j -= 1
-            swaps += 1
-            comparisons += 1
-            draw_list(draw_info, {j: draw_info.HIGHLIGHT1, j - 1: draw_info.HIGHLIGHT2}, True)
-            yield comparisons, swaps
+    if m > area.width:
+        starts = [x * m // area.width for x in range(area.width)]
+        if np is not None:
+            values = np.maximum.reduceat(np.frombuffer(aux, dtype=f"i{aux.itemsize}"), starts).tolist()
+        else:
+            values = [max(aux[start:end]) for start, end in zip(starts, starts[1:] + [m])]
+        highlight = highlight * area.width // m if highlight >= 0 else -1
+    else:
+        values = aux
 
-        lst[j] = current
-        draw_list(draw_info, {j: draw_info.HIGHLIGHT1}, True)
-        yield comparisons, swaps
+    peak = max(values) or 1
+    columns = len(values)
+    for j, value in enumerate(values):
+        left = area.x + j * area.width // columns
+        right = area.x + (j + 1) * area.width // columns
+        height = round(max(value, 0) * area.height / peak)
+        color = draw_info.HIGHLIGHT1 if j == highlight else draw_info.GRADIENTS[1]
+        pygame.draw.rect(draw_info.window, color, (left, area.bottom - height, max(1, right - left - 1), height))
+    return area
 
-    return lst
 
+def draw_runs(draw_info, area):
+    """Draw the runs an external sort's pass reads, each under the elements it covers
 
-def selection_sort(draw_info, ascending=True):
-    lst = draw_info.lst
-    comparisons = 0
-    swaps = 0
-    
-    for i in range(len(lst)):
-        min_idx = i
-        
-        for j in range(i + 1, len(lst)):
-            comparisons += 1
-            if (lst[j] < lst[min_idx] and ascending) or (lst[j] > lst[min_idx] and not ascending):
-                min_idx = j
-                # Add visualization for comparisons too
-                draw_list(draw_info, {j: draw_info.HIGHLIGHT2, min_idx: draw_info.HIGHLIGHT1}, True)
-                yield comparisons, swaps
-                
-        if i != min_idx:
-            lst[i], lst[min_idx] = lst[min_idx], lst[i]
-            swaps += 1
-            draw_list(draw_info, {i: draw_info.HIGHLIGHT1, min_idx: draw_info.HIGHLIGHT2}, True)
-            yield comparisons, swaps
-
-
-
-def merge_sort(draw_info, ascending=True):
-    lst = draw_info.lst
-    temp_arr = lst.copy()
-    comparisons = 0
-    swaps = 0
-    
-    def merge(arr, temp, left, mid, right):
-        nonlocal comparisons, swaps
-        i = left      # Starting index of left subarray
-        j = mid + 1   # Starting index of right subarray
-        k = left      # Starting index of merged subarray
-        
-        while i <= mid and j <= right:
-            comparisons += 1
-            if (arr[i] <= arr[j] and ascending) or (arr[i] >= arr[j] and not ascending):
-                temp[k] = arr[i]
-                i += 1
+    The part of a run already merged, before its merge cursor, is shaded; the
+    rest, from the cursor (where its next element is read) to its end, is
+    solid. Runs take the colors their elements had when written.
+    """
+    runs = draw_info.runs
+    n = len(draw_info.lst)
+    background = draw_info.BACKGROUND_COLOR
+    for r in range(len(runs) // 3):
+        start, cursor, stop = runs[3 * r:3 * r + 3]
+        left = area.x + start * area.width // n
+        middle = area.x + cursor * area.width // n
+        right = area.x + stop * area.width // n
+        color = WORKER_COLORS[r % len(WORKER_COLORS)]
+        band = tuple((c + b) // 2 for c, b in zip(color, background))
+        pygame.draw.rect(draw_info.window, band, (left, area.y, max(1, right - left - 1), area.height))
+        if cursor < stop:
+            pygame.draw.rect(draw_info.window, color, (middle, area.y, max(1, right - middle - 1), area.height))
+
+
+class OpRenderer:
+    """Tracks the highlights of a sorting algorithm's operation stream and draws them
+
+    Any number of operations can be recorded between two calls to draw(); the
+    frame shows the bars touched by the most recent one plus the pivot. Only
+    bars whose value or highlight changed since the last frame are redrawn,
+    and only their rects are sent to the display, so a step costs the same
+    whatever the array size.
+    """
+
+    def __init__(self, draw_info):
+        self.draw_info = draw_info
+        self.pivot = -1
+        self.last = None
+        self.dirty = set()
+        self.highlighted = {}
+        self.aux_changed = False
+        self.aux_last = -1
+        self.stage = None
+
+    def record(self, op):
+        kind, a, b = op
+        if kind == STAGE:
+            # Every pair of a network stage is highlighted together
+            self.stage = a
+            self.last = None
+            self.dirty.update(a.ravel().tolist())
+        elif kind == BLOCK:
+            # A worker rewrote a whole span; its bars are redrawn in the worker's color
+            self.last = None
+            self.stage = None
+            self.dirty.update(range(b[0], b[1]))
+        elif kind == PIVOT:
+            self.dirty.add(self.pivot)
+            self.pivot = a
+            self.dirty.add(a)
+        elif kind == AUX:
+            self.aux_changed = True
+            self.aux_last = a
+        elif kind == RANGE:
+            # A selection algorithm narrowed its search; bars outside it fade
+            self.draw_info.active = (a, b)
+            self.dirty.update(range(len(self.draw_info.lst)))
+        else:
+            self.last = op
+            self.stage = None
+            self.dirty.add(a)
+            if kind == COMPARE or kind == SWAP:
+                self.dirty.add(b)
+
+    def draw(self):
+        info = self.draw_info
+        op = self.last
+        colors = {}
+
+        if op is not None:
+            kind, a, b = op
+            colors[a] = info.HIGHLIGHT1
+            if kind == COMPARE or kind == SWAP:
+                colors[b] = info.HIGHLIGHT2
+
+        if self.stage is not None:
+            low, high = self.stage.tolist()
+            colors.update(dict.fromkeys(low, info.HIGHLIGHT1))
+            colors.update(dict.fromkeys(high, info.HIGHLIGHT2))
+
+        if self.pivot >= 0:
+            colors.setdefault(self.pivot, info.PIVOT)
+
+        # Bars that changed, plus bars that lose or gain a highlight
+        dirty = self.dirty
+        dirty.update(self.highlighted)
+        dirty.update(colors)
+        self.highlighted = colors
+        self.dirty = set()
+
+        rects = []
+        if self.aux_changed:
+            rects.append(draw_aux(info, self.aux_last))
+            self.aux_changed = False
+
+        n = len(info.lst)
+        if len(dirty) * 2 > n:
+            draw_list(info, colors, True)  # Most of the array changed anyway
+        else:
+            rects += [draw_bar(info, i, colors.get(i)) for i in dirty if 0 <= i < n]
+        pygame.display.update(rects)  # The counter strip too, when draw_list() redrew the bars
+
+
+def advance(generator, steps, counter, renderer=None, deadline=None, record=None):
+    """Run up to `steps` operations of a sort, stopping early once `deadline` passes
+
+    Each operation is also passed to `record` when given. Returns False when
+    the sort has finished.
+    """
+    counts = counter.counts
+    track = renderer.record if renderer is not None else None
+    listening = bool(hooks.listeners)
+
+    while steps > 0:
+        chunk = min(steps, STEP_CHUNK)
+        done = 0
+        for op in islice(generator, chunk):
+            kind = op[0]
+            counts[kind] += 1
+            if kind >= STAGE:
+                if kind == IDLE:
+                    return True  # Waiting on worker processes; draw the frame meanwhile
+                record_batch(counts, op)
+            if track is not None:
+                track(op)
+            if record is not None:
+                record(op)
+            if listening:
+                notify(hooks, op)
+            done += 1
+        if done < chunk:
+            return False
+        steps -= chunk
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return True
+
+
+class RacePane:
+    """One entrant of race mode: its own copy of the input, drawn in its own part of the window"""
+
+    def __init__(self, draw_info, name, left, top, width, bottom):
+        self.name = name
+        self.source = draw_info.lst  # The input raced, so a new one can be noticed
+        self.draw_info = draw_info.pane(list(draw_info.lst), left, top + RACE_LABEL, width, bottom)
+        self.label = pygame.Rect(left, top, width, RACE_LABEL)
+        self.counter = OpCounter()
+        self.renderer = None
+        self.generator = None
+        self.race = None
+        self.index = 0
+        self.place = 0  # Finishing position, once finished
+        self.behind = 0  # Ops owed from frames spent waiting for the worker
+
+    @property
+    def ops(self):
+        """Operations replayed so far"""
+        counts = self.counter.counts
+        return sum(counts) - counts[IDLE]
+
+    def start(self, race, index):
+        """Replay entrant `index` of a race from the unsorted input"""
+        info = self.draw_info
+        info.lst[:] = self.source
+        info.active = None
+        self.counter = OpCounter()
+        self.renderer = OpRenderer(info)
+        self.generator = race.replay(index, info.lst)
+        self.race, self.index = race, index
+        self.place = 0
+        self.behind = 0
+
+    def step(self, steps):
+        """Replay this frame's ops, plus any owed, and return False once the entrant has finished"""
+        steps += self.behind
+        before = self.ops
+        if advance(self.generator, steps, self.counter, self.renderer):
+            self.behind = steps - (self.ops - before)
+            return True
+        self.generator = None
+        self.behind = 0
+        return False
+
+    def finish(self):
+        """Replay the rest of the entrant's ops without drawing them"""
+        while advance(self.generator, STEP_CHUNK, self.counter):
+            pass
+        self.generator = None
+        self.draw_info.active = None  # Its RANGE ops were not recorded
+
+    def draw_label(self):
+        """Draw the entrant's name, place, time and counts above its bars and return their rect"""
+        info = self.draw_info
+        pygame.draw.rect(info.window, info.BACKGROUND_COLOR, self.label)
+        counter = self.counter
+        if self.place:
+            wall = self.race.results[self.index][0]
+            status = f"{PLACES[self.place - 1]} | {wall * 1000:.1f} ms | {self.ops:,} ops"
+        elif self.generator is not None:
+            status = f"{self.ops:,} ops"
+        else:
+            status = "Ready"
+        if self.name in NON_COMPARISON:
+            counts = f"Reads: {counter.reads:,} | Writes: {counter.writes:,} | Counter Writes: {counter.aux_writes:,}"
+        else:
+            counts = f"Comparisons: {counter.comparisons:,} | Swaps: {counter.swaps:,} | Writes: {counter.writes:,}"
+
+        y = self.label.y
+        for line in (self.name, status, counts):
+            text = info.SMALL_FONT.render(line, 1, info.TEXT_COLOR)
+            info.window.blit(text, (self.label.centerx - text.get_width() / 2, y))
+            y += 19
+        return self.label
+
+
+def race_panes(draw_info, names):
+    """A pane for each entrant, in rows of up to RACE_COLUMNS between the header and the options"""
+    columns = min(RACE_COLUMNS, len(names))
+    rows = -(-len(names) // columns)
+    width = (draw_info.width - draw_info.SIDE_PAD - (columns - 1) * RACE_GAP) // columns
+    height = (draw_info.height - draw_info.BOTTOM_PAD - draw_info.TOP_PAD - (rows - 1) * RACE_GAP) // rows
+    panes = []
+    for i, name in enumerate(names):
+        row, column = divmod(i, columns)
+        left = draw_info.SIDE_PAD // 2 + column * (width + RACE_GAP)
+        top = draw_info.TOP_PAD + row * (height + RACE_GAP)
+        panes.append(RacePane(draw_info, name, left, top, width, top + height))
+    return panes
+
+
+def rank(panes, finished):
+    """Give the panes that finished in the same frame their places, fewest ops first"""
+    place = sum(1 for pane in panes if pane.place)
+    for pane in sorted(finished, key=lambda pane: pane.ops):
+        place += 1
+        pane.place = place
+
+
+class Playback:
+    """Steps back and forth through the Recording of a finished sort, drawing its ops as the sort did
+
+    Forward, the recording redoes its ops through advance(); backward, each op
+    is undone in O(1) and the op that shows the state before it is drawn
+    instead. Jumps seek from the nearest keyframe. A track above the bars
+    shows how far into the recording the array is.
+    """
+
+    def __init__(self, draw_info, recording, counter):
+        """Play back recording on draw_info's list, which holds its final state, counting into counter"""
+        self.draw_info = draw_info
+        self.recording = recording
+        self.counter = counter
+        self.renderer = OpRenderer(draw_info)
+        self.position = len(recording)  # Ops applied to the list
+        self.direction = 0  # 1 while playing forward, -1 backward, 0 when paused
+        self.generator = None  # Redoes the ops from position on, while stepping forward
+
+    @property
+    def track(self):
+        info = self.draw_info
+        return pygame.Rect(info.start_x, info.TOP_PAD - 8, info.width - info.SIDE_PAD, 4)
+
+    def hit(self, pos):
+        """Whether a click at pos is on the track"""
+        return self.track.inflate(12, 16).collidepoint(pos)
+
+    def forward(self, steps):
+        """Redo up to `steps` ops and return False at the end of the recording"""
+        info = self.draw_info
+        if self.generator is None:
+            self.generator = self.recording.replay(self.position, info.lst, info.aux)
+        counts = self.counter.counts
+        before = sum(counts)
+        advance(self.generator, steps, self.counter, self.renderer)
+        self.position += sum(counts) - before
+        return self.position < len(self.recording)
+
+    def backward(self, steps):
+        """Undo up to `steps` ops and return False at the start of the recording"""
+        self.generator = None
+        info, recording, counts = self.draw_info, self.recording, self.counter.counts
+        stop = max(0, self.position - steps)
+        for i in range(self.position - 1, stop - 1, -1):
+            op = recording.revert(i, info.lst, info.aux)
+            counts[recording.kinds[i]] -= 1
+            if op is None:
+                self.seek(i)  # Undid a counter reset, whose counters only a keyframe has
             else:
-                temp[k] = arr[j]
-                swaps += (mid - i + 1)  # Count inversions
-                j += 1
-            k += 1
-            
-        # Copy remaining elements
-        while i <= mid:
-            temp[k] = arr[i]
-            i += 1
-            k += 1
-            
-        while j <= right:
-            temp[k] = arr[j]
-            j += 1
-            k += 1
-            
-        # Copy back to original array
-        for i in range(left, right + 1):
-            arr[i] = temp[i]
-            draw_list(draw_info, {i: draw_info.HIGHLIGHT1}, True)
-            yield
-    
-    def merge_sort_helper(arr, temp, left, right):
-        if left < right:
-            mid = (left + right) // 2
-            
-            # Sort first and second halves
-            yield from merge_sort_helper(arr, temp, left, mid)
-            yield from merge_sort_helper(arr, temp, mid + 1, right)
-            yield from merge(arr, temp, left, mid, right)
-    
-    yield from merge_sort_helper(lst, temp_arr, 0, len(lst) - 1)
-    
-    # Final yield with updated metrics
-    yield comparisons, swaps
-    return lst
+                self.renderer.record(op)
+        self.position = stop
+        return stop > 0
 
+    def seek(self, position):
+        """Jump to the state after the first `position` ops and redraw every bar"""
+        info = self.draw_info
+        self.generator = None
+        pivot, info.active = self.recording.seek(position, info.lst, info.aux, self.counter.counts)
+        self.position = position
+        self.renderer = OpRenderer(info)
+        self.renderer.pivot = pivot
+        self.renderer.dirty.update(range(len(info.lst)))
+        self.renderer.aux_changed = bool(info.aux_height)
 
-def quick_sort(draw_info, ascending=True):
-    lst = draw_info.lst
-    comparisons = 0
-    swaps = 0
-    
-    def partition(arr, low, high):
-        nonlocal comparisons, swaps
-        pivot = arr[high]
-        i = low - 1
-        
-        for j in range(low, high):
-            comparisons += 1
-            if (arr[j] <= pivot and ascending) or (arr[j] >= pivot and not ascending):
-                i += 1
-                arr[i], arr[j] = arr[j], arr[i]
-                swaps += 1
-                draw_list(draw_info, {i: draw_info.HIGHLIGHT1, j: draw_info.HIGHLIGHT2, high: draw_info.PIVOT}, True)
-                yield comparisons, swaps
-                
-        arr[i + 1], arr[high] = arr[high], arr[i + 1]
-        swaps += 1
-        draw_list(draw_info, {i + 1: draw_info.HIGHLIGHT1, high: draw_info.HIGHLIGHT2}, True)
-        yield comparisons, swaps
-        return i + 1  # Return pivot index via generator's StopIteration
-    
-    def quick_sort_helper(arr, low, high):
-        if low < high:
-            # Create partition generator
-            partition_gen = partition(arr, low, high)
-            
-            # Process partition steps and get pivot index
-            try:
-                while True:
-                    comp_swaps = next(partition_gen)
-                    yield comp_swaps  # Yield comparison/swap counts
-            except StopIteration as e:
-                pivot_index = e.value  # Get pivot index from generator return
-
-            # Recursively sort left and right partitions
-            yield from quick_sort_helper(arr, low, pivot_index - 1)
-            yield from quick_sort_helper(arr, pivot_index + 1, high)
-    
-    # Start the sorting process
-    yield from quick_sort_helper(lst, 0, len(lst) - 1)
-    return lst
+    def seek_to(self, x):
+        """Jump to the position under column x of the track"""
+        track = self.track
+        fraction = min(max((x - track.x) / track.width, 0), 1)
+        self.seek(round(fraction * len(self.recording)))
 
+    def draw(self):
+        """Draw the track, filled up to the position, and return its rect"""
+        info = self.draw_info
+        track = self.track
+        strip = track.inflate(12, 8)
+        pygame.draw.rect(info.window, info.BACKGROUND_COLOR, strip)
+        pygame.draw.rect(info.window, info.GRADIENTS[2], track)
+        x = track.x + track.width * self.position // max(1, len(self.recording))
+        pygame.draw.rect(info.window, info.PIVOT, (track.x, track.y, x - track.x, track.height))
+        pygame.draw.rect(info.window, info.PIVOT, (x - 3, strip.y, 6, strip.height))
+        return strip
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Sorting Algorithm Visualizer")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record sorting hooks as Chrome trace-event JSON to FILE on exit")
+    parser.add_argument("--recording", metavar="FILE", default=RECORDING_FILE,
+                        help=f"file Ctrl+S saves the last sort's recording to and Ctrl+O loads it from (default: {RECORDING_FILE})")
+    args = parser.parse_args()
+    if args.trace:
+        listener = hooks.attach(ChromeTraceListener(SORT_HOOKS, "Sorting Visualizer"))
+
     # Initial setup
     run = True
     clock = pygame.time.Clock()
@@ -374,52 +910,150 @@ def main():
     n = 50
     min_val = 0
     max_val = 100
+    large = False  # Large-array mode uses LARGE_SIZES and compact int buffers
+    large_index = 1
     
     # Algorithm state
     sorting = False
+    finishing = False  # F was pressed: the sort runs to the end without drawing its steps
     ascending = True
-    speed = 1.0
-    comparisons = 0
-    swaps = 0
+    speed_index = DEFAULT_SPEED
+    speed = SPEEDS[speed_index]
+    pending_ops = 0.0  # Fractional speeds carry the remainder to the next frame
+    counter = OpCounter()
+    tally = None  # Exact counts of the last run on a CountingArray, if it ran on one
+    k = (n + 1) // 2  # Elements the selection algorithms look for, the median at first
+    lineup = []  # Algorithms picked for the next race
+    panes = []  # One per entrant in race mode, else empty
+    recording = None  # Ops of the running sort, when it can be played back
+    playback = None  # Of the last sort's recording, once finished
+    scrubbing = False  # Dragging along the playback track
+    dirty = False  # Whether the idle frame shows an older state than the one to draw
+    idle = IdleMeter()  # CPU used while waiting for input
 
     # Distribution options
-    distributions = ["Random", "Nearly Sorted", "Reversed"]
+    distributions = list(DISTRIBUTIONS)
     current_distribution = 0
     
+    def new_list():
+        distribution = distributions[current_distribution]
+        if large:
+            return generate_array(distribution, LARGE_SIZES[large_index], 0, LARGE_MAX_VAL)
+        return generate_list(distribution, n, min_val, max_val)
+
     # Generate initial list
-    lst = generate_starting_list(n, min_val, max_val)
+    lst = new_list()
     draw_info = DrawInformation(1200, 760, lst)  # Increased window size for better layout
     
     # Algorithm selection
-    sorting_algorithms = {
-        "Bubble Sort": bubble_sort,
-        "Insertion Sort": insertion_sort,
-        "Quick Sort": quick_sort,
-        "Merge Sort": merge_sort,
-        "Selection Sort": selection_sort
-    }
+    sorting_algorithms = dict(ALGORITHMS)
     sorting_algo_name = "Bubble Sort"
     sorting_algorithm = sorting_algorithms[sorting_algo_name]
     sorting_algorithm_generator = None
+    algorithm_options = {name: {option: values[0] for option, values in choices.items()}
+                         for name, choices in OPTIONS.items()}
+    renderer = OpRenderer(draw_info)
+
+    # Render at most once per display refresh
+    try:
+        fps = pygame.display.get_current_refresh_rate() or 60
+    except (AttributeError, pygame.error):
+        fps = 60
+
+    # Report how long it took from process start to the first frame
+    draw(draw_info, sorting_algo_name, ascending, speed, counter, distributions[current_distribution],
+         algorithm_options.get(sorting_algo_name), tally, min(k, len(draw_info.lst)), panes, playback)
+    print(f"Time to first frame: {(time.perf_counter() - STARTUP_TIME) * 1000:.1f} ms")
 
     while run:
-        # Adjust speed dynamically
-        clock.tick(60 * speed)
-
-        if sorting:
-            try:
-                result = next(sorting_algorithm_generator)
-                if isinstance(result, tuple) and len(result) == 2:
-                    comparisons, swaps = result
-            except StopIteration:
-                sorting = False
-        else:
-            draw(draw_info, sorting_algo_name, ascending, speed, comparisons, swaps, distributions[current_distribution])
+        clock.tick(fps)
 
-        # Event handling
-        for event in pygame.event.get():
+        if sorting and panes:
+            # Every entrant replays the same number of operations per frame
+            pending_ops += speed
+            steps = int(pending_ops)
+            pending_ops -= steps
+            finished = [pane for pane in panes if pane.generator is not None and not pane.step(steps)]
+            rank(panes, finished)
+            if steps or finished:
+                for pane in panes:
+                    pane.renderer.draw()
+                    pygame.display.update(pane.draw_label())
+            sorting = any(pane.generator is not None for pane in panes)
+        elif sorting and finishing:
+            # Finish in slices, reading events between them so the window stays responsive
+            deadline = time.perf_counter() + FINISH_SLICE
+            sorting = advance(sorting_algorithm_generator, sys.maxsize, counter, None, deadline,
+                              recording.record if recording is not None else None)
+            if sorting:
+                text = metrics_text(draw_info, sorting_algo_name, counter, tally)
+                pygame.display.update(draw_metrics(draw_info, text))
+            else:
+                finishing = False
+                draw_info.active = None  # Its RANGE ops were not drawn
+                if recording is not None:
+                    playback = Playback(draw_info, recording, counter)
+        elif sorting:
+            # Run as many operations as the speed allows, then draw one frame
+            pending_ops += speed
+            steps = int(pending_ops)
+            pending_ops -= steps
+            deadline = time.perf_counter() + FRAME_BUDGET / fps
+            sorting = advance(sorting_algorithm_generator, steps, counter, renderer, deadline,
+                              recording.record if recording is not None else None)
+            if not sorting and recording is not None:
+                playback = Playback(draw_info, recording, counter)
+            if steps:
+                if renderer is not None:
+                    renderer.draw()
+                else:
+                    draw_list(draw_info, clear_bg=True)
+                    if draw_info.aux_height:
+                        pygame.display.update(draw_aux(draw_info))
+        elif playback and playback.direction:
+            # Play the recording at the same speed, drawing each frame's ops like a sort's
+            pending_ops += speed
+            steps = int(pending_ops)
+            pending_ops -= steps
+            if steps:
+                if playback.direction > 0:
+                    moving = playback.forward(steps)
+                else:
+                    moving = playback.backward(steps)
+                if not moving:
+                    playback.direction = 0
+                playback.renderer.draw()
+                text = metrics_text(draw_info, sorting_algo_name, counter, tally, playback)
+                pygame.display.update([playback.draw(), draw_metrics(draw_info, text)])
+        elif dirty:
+            if panes and panes[0].source is not draw_info.lst:
+                panes = race_panes(draw_info, [pane.name for pane in panes])  # Race the new input
+            draw(draw_info, sorting_algo_name, ascending, speed, counter, distributions[current_distribution],
+                 algorithm_options.get(sorting_algo_name), tally, min(k, len(draw_info.lst)), panes, playback)
+            dirty = False
+
+        # Event handling. While nothing moves, sleep until the next event instead of redrawing
+        events = pygame.event.get()
+        if sorting or (playback and playback.direction):
+            dirty = True  # Draw the whole frame once it stops
+        elif not events and not dirty:
+            with idle:
+                events = [pygame.event.wait(IDLE_TIMEOUT)]
+        for event in events:
             if event.type == pygame.QUIT:
                 run = False
+            if event.type not in (pygame.NOEVENT, pygame.MOUSEMOTION) or scrubbing:
+                dirty = True
+
+            # Click or drag along the playback track to seek
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                scrubbing = bool(playback) and playback.hit(event.pos)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                scrubbing = False
+            if scrubbing and playback and event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                playback.direction = 0
+                playback.seek_to(event.pos[0])
+                tally = None
 
             if event.type != pygame.KEYDOWN:
                 continue
@@ -427,102 +1061,256 @@ def main():
             # Reset list
             if event.key == pygame.K_r:
                 sorting = False
-                if distributions[current_distribution] == "Random":
-                    lst = generate_starting_list(n, min_val, max_val)
-                elif distributions[current_distribution] == "Nearly Sorted":
-                    lst = generate_nearly_sorted_list(n, min_val, max_val)
-                else:  # Reversed
-                    lst = generate_reversed_list(n, min_val, max_val)
+                lst = new_list()
                 draw_info.set_list(lst)
-                comparisons = 0
-                swaps = 0
+                counter, tally = OpCounter(), None
+                playback = None
             
+            # Start a race, each entrant in its own worker process
+            elif event.key == pygame.K_SPACE and not sorting and panes:
+                sorting = True
+                pending_ops = 0.0
+                panes = race_panes(draw_info, [pane.name for pane in panes])
+                entrants = []
+                for pane in panes:
+                    options = dict(algorithm_options.get(pane.name, {}))
+                    if pane.name in SELECTION:
+                        options["k"] = min(k, len(draw_info.lst))
+                    entrants.append((pane.name, options))
+                race = Race(entrants, list(draw_info.lst), ascending)
+                playback = None
+                for index, pane in enumerate(panes):
+                    pane.start(race, index)
+
             # Start sorting
             elif event.key == pygame.K_SPACE and not sorting:
                 sorting = True
-                sorting_algorithm_generator = sorting_algorithm(draw_info, ascending)
+                finishing = False
+                counter, tally = OpCounter(), None
+                # Large arrays are redrawn whole each frame, so skip tracking ops
+                renderer = None if draw_info.large else OpRenderer(draw_info)
+                # Count exact element traffic on animated sizes, where the wrapper's cost does not show.
+                # Networks, parallel and external sorts work outside Python or the array, so they keep the op counts.
+                arr = draw_info.lst
+                if not draw_info.large and sorting_algo_name not in NETWORKS | PARALLEL | EXTERNAL:
+                    tally = Tally()
+                    arr = CountingArray(arr, tally)
+                pending_ops = 0.0
+                options = dict(algorithm_options.get(sorting_algo_name, {}))
+                del draw_info.owners[:]
+                del draw_info.runs[:]
+                draw_info.stats.clear()
+                draw_info.active = None
+                if sorting_algo_name in NON_COMPARISON:
+                    del draw_info.aux[:]
+                    options["aux"] = draw_info.aux if tally is None else CountingArray(draw_info.aux, tally, auxiliary=True)
+                elif sorting_algo_name in PARALLEL:
+                    options["owners"] = draw_info.owners
+                    options["stats"] = draw_info.stats
+                elif sorting_algo_name in EXTERNAL:
+                    options["owners"] = draw_info.owners
+                    options["runs"] = draw_info.runs
+                    options["stats"] = draw_info.stats
+                elif sorting_algo_name in SELECTION:
+                    options["k"] = min(k, len(draw_info.lst))
+                    draw_info.stats["reference"] = run_headless(REFERENCE_SORT, copy(draw_info.lst),
+                                                                ascending).comparisons
+                # Record the ops of sorts that can be replayed, for stepping back and forth once finished
+                recording, playback = None, None
+                if renderer is not None and sorting_algo_name in REPLAYABLE:
+                    shown = {option: value for option, value in options.items() if option != "aux"}
+                    recording = Recording(draw_info.lst, sorting_algo_name, ascending, shown)
+                sorting_algorithm_generator = sorting_algorithm(arr, ascending, **options)
             
             # Change sort direction
             elif event.key == pygame.K_a and not sorting:
                 ascending = True
+                playback = None
             elif event.key == pygame.K_d and not sorting:
                 ascending = False
-            
-            # Change algorithm
-            elif event.key == pygame.K_i and not sorting:
-                sorting_algo_name = "Insertion Sort"
-                sorting_algorithm = sorting_algorithms[sorting_algo_name]
-                comparisons = 0
-                swaps = 0
-            elif event.key == pygame.K_b and not sorting:
-                sorting_algo_name = "Bubble Sort"
-                sorting_algorithm = sorting_algorithms[sorting_algo_name]
-                comparisons = 0
-                swaps = 0
-            elif event.key == pygame.K_q and not sorting:
-                sorting_algo_name = "Quick Sort"
-                sorting_algorithm = sorting_algorithms[sorting_algo_name]
-                comparisons = 0
-                swaps = 0
-            elif event.key == pygame.K_m and not sorting:
-                sorting_algo_name = "Merge Sort"
+                playback = None
+
+            # Save the last sort's recording, or load one to play back from the start
+            elif event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL and not sorting:
+                if playback:
+                    playback.recording.save(args.recording)
+                    print(f"Recording saved to {args.recording}")
+                else:
+                    print("Nothing to save: only finished sorts of animated arrays are recorded")
+            elif event.key == pygame.K_o and event.mod & pygame.KMOD_CTRL and not sorting:
+                if panes:
+                    print("Recordings cannot be loaded during a race")
+                    continue
+                try:
+                    loaded = Recording.load(args.recording)
+                except (OSError, ValueError, KeyError) as error:
+                    print(f"Could not load {args.recording}: {error}")
+                    continue
+                if loaded.algorithm not in REPLAYABLE:
+                    print(f"Could not load {args.recording}: {loaded.algorithm!r} cannot be played back")
+                    continue
+                sorting_algo_name = loaded.algorithm
                 sorting_algorithm = sorting_algorithms[sorting_algo_name]
-                comparisons = 0
-                swaps = 0
-            elif event.key == pygame.K_s and not sorting:
-                sorting_algo_name = "Selection Sort"
+                ascending = loaded.ascending
+                options = dict(loaded.options)
+                k = options.pop("k", k)
+                algorithm_options.get(sorting_algo_name, {}).update(options)
+                draw_info.show_aux(sorting_algo_name in NON_COMPARISON | EXTERNAL)
+                lst = loaded.initial.tolist()
+                draw_info.set_list(lst)
+                counter, tally = OpCounter(), None
+                playback = Playback(draw_info, loaded, counter)
+                playback.seek(0)
+                print(f"Recording loaded from {args.recording}: {sorting_algo_name}, {len(loaded):,} ops")
+
+            # Step through the last sort's recording, play it either way, or jump to either end
+            elif event.key in (pygame.K_LEFT, pygame.K_RIGHT) and playback:
+                playback.direction = 0
+                if event.key == pygame.K_LEFT:
+                    playback.backward(max(1, int(speed)))
+                else:
+                    playback.forward(max(1, int(speed)))
+                tally = None
+            elif event.key in (pygame.K_UP, pygame.K_DOWN) and playback:
+                direction = 1 if event.key == pygame.K_UP else -1
+                if playback.direction == direction:
+                    playback.direction = 0
+                else:
+                    # Play again from the far end when already at this one
+                    if direction > 0 and playback.position == len(playback.recording):
+                        playback.seek(0)
+                    elif direction < 0 and playback.position == 0:
+                        playback.seek(len(playback.recording))
+                    playback.direction = direction
+                    pending_ops = 0.0
+                tally = None
+            elif event.key in (pygame.K_HOME, pygame.K_END) and playback:
+                playback.direction = 0
+                playback.seek(0 if event.key == pygame.K_HOME else len(playback.recording))
+                tally = None
+
+            # Change algorithm
+            elif event.key in ALGORITHM_KEYS and not sorting:
+                sorting_algo_name = ALGORITHM_KEYS[event.key]
                 sorting_algorithm = sorting_algorithms[sorting_algo_name]
-                comparisons = 0
-                swaps = 0
+                counter, tally = OpCounter(), None
+                playback = None
+                draw_info.active = None
+                draw_info.show_aux(sorting_algo_name in NON_COMPARISON | EXTERNAL)
+
+            # Cycle an option of the selected algorithm
+            elif event.key in OPTION_KEYS and not sorting and sorting_algo_name in OPTIONS:
+                choices = list(OPTIONS[sorting_algo_name].items())
+                index = OPTION_KEYS.index(event.key)
+                if index < len(choices):
+                    option, values = choices[index]
+                    current = algorithm_options[sorting_algo_name]
+                    current[option] = values[(values.index(current[option]) + 1) % len(values)]
+                    counter, tally = OpCounter(), None
+                    playback = None
             
+            # Finish the running sort instantly, without drawing the steps
+            elif event.key == pygame.K_f and sorting and panes:
+                finished = [pane for pane in panes if pane.generator is not None]
+                for pane in finished:
+                    pane.finish()
+                rank(panes, finished)
+                sorting = False
+            elif event.key == pygame.K_f and sorting:
+                finishing = True  # The main loop runs the rest a slice at a time
+
+            # Stop the running sort where it is
+            elif event.key == pygame.K_ESCAPE and sorting and not panes:
+                sorting = finishing = False
+                draw_info.active = None
+                recording = None
+
             # Adjust speed
-            elif event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS:
-                speed = min(10.0, speed + 0.5)
+            elif event.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS):
+                speed_index = min(len(SPEEDS) - 1, speed_index + 1)
+                speed = SPEEDS[speed_index]
             elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
-                speed = max(0.1, speed - 0.5)
+                speed_index = max(0, speed_index - 1)
+                speed = SPEEDS[speed_index]
             
             # Adjust array size
             elif event.key == pygame.K_LEFTBRACKET and not sorting:
-                n = max(10, n - 10)
-                if distributions[current_distribution] == "Random":
-                    lst = generate_starting_list(n, min_val, max_val)
-                elif distributions[current_distribution] == "Nearly Sorted":
-                    lst = generate_nearly_sorted_list(n, min_val, max_val)
-                else:  # Reversed
-                    lst = generate_reversed_list(n, min_val, max_val)
+                if large:
+                    large_index = max(0, large_index - 1)
+                else:
+                    n = max(10, n - 10)
+                lst = new_list()
                 draw_info.set_list(lst)
-                comparisons = 0
-                swaps = 0
+                counter, tally = OpCounter(), None
+                playback = None
             elif event.key == pygame.K_RIGHTBRACKET and not sorting:
-                n = min(300, n + 10)
-                if distributions[current_distribution] == "Random":
-                    lst = generate_starting_list(n, min_val, max_val)
-                elif distributions[current_distribution] == "Nearly Sorted":
-                    lst = generate_nearly_sorted_list(n, min_val, max_val)
-                else:  # Reversed
-                    lst = generate_reversed_list(n, min_val, max_val)
+                if large:
+                    large_index = min(len(LARGE_SIZES) - 1, large_index + 1)
+                else:
+                    n = min(300, n + 10)
+                lst = new_list()
+                draw_info.set_list(lst)
+                counter, tally = OpCounter(), None
+                playback = None
+
+            # Adjust k of the selection algorithms
+            elif event.key in (pygame.K_COMMA, pygame.K_PERIOD) and not sorting:
+                step = max(1, len(draw_info.lst) // 50)
+                if event.key == pygame.K_COMMA:
+                    k = max(1, min(k, len(draw_info.lst)) - step)
+                else:
+                    k = min(len(draw_info.lst), k + step)
+                counter, tally = OpCounter(), None
+                playback = None
+                draw_info.stats.clear()
+                draw_info.active = None
+            
+            # Enter or leave race mode, racing the picked algorithms or a default lineup
+            elif event.key == pygame.K_TAB and not sorting and not large:
+                playback = None
+                if panes:
+                    panes = []
+                else:
+                    panes = race_panes(draw_info, lineup if len(lineup) >= 2 else RACE_LINEUP)
+
+            # Add the selected algorithm to the race, or take it out
+            elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER) and not sorting and sorting_algo_name in REPLAYABLE:
+                if sorting_algo_name in lineup:
+                    lineup.remove(sorting_algo_name)
+                elif len(lineup) < MAX_ENTRANTS:
+                    lineup.append(sorting_algo_name)
+                if panes and len(lineup) >= 2:
+                    panes = race_panes(draw_info, lineup)
+
+            # Toggle large-array mode
+            elif event.key == pygame.K_l and not sorting and not panes:
+                large = not large
+                speed_index = LARGE_SPEED if large else DEFAULT_SPEED
+                speed = SPEEDS[speed_index]
+                lst = new_list()
                 draw_info.set_list(lst)
-                comparisons = 0
-                swaps = 0
+                counter, tally = OpCounter(), None
+                playback = None
             
             # Change distribution
             elif event.key == pygame.K_p and not sorting:
                 current_distribution = (current_distribution + 1) % len(distributions)
-                if distributions[current_distribution] == "Random":
-                    lst = generate_starting_list(n, min_val, max_val)
-                elif distributions[current_distribution] == "Nearly Sorted":
-                    lst = generate_nearly_sorted_list(n, min_val, max_val)
-                else:  # Reversed
-                    lst = generate_reversed_list(n, min_val, max_val)
+                lst = new_list()
                 draw_info.set_list(lst)
-                comparisons = 0
-                swaps = 0
+                counter, tally = OpCounter(), None
+                playback = None
             
             # Change theme
             elif event.key == pygame.K_t and not sorting:
                 draw_info.next_theme()
+                for pane in panes:
+                    pane.draw_info.set_theme(draw_info.current_theme)
 
     pygame.quit()
+    print(idle.report())
+    if args.trace:
+        listener.save(args.trace)
+        print(f"Trace written to {args.trace}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,1028 @@
+"""Sorting algorithms written against the operation stream in operations.py
+
+Each algorithm takes a mutable sequence and a sort direction, sorts the
+sequence in place and yields an op tuple after every compare, swap, write or
+pivot choice, and for the non-comparison sorts every read and counter update.
+The selection algorithms only order the array as far as it takes to find its
+k smallest elements, and yield a RANGE op as they narrow the search.
+None of them import pygame, so they can run headless at full speed.
+"""
+import math
+import random
+from copy import copy
+from functools import partial
+
+import external
+import networks
+import parallel
+from counting import CountingArray
+from operations import COMPARE, SWAP, WRITE, PIVOT, READ, AUX, RANGE
+
+PIVOT_STRATEGIES = ("last", "median-of-3", "ninther", "random")
+NINTHER_THRESHOLD = 40  # Smaller partitions use median-of-three instead
+SHELL_GAPS = ("ciura", "sedgewick")
+MIN_GALLOP = 7  # Wins in a row after which merge_runs() switches to galloping
+RADIX_BASES = (10, 2, 16, 256)
+BUCKET_SIZE = 8  # Average values per bucket in bucket_sort
+LOCAL_SCAN = 3  # Places natural_merge_sort scans back for a misplaced element before binary search
+
+
+def out_of_order(ascending, arr=None):
+    """Return f(a, b) that is true when a must come after b
+
+    When arr is a CountingArray, every call counts as a comparison on its tally.
+    """
+    after = (lambda a, b: a > b) if ascending else (lambda a, b: a < b)
+    if isinstance(arr, CountingArray):
+        return arr.tally.counted(after)
+    return after
+
+
+def bubble_sort(arr, ascending=True):
+    after = out_of_order(ascending, arr)
+    n = len(arr)
+
+    for i in range(n - 1):
+        for j in range(n - 1 - i):
+            yield (COMPARE, j, j + 1)
+            if after(arr[j], arr[j + 1]):
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                yield (SWAP, j, j + 1)
+
+
+def insertion_sort(arr, ascending=True):
+    yield from insertion_sort_range(arr, out_of_order(ascending, arr), 0, len(arr) - 1)
+
+
+def insertion_sort_range(arr, after, low, high):
+    """Insertion sort of arr[low..high]"""
+    for i in range(low + 1, high + 1):
+        current = arr[i]
+        j = i
+
+        while j > low:
+            yield (COMPARE, j - 1, j)
+            if not after(arr[j - 1], current):
+                break
+            value = arr[j - 1]
+            arr[j] = value
+            yield (WRITE, j, value)
+            j -= 1
+
+        if j != i:
+            arr[j] = current
+            yield (WRITE, j, current)
+
+
+def selection_sort(arr, ascending=True):
+    after = out_of_order(ascending, arr)
+    n = len(arr)
+
+    for i in range(n):
+        min_idx = i
+
+        for j in range(i + 1, n):
+            yield (COMPARE, j, min_idx)
+            if after(arr[min_idx], arr[j]):
+                min_idx = j
+
+        if i != min_idx:
+            arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            yield (SWAP, i, min_idx)
+
+
+def merge(arr, temp, after, left, mid, right):
+    """Merge the sorted runs arr[left..mid] and arr[mid+1..right] through temp"""
+    i = left      # Starting index of left subarray
+    j = mid + 1   # Starting index of right subarray
+    k = left      # Starting index of merged subarray
+
+    while i <= mid and j <= right:
+        yield (COMPARE, i, j)
+        if not after(arr[i], arr[j]):
+            temp[k] = arr[i]
+            i += 1
+        else:
+            temp[k] = arr[j]
+            j += 1
+        k += 1
+
+    # Copy remaining elements
+    while i <= mid:
+        temp[k] = arr[i]
+        i += 1
+        k += 1
+
+    while j <= right:
+        temp[k] = arr[j]
+        j += 1
+        k += 1
+
+    # Copy back to original array
+    for i in range(left, right + 1):
+        value = temp[i]
+        arr[i] = value
+        yield (WRITE, i, value)
+
+
+def merge_sort(arr, ascending=True):
+    after = out_of_order(ascending, arr)
+    temp = copy(arr)
+
+    # Explicit stack of (left, right, halves_sorted) in place of recursion, so
+    # every step resumes at most two frames however deep the split goes
+    stack = [(0, len(arr) - 1, False)]
+    while stack:
+        left, right, halves_sorted = stack.pop()
+        if left >= right:
+            continue
+        mid = (left + right) // 2
+        if halves_sorted:
+            yield from merge(arr, temp, after, left, mid, right)
+        else:
+            # Popped in reverse: sort the first half, then the second, then merge
+            stack.append((left, right, True))
+            stack.append((mid + 1, right, False))
+            stack.append((left, mid, False))
+
+
+def bottom_up_merge_sort(arr, ascending=True):
+    after = out_of_order(ascending, arr)
+    temp = copy(arr)
+    n = len(arr)
+
+    # Merge neighbouring runs of width 1, 2, 4, ... with no splitting phase at all
+    width = 1
+    while width < n:
+        for left in range(0, n - width, 2 * width):
+            mid = left + width - 1
+            right = min(left + 2 * width - 1, n - 1)
+            yield from merge(arr, temp, after, left, mid, right)
+        width *= 2
+
+
+def heap_sort_range(arr, after, low, high):
+    """Heapsort of arr[low..high]: build a heap, then move its top to the end"""
+    n = high - low + 1
+    start = n // 2
+    end = n
+
+    # One loop for both phases: while building, sift down each parent in turn;
+    # after that, swap the top behind the heap and sift the new root down
+    while True:
+        if start > 0:
+            start -= 1
+        else:
+            end -= 1
+            if end <= 0:
+                return
+            arr[low], arr[low + end] = arr[low + end], arr[low]
+            yield (SWAP, low, low + end)
+
+        root = start
+        while True:
+            child = 2 * root + 1
+            if child >= end:
+                break
+            if child + 1 < end:
+                yield (COMPARE, low + child, low + child + 1)
+                if after(arr[low + child + 1], arr[low + child]):
+                    child += 1
+            yield (COMPARE, low + root, low + child)
+            if not after(arr[low + child], arr[low + root]):
+                break
+            arr[low + root], arr[low + child] = arr[low + child], arr[low + root]
+            yield (SWAP, low + root, low + child)
+            root = child
+
+
+def median_of_three(arr, after, a, b, c):
+    """Index of the median of arr[a], arr[b] and arr[c], in at most three comparisons"""
+    yield (COMPARE, a, b)
+    if after(arr[a], arr[b]):
+        a, b = b, a
+    yield (COMPARE, b, c)
+    if not after(arr[b], arr[c]):
+        return b
+    yield (COMPARE, a, c)
+    return c if after(arr[c], arr[a]) else a
+
+
+def choose_pivot(arr, after, low, high, strategy):
+    """Index of the pivot for arr[low..high] under one of PIVOT_STRATEGIES"""
+    size = high - low + 1
+    if strategy == "random":
+        return random.randint(low, high)
+    if strategy == "last" or size < 3:
+        return high
+    mid = (low + high) // 2
+    if strategy == "ninther" and size >= NINTHER_THRESHOLD:
+        # Tukey's ninther: the median of the medians of three spread-out triples
+        step = size // 8
+        a = yield from median_of_three(arr, after, low, low + step, low + 2 * step)
+        b = yield from median_of_three(arr, after, mid - step, mid, mid + step)
+        c = yield from median_of_three(arr, after, high - 2 * step, high - step, high)
+        return (yield from median_of_three(arr, after, a, b, c))
+    return (yield from median_of_three(arr, after, low, mid, high))
+
+
+def quick_sort(arr, ascending=True, pivot="last", three_way=False, introsort=False, cutoff=0):
+    """Quicksort with a choice of pivot strategy and partitioning scheme
+
+    three_way switches Lomuto partitioning for Dijkstra's Dutch-flag scheme,
+    which gathers every key equal to the pivot in the middle and never
+    revisits them. introsort hands a partition to heapsort once the splits
+    have gone 2*log2(n) levels deep, bounding the worst case at O(n log n).
+    Partitions of at most `cutoff` elements are finished by insertion sort.
+    The defaults are plain Lomuto quicksort pivoting on the last element.
+    """
+    after = out_of_order(ascending, arr)
+    depth_limit = 2 * int(math.log2(len(arr))) if introsort and len(arr) > 1 else -1
+
+    # Explicit stack of partitions still to sort, so a degenerate split costs a
+    # list entry rather than a nested generator frame
+    stack = [(0, len(arr) - 1, depth_limit)]
+    while stack:
+        low, high, depth = stack.pop()
+        if low >= high:
+            continue
+        if high - low < cutoff:
+            yield from insertion_sort_range(arr, after, low, high)
+            continue
+        if depth == 0:
+            yield from heap_sort_range(arr, after, low, high)
+            continue
+
+        p = high
+        if pivot != "last":
+            p = yield from choose_pivot(arr, after, low, high, pivot)
+
+        if three_way:
+            lt, gt = yield from partition_three_way(arr, after, low, high, p)
+            left_end, right_start = lt - 1, gt + 1
+        else:
+            # Lomuto partition around arr[high]
+            if p != high:
+                arr[p], arr[high] = arr[high], arr[p]
+                yield (SWAP, p, high)
+            value = arr[high]
+            yield (PIVOT, high, -1)
+            i = low - 1
+
+            for j in range(low, high):
+                yield (COMPARE, j, high)
+                if not after(arr[j], value):
+                    i += 1
+                    arr[i], arr[j] = arr[j], arr[i]
+                    yield (SWAP, i, j)
+
+            pivot_index = i + 1
+            arr[pivot_index], arr[high] = arr[high], arr[pivot_index]
+            yield (SWAP, pivot_index, high)
+            yield (PIVOT, -1, -1)
+            left_end, right_start = pivot_index - 1, pivot_index + 1
+
+        # Popped in reverse: the left side is sorted first, as in the recursive form
+        stack.append((right_start, high, depth - 1))
+        stack.append((low, left_end, depth - 1))
+
+
+def heap_sort(arr, ascending=True):
+    yield from heap_sort_range(arr, out_of_order(ascending, arr), 0, len(arr) - 1)
+
+
+def shell_gaps(n, sequence):
+    """Gaps below n from one of SHELL_GAPS, largest first"""
+    if sequence == "sedgewick":
+        # Sedgewick (1986): 1, 8, 23, 77, 281, ... = 4^k + 3*2^(k-1) + 1
+        gaps = [1]
+        k = 1
+        while 4 ** k + 3 * 2 ** (k - 1) + 1 < n:
+            gaps.append(4 ** k + 3 * 2 ** (k - 1) + 1)
+            k += 1
+    else:
+        # Ciura (2001), measured up to 1750 and extended by a factor of 2.25
+        gaps = [1, 4, 10, 23, 57, 132, 301, 701, 1750]
+        while gaps[-1] < n:
+            gaps.append(int(gaps[-1] * 2.25))
+    return [gap for gap in reversed(gaps) if gap < n] or [1]
+
+
+def shell_sort(arr, ascending=True, gaps="ciura"):
+    after = out_of_order(ascending, arr)
+    n = len(arr)
+
+    # Insertion sort over every gap-th element, for shrinking gaps
+    for gap in shell_gaps(n, gaps):
+        for i in range(gap, n):
+            current = arr[i]
+            j = i
+
+            while j >= gap:
+                yield (COMPARE, j - gap, j)
+                if not after(arr[j - gap], current):
+                    break
+                value = arr[j - gap]
+                arr[j] = value
+                yield (WRITE, j, value)
+                j -= gap
+
+            if j != i:
+                arr[j] = current
+                yield (WRITE, j, current)
+
+
+def comb_sort(arr, ascending=True):
+    after = out_of_order(ascending, arr)
+    n = len(arr)
+    gap = n
+    done = False
+
+    # Bubble sort over a gap that shrinks by 1.3 each pass, ending with plain
+    # bubble passes until one makes no swap
+    while not done:
+        gap = int(gap / 1.3)
+        if gap <= 1:
+            gap = 1
+            done = True
+        for i in range(n - gap):
+            yield (COMPARE, i, i + gap)
+            if after(arr[i], arr[i + gap]):
+                arr[i], arr[i + gap] = arr[i + gap], arr[i]
+                yield (SWAP, i, i + gap)
+                done = False
+
+
+def gallop(arr, after, key, start, end, inclusive):
+    """How many leading elements of the sorted run arr[start..end] go before arr[key]
+
+    With inclusive=True elements equal to arr[key] count too, as they do when
+    the run comes first. Probes 1, 2, 4, ... elements ahead, then binary
+    searches the last gap, so a count c costs about 2*log2(c) comparisons.
+    """
+    value = arr[key]
+    length = end - start + 1
+    known = 0   # The first `known` elements go before arr[key]
+    probe = 1
+    while probe <= length:
+        yield (COMPARE, start + probe - 1, key)
+        x = arr[start + probe - 1]
+        if after(x, value) if inclusive else not after(value, x):
+            break
+        known = probe
+        probe *= 2
+
+    low, high = known, min(probe - 1, length)
+    while low < high:
+        mid = (low + high) // 2
+        yield (COMPARE, start + mid, key)
+        x = arr[start + mid]
+        if after(x, value) if inclusive else not after(value, x):
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def merge_runs(arr, temp, after, left, mid, right):
+    """Merge the sorted runs arr[left..mid] and arr[mid+1..right], galloping where it pays"""
+    yield (COMPARE, mid, mid + 1)
+    if not after(arr[mid], arr[mid + 1]):
+        return  # Already in order
+
+    # Elements already in their final place at either end are skipped outright
+    left += yield from gallop(arr, after, mid + 1, left, mid, True)
+    if left > mid:
+        return
+    right = mid + (yield from gallop(arr, after, mid, mid + 1, right, False))
+
+    i, j, k = left, mid + 1, left
+    wins = 0  # Consecutive elements taken from the same run (negative for the right one)
+    while i <= mid and j <= right:
+        yield (COMPARE, i, j)
+        if not after(arr[i], arr[j]):
+            temp[k] = arr[i]
+            i += 1
+            wins = wins + 1 if wins > 0 else 1
+        else:
+            temp[k] = arr[j]
+            j += 1
+            wins = wins - 1 if wins < 0 else -1
+        k += 1
+
+        if abs(wins) >= MIN_GALLOP:
+            # One run keeps winning: copy whole stretches of each run found by
+            # galloping, until neither stretch is long enough to be worth it
+            while i <= mid and j <= right:
+                count = yield from gallop(arr, after, j, i, mid, True)
+                temp[k:k + count] = arr[i:i + count]
+                i += count
+                k += count
+                if i > mid:
+                    break
+                other = yield from gallop(arr, after, i, j, right, False)
+                temp[k:k + other] = arr[j:j + other]
+                j += other
+                k += other
+                if count < MIN_GALLOP and other < MIN_GALLOP:
+                    break
+            wins = 0
+
+    # Copy remaining elements
+    temp[k:k + mid + 1 - i] = arr[i:mid + 1]
+    k += mid + 1 - i
+    temp[k:k + right + 1 - j] = arr[j:right + 1]
+
+    # Copy back to original array
+    for i in range(left, right + 1):
+        value = temp[i]
+        arr[i] = value
+        yield (WRITE, i, value)
+
+
+def min_run(n):
+    """Timsort's minimum run length: n / minrun is a power of two or just under"""
+    extra = 0
+    while n >= 64:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+
+def natural_merge_sort(arr, ascending=True):
+    after = out_of_order(ascending, arr)
+    temp = copy(arr)
+    n = len(arr)
+    minimum = min_run(n)
+    runs = []  # (start, length) of the sorted runs not yet merged, left to right
+
+    start = 0
+    while start < n:
+        # A run starting with a strict descent is extended while it keeps
+        # descending and then reversed in place
+        end = start + 1
+        if end < n:
+            yield (COMPARE, start, end)
+            end += 1
+            if after(arr[start], arr[start + 1]):
+                while end < n:
+                    yield (COMPARE, end - 1, end)
+                    if not after(arr[end - 1], arr[end]):
+                        break
+                    end += 1
+                i, j = start, end - 1
+                while i < j:
+                    arr[i], arr[j] = arr[j], arr[i]
+                    yield (SWAP, i, j)
+                    i += 1
+                    j -= 1
+
+        # Grow the run. Elements that continue it cost one comparison; one that
+        # does not is inserted, found by a short scan back or, if it is further
+        # out of place, by binary search. Past the minimum run length, such a
+        # far-off element ends the run instead.
+        while end < n:
+            current = arr[end]
+            yield (COMPARE, end - 1, end)
+            if not after(arr[end - 1], current):
+                end += 1
+                continue
+
+            low = end - 1  # arr[low:end] all go after current
+            near = True
+            while low > start:
+                if end - low >= LOCAL_SCAN:
+                    near = False
+                    break
+                yield (COMPARE, low - 1, end)
+                if not after(arr[low - 1], current):
+                    break
+                low -= 1
+
+            if not near:
+                if end - start >= minimum:
+                    break
+                high, low = low, start
+                while low < high:
+                    mid = (low + high) // 2
+                    yield (COMPARE, mid, end)
+                    if after(arr[mid], current):
+                        high = mid
+                    else:
+                        low = mid + 1
+
+            if low == end - 1:
+                arr[low], arr[end] = arr[end], arr[low]
+                yield (SWAP, low, end)
+            else:
+                for i in range(end, low, -1):
+                    value = arr[i - 1]
+                    arr[i] = value
+                    yield (WRITE, i, value)
+                arr[low] = current
+                yield (WRITE, low, current)
+            end += 1
+
+        runs.append((start, end - start))
+        start = end
+
+        # Merge until the run lengths shrink faster than the Fibonacci numbers
+        # from the top of the stack down, which bounds the stack at O(log n)
+        # runs; once every run is found, merge everything.
+        while len(runs) > 1:
+            i = len(runs) - 2
+            finished = start >= n
+            if ((i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1])
+                    or (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1])):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif finished:
+                if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                break
+            (first, first_length), (_, second_length) = runs[i], runs[i + 1]
+            yield from merge_runs(arr, temp, after, first, first + first_length - 1,
+                                  first + first_length + second_length - 1)
+            runs[i:i + 2] = [(first, first_length + second_length)]
+
+
+def median_k(n, k):
+    """k clamped to 1..n, or the median's rank when k is None"""
+    return (n + 1) // 2 if k is None else min(max(k, 1), n)
+
+
+def partition_three_way(arr, after, low, high, p):
+    """Dutch-flag partition of arr[low..high] around arr[p]; returns (lt, gt), the run equal to it
+
+    Keeps arr[low..lt) < pivot, arr[lt..i) == pivot and arr(gt..high] > pivot.
+    The pivot itself starts the equal block, so arr[lt] always holds its value.
+    """
+    if p != low:
+        arr[low], arr[p] = arr[p], arr[low]
+        yield (SWAP, low, p)
+    value = arr[low]
+    yield (PIVOT, low, -1)
+    lt, i, gt = low, low + 1, high
+    while i <= gt:
+        yield (COMPARE, i, lt)
+        if after(value, arr[i]):
+            arr[lt], arr[i] = arr[i], arr[lt]
+            yield (SWAP, lt, i)
+            lt += 1
+            i += 1
+            continue
+        yield (COMPARE, i, lt)
+        if after(arr[i], value):
+            arr[i], arr[gt] = arr[gt], arr[i]
+            yield (SWAP, i, gt)
+            gt -= 1
+        else:
+            i += 1
+    yield (PIVOT, -1, -1)
+    return lt, gt
+
+
+def median_of_medians_pivot(arr, after, low, high):
+    """Index of a pivot for arr[low..high] with at least 3/10 of the elements on each side
+
+    Sorts each group of five, gathers the groups' medians at the front of
+    the range and selects their median, recursively by the same rule.
+    """
+    if high - low < 5:
+        yield from insertion_sort_range(arr, after, low, high)
+        return (low + high) // 2
+    front = low
+    for start in range(low, high + 1, 5):
+        end = min(start + 4, high)
+        yield from insertion_sort_range(arr, after, start, end)
+        median = (start + end) // 2
+        if median != front:
+            arr[front], arr[median] = arr[median], arr[front]
+            yield (SWAP, front, median)
+        front += 1
+    mid = (low + front - 1) // 2
+    yield from select_range(arr, after, low, front - 1, mid, "median-of-medians")
+    yield (RANGE, low, high)
+    return mid
+
+
+def select_range(arr, after, low, high, target, pivot, introspective=False):
+    """Partition arr[low..high] until arr[target] holds the element a sort would put there
+
+    Only the side holding target is partitioned again. `pivot` is one of
+    PIVOT_STRATEGIES or "median-of-medians". When introspective, the pivots
+    switch to median-of-medians for good as soon as two partitions in a row
+    fail to halve the range, so the ranges shrink geometrically and the whole
+    selection stays O(n).
+    """
+    size = high - low + 1  # Of the range two partitions ago
+    partitions = 0
+    while low < high:
+        yield (RANGE, low, high)
+        if pivot == "median-of-medians":
+            p = yield from median_of_medians_pivot(arr, after, low, high)
+        else:
+            p = yield from choose_pivot(arr, after, low, high, pivot)
+        lt, gt = yield from partition_three_way(arr, after, low, high, p)
+        if target < lt:
+            high = lt - 1
+        elif target > gt:
+            low = gt + 1
+        else:
+            return
+
+        partitions += 1
+        if introspective and partitions == 2:
+            if 2 * (high - low + 1) > size:
+                pivot = "median-of-medians"
+            size = high - low + 1
+            partitions = 0
+
+
+def quickselect(arr, ascending=True, k=None, pivot="last"):
+    """Quickselect: move the k-th smallest element (largest when descending) to index k - 1
+
+    Partitions like quick_sort but only carries on into the side holding
+    index k - 1, about 2n comparisons on average instead of n log n. The
+    elements before it end up no larger and the ones after no smaller. k
+    defaults to the median.
+    """
+    if not arr:
+        return
+    target = median_k(len(arr), k) - 1
+    yield from select_range(arr, out_of_order(ascending, arr), 0, len(arr) - 1, target, pivot)
+    yield (RANGE, target, target)
+
+
+def introselect(arr, ascending=True, k=None, median_of_medians=False):
+    """Quickselect on median-of-3 pivots that falls back to median-of-medians when its ranges stop shrinking
+
+    Musser's rule: once two partitions in a row fail to halve the range, every
+    later pivot is a median of medians, which bounds the worst case at O(n).
+    With median_of_medians every pivot is one from the start (the BFPRT
+    algorithm).
+    """
+    if not arr:
+        return
+    target = median_k(len(arr), k) - 1
+    pivot = "median-of-medians" if median_of_medians else "median-of-3"
+    yield from select_range(arr, out_of_order(ascending, arr), 0, len(arr) - 1, target, pivot, introspective=True)
+    yield (RANGE, target, target)
+
+
+def sift_down(arr, after, low, root, end):
+    """Move arr[low + root] down the heap arr[low..low + end) until neither child goes after it"""
+    while True:
+        child = 2 * root + 1
+        if child >= end:
+            return
+        if child + 1 < end:
+            yield (COMPARE, low + child, low + child + 1)
+            if after(arr[low + child + 1], arr[low + child]):
+                child += 1
+        yield (COMPARE, low + root, low + child)
+        if not after(arr[low + child], arr[low + root]):
+            return
+        arr[low + root], arr[low + child] = arr[low + child], arr[low + root]
+        yield (SWAP, low + root, low + child)
+        root = child
+
+
+def heap_top_k(arr, ascending=True, k=None):
+    """Gather the k smallest elements (largest when descending) at the front, in order
+
+    Keeps them as a max-heap in arr[0:k]: every later element is compared
+    once with the heap's top, and only replaces it when it is smaller, so
+    the scan costs O(n log k) comparisons. The heap is then sorted in
+    O(k log k). k defaults to half the array.
+    """
+    n = len(arr)
+    if n == 0:
+        return
+    k = median_k(n, k)
+    after = out_of_order(ascending, arr)
+    for root in range(k // 2 - 1, -1, -1):
+        yield from sift_down(arr, after, 0, root, k)
+    yield (PIVOT, 0, -1)
+    for i in range(k, n):
+        yield (COMPARE, i, 0)
+        if after(arr[0], arr[i]):
+            arr[0], arr[i] = arr[i], arr[0]
+            yield (SWAP, 0, i)
+            yield from sift_down(arr, after, 0, 0, k)
+    yield (PIVOT, -1, -1)
+    yield (RANGE, 0, k - 1)
+    for end in range(k - 1, 0, -1):
+        arr[0], arr[end] = arr[end], arr[0]
+        yield (SWAP, 0, end)
+        yield from sift_down(arr, after, 0, 0, end)
+
+
+def reset_aux(aux, size):
+    """`size` zeroed counters, held in the caller's aux sequence when one is given
+
+    The visualizer passes its own sequence so it can draw the counters while
+    a non-comparison sort runs; headless runs just get a fresh list.
+    """
+    if aux is None:
+        return [0] * size
+    del aux[:]
+    aux.extend([0] * size)
+    return aux
+
+
+def value_range(arr):
+    """(smallest, largest) value of a non-empty arr, reading every element once
+
+    The bounds are kept with plain comparisons on the values read, which are
+    not counted: the sorts that need them do no element comparisons.
+    """
+    low = high = arr[0]
+    yield (READ, 0, -1)
+    for i in range(1, len(arr)):
+        value = arr[i]
+        yield (READ, i, -1)
+        if value < low:
+            low = value
+        elif value > high:
+            high = value
+    return low, high
+
+
+def counting_sort(arr, ascending=True, aux=None):
+    if not arr:
+        return
+    low, high = yield from value_range(arr)
+
+    # Count each value, then write every value back as often as it was counted
+    counts = reset_aux(aux, high - low + 1)
+    yield (AUX, -1, len(counts))
+    for i in range(len(arr)):
+        k = arr[i] - low
+        yield (READ, i, -1)
+        count = counts[k] + 1
+        counts[k] = count
+        yield (AUX, k, count)
+
+    i = 0
+    for k in (range(len(counts)) if ascending else range(len(counts) - 1, -1, -1)):
+        count = counts[k]
+        while count:
+            arr[i] = k + low
+            yield (WRITE, i, k + low)
+            count -= 1
+            counts[k] = count
+            yield (AUX, k, count)
+            i += 1
+
+
+def lsd_radix_sort(arr, ascending=True, base=10, aux=None):
+    if not arr:
+        return
+    low, high = yield from value_range(arr)
+    temp = copy(arr)
+    n = len(arr)
+
+    # One stable counting pass per digit, least significant first. Descending
+    # order counts each digit as base - 1 - digit.
+    place = 1
+    while place <= high - low:
+        counts = reset_aux(aux, base)
+        yield (AUX, -1, base)
+        for i in range(n):
+            digit = (arr[i] - low) // place % base
+            yield (READ, i, -1)
+            if not ascending:
+                digit = base - 1 - digit
+            count = counts[digit] + 1
+            counts[digit] = count
+            yield (AUX, digit, count)
+
+        # Running totals: counts[d] becomes the end of digit d's block
+        total = 0
+        for digit in range(base):
+            total += counts[digit]
+            counts[digit] = total
+            yield (AUX, digit, total)
+
+        # Fill each block from its end, walking the pass input backwards to stay stable
+        temp[:] = arr
+        for i in range(n - 1, -1, -1):
+            value = temp[i]
+            yield (READ, i, -1)
+            digit = (value - low) // place % base
+            if not ascending:
+                digit = base - 1 - digit
+            count = counts[digit] - 1
+            counts[digit] = count
+            yield (AUX, digit, count)
+            arr[count] = value
+            yield (WRITE, count, value)
+        place *= base
+
+
+def msd_radix_sort(arr, ascending=True, base=10, aux=None):
+    if not arr:
+        return
+    low, high = yield from value_range(arr)
+    temp = copy(arr)
+    place = 1
+    while place * base <= high - low:
+        place *= base
+
+    # Explicit stack of (low, high, place): split a range into one block per
+    # digit at `place`, then split each block on the next digit down
+    stack = [(0, len(arr) - 1, place)]
+    while stack:
+        first, last, place = stack.pop()
+        if first >= last or place == 0:
+            continue
+
+        counts = reset_aux(aux, base)
+        yield (AUX, -1, base)
+        for i in range(first, last + 1):
+            digit = (arr[i] - low) // place % base
+            yield (READ, i, -1)
+            if not ascending:
+                digit = base - 1 - digit
+            count = counts[digit] + 1
+            counts[digit] = count
+            yield (AUX, digit, count)
+
+        # counts[d] becomes the start of digit d's block
+        total = first
+        for digit in range(base):
+            count = counts[digit]
+            counts[digit] = total
+            yield (AUX, digit, total)
+            total += count
+
+        temp[first:last + 1] = arr[first:last + 1]
+        for i in range(first, last + 1):
+            value = temp[i]
+            yield (READ, i, -1)
+            digit = (value - low) // place % base
+            if not ascending:
+                digit = base - 1 - digit
+            spot = counts[digit]
+            arr[spot] = value
+            yield (WRITE, spot, value)
+            counts[digit] = spot + 1
+            yield (AUX, digit, spot + 1)
+
+        # counts[d] is now the end of digit d's block; the first block is popped first
+        for digit in range(base - 1, -1, -1):
+            start = counts[digit - 1] if digit else first
+            stack.append((start, counts[digit] - 1, place // base))
+
+
+def bucket_sort(arr, ascending=True, aux=None):
+    if not arr:
+        return
+    after = out_of_order(ascending, arr)
+    low, high = yield from value_range(arr)
+    n = len(arr)
+
+    # Equal slices of the value range, with BUCKET_SIZE values per bucket on average
+    count = max(1, n // BUCKET_SIZE)
+    sizes = reset_aux(aux, count)
+    yield (AUX, -1, count)
+    buckets = [[] for _ in range(count)]
+    for i in range(n):
+        value = arr[i]
+        yield (READ, i, -1)
+        b = (value - low) * count // (high - low + 1)
+        if not ascending:
+            b = count - 1 - b
+        buckets[b].append(value)
+        size = sizes[b] + 1
+        sizes[b] = size
+        yield (AUX, b, size)
+
+    # Empty the buckets back in order, insertion sorting each one in place
+    i = 0
+    for b, bucket in enumerate(buckets):
+        start = i
+        for value in bucket:
+            arr[i] = value
+            yield (WRITE, i, value)
+            size = sizes[b] - 1
+            sizes[b] = size
+            yield (AUX, b, size)
+            i += 1
+        yield from insertion_sort_range(arr, after, start, i - 1)
+
+
+# Name shown in the visualizer -> algorithm
+ALGORITHMS = {
+    "Bubble Sort": bubble_sort,
+    "Insertion Sort": insertion_sort,
+    "Quick Sort": quick_sort,
+    "Merge Sort": merge_sort,
+    "Bottom-Up Merge Sort": bottom_up_merge_sort,
+    "Selection Sort": selection_sort,
+    "Heap Sort": heap_sort,
+    "Shell Sort": shell_sort,
+    "Comb Sort": comb_sort,
+    "Natural Merge Sort": natural_merge_sort,
+    "Counting Sort": counting_sort,
+    "LSD Radix Sort": lsd_radix_sort,
+    "MSD Radix Sort": msd_radix_sort,
+    "Bucket Sort": bucket_sort,
+}
+
+# Sorting networks, one vectorized compare-exchange per stage (need NumPy)
+NETWORKS = set()
+if networks.np is not None:
+    ALGORITHMS["Bitonic Sort"] = networks.bitonic_sort
+    ALGORITHMS["Odd-Even Merge Sort"] = networks.odd_even_merge_sort
+    NETWORKS.update(("Bitonic Sort", "Odd-Even Merge Sort"))
+
+# Multi-process sorts over shared memory. Each worker runs one of the sorts
+# above on its part, and they accept `owners` and `stats` for the visualizer.
+ALGORITHMS["Parallel Sample Sort"] = partial(parallel.sample_sort,
+                                             local_sort=partial(quick_sort, pivot="median-of-3", introsort=True))
+ALGORITHMS["Parallel Merge Sort"] = partial(parallel.merge_sort, local_sort=merge_sort)
+PARALLEL = {"Parallel Sample Sort", "Parallel Merge Sort"}
+
+# Merge sort through temporary files, holding 1/chunks of the array in memory.
+# It accepts `owners`, `runs` and `stats` for the visualizer.
+ALGORITHMS["External Merge Sort"] = external.merge_sort
+EXTERNAL = {"External Merge Sort"}
+
+# Sorts that count or bucket values instead of comparing them. They accept an
+# `aux` sequence to hold their counters, which the visualizer draws.
+NON_COMPARISON = {"Counting Sort", "LSD Radix Sort", "MSD Radix Sort", "Bucket Sort"}
+
+# Selection algorithms, which accept `k`, the number of smallest elements to find
+ALGORITHMS["Quickselect"] = quickselect
+ALGORITHMS["Introselect"] = introselect
+ALGORITHMS["Heap Top-k"] = heap_top_k
+SELECTION = {"Quickselect", "Introselect", "Heap Top-k"}
+
+# Algorithms whose ops are ints that say everything they change, so a copy of
+# the input can follow them op by op. Networks yield index arrays, and parallel
+# and external sorts report whole blocks.
+REPLAYABLE = {name for name in ALGORITHMS if name not in NETWORKS | PARALLEL | EXTERNAL}
+
+DESCRIPTIONS = {
+    "Bubble Sort": "O(n²) - Simple comparison-based algorithm that repeatedly steps through the list, comparing adjacent elements.",
+    "Insertion Sort": "O(n²) - Builds the final sorted array one item at a time, efficient for small data sets.",
+    "Quick Sort": "O(n log n) average - Divides array around pivot, then sorts each side.",
+    "Merge Sort": "O(n log n) - Divides array, sorts the parts recursively, then merges them.",
+    "Bottom-Up Merge Sort": "O(n log n) - Merges neighbouring runs of width 1, 2, 4, ... without recursing.",
+    "Selection Sort": "O(n²) - Repeatedly finds the minimum element and places it at the beginning.",
+    "Heap Sort": "O(n log n) - Builds a max-heap in place, then repeatedly swaps its top to the end.",
+    "Shell Sort": "About O(n^4/3) - Insertion sort over elements a shrinking gap apart, ending with gap 1.",
+    "Comb Sort": "O(n²) worst, fast in practice - Bubble sort over a gap that shrinks by 1.3 each pass.",
+    "Natural Merge Sort": "O(n log n), O(n) on sorted runs - Timsort-style: merges the runs already in the data, galloping.",
+    "Counting Sort": "O(n + k) - Counts how often each of the k possible values occurs, then writes them back in order.",
+    "LSD Radix Sort": "O(d(n + b)) - Stable counting sort on each base-b digit, least significant digit first.",
+    "MSD Radix Sort": "O(d(n + b)) - Splits by the most significant digit, then splits each block on the next digit.",
+    "Bucket Sort": "O(n) on even spreads - Deals values into buckets of about 8 by value range, then insertion sorts each.",
+    "Bitonic Sort": "O(n log² n) network - log n (log n + 1) / 2 stages of n/2 compare-exchanges that can run in parallel.",
+    "Odd-Even Merge Sort": "O(n log² n) network - Batcher's merging network, same depth as bitonic with fewer comparators.",
+    "Parallel Sample Sort": "O(n log n / p) - Splits by sampled values into one bucket per worker process, then sorts all at once.",
+    "Parallel Merge Sort": "O(n log n / p) - Worker processes sort a block each, then share every merge by splitting its output.",
+    "External Merge Sort": "1 + log_k(runs) passes over a file - Sorts memory-sized chunks into run files, then heap-merges k at a time.",
+    "Quickselect": "O(n) average, O(n²) worst - Partitions like quicksort, but only the side holding the k-th element.",
+    "Introselect": "O(n) worst - Quickselect that switches to median-of-medians pivots once its ranges stop halving.",
+    "Heap Top-k": "O(n log k) - Keeps the k smallest seen in a max-heap, replacing its top with anything smaller.",
+}
+
+# Keyword options an algorithm accepts -> the values the visualizer cycles through.
+# The first value of each is the default.
+OPTIONS = {
+    "Quick Sort": {
+        "pivot": PIVOT_STRATEGIES,
+        "three_way": (False, True),
+        "introsort": (False, True),
+        "cutoff": (0, 16),
+    },
+    "Shell Sort": {
+        "gaps": SHELL_GAPS,
+    },
+    "LSD Radix Sort": {
+        "base": RADIX_BASES,
+    },
+    "MSD Radix Sort": {
+        "base": RADIX_BASES,
+    },
+    "Parallel Sample Sort": {
+        "workers": parallel.WORKER_COUNTS,
+    },
+    "Parallel Merge Sort": {
+        "workers": parallel.WORKER_COUNTS,
+    },
+    "External Merge Sort": {
+        "chunks": external.CHUNK_COUNTS,
+        "fan_in": external.FAN_INS,
+    },
+    "Quickselect": {
+        "pivot": PIVOT_STRATEGIES,
+    },
+    "Introselect": {
+        "median_of_medians": (False, True),
+    },
+}
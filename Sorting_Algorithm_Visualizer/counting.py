@@ -0,0 +1,129 @@
+"""Instrumented sequence and comparator that count a sort's real work
+
+The op stream says what a sort did step by step, but not what each step cost:
+a SWAP reads and writes two elements, a merge copies every element out to a
+buffer and back, and a temporary copy of the input is extra memory that no op
+mentions. Wrapping the input in a CountingArray measures these directly:
+
+    tally = Tally()
+    for op in merge_sort(CountingArray(lst, tally)):
+        pass
+    tally.reads, tally.writes, tally.comparisons, tally.peak_aux
+
+Every element read from or written to the wrapper goes on its tally,
+including slices and iteration. copy() of a wrapper gives an auxiliary
+wrapper over a copy of the data, on the same tally, whose size counts as
+extra memory until it is garbage collected; a sequence passed in as
+auxiliary storage (such as the counters of the non-comparison sorts) counts
+as extra memory as it grows and shrinks. Other containers, such as the
+buckets of bucket sort or the explicit stacks of the sorts, are not seen.
+
+Comparisons are counted by the comparator from tally.counted(), which
+algorithms.out_of_order() uses when it is given a CountingArray.
+
+Every access costs a Python method call, several times slower than a plain
+list, so the visualizer only instruments the array sizes it animates.
+"""
+
+
+class Tally:
+    """Running totals of element accesses, comparisons and extra memory"""
+
+    def __init__(self):
+        """Start with all counts at zero"""
+        self.reads = 0
+        self.writes = 0
+        self.comparisons = 0
+        self.aux = 0       # Elements held in auxiliary arrays right now
+        self.peak_aux = 0  # The most ever held at once
+
+    def allocate(self, size):
+        """Count `size` more elements of auxiliary memory"""
+        self.aux += size
+        if self.aux > self.peak_aux:
+            self.peak_aux = self.aux
+
+    def release(self, size):
+        """Count `size` elements of auxiliary memory as freed"""
+        self.aux -= size
+
+    def counted(self, compare):
+        """Wrap a comparator f(a, b) so that every call counts as a comparison"""
+        def counting(a, b):
+            self.comparisons += 1
+            return compare(a, b)
+        return counting
+
+    def as_dict(self):
+        """Counts keyed by name, e.g. for reports"""
+        return {"reads": self.reads, "writes": self.writes, "comparisons": self.comparisons,
+                "peak_aux": self.peak_aux}
+
+
+class CountingArray:
+    """A mutable sequence that counts every element read and written on a Tally
+
+    Reads and writes go through to `data`, which stays a plain list or array
+    that can be drawn without being counted. With auxiliary=True the
+    elements it holds count as extra memory.
+    """
+
+    def __init__(self, data, tally, auxiliary=False):
+        """Wrap data, counting on tally"""
+        self.data = data
+        self.tally = tally
+        self.auxiliary = auxiliary
+        if auxiliary:
+            tally.allocate(len(data))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        value = self.data[index]
+        self.tally.reads += len(value) if isinstance(index, slice) else 1
+        return value
+
+    def __setitem__(self, index, value):
+        tally = self.tally
+        if isinstance(index, slice):
+            if isinstance(value, CountingArray):
+                value = value[:]
+            size = len(self.data)
+            self.data[index] = value
+            tally.writes += len(value)
+            if self.auxiliary:
+                tally.allocate(len(self.data) - size)  # Slice assignment can resize
+        else:
+            self.data[index] = value
+            tally.writes += 1
+
+    def __delitem__(self, index):
+        size = len(self.data)
+        del self.data[index]
+        if self.auxiliary:
+            self.tally.release(size - len(self.data))
+
+    def __iter__(self):
+        tally = self.tally
+        for value in self.data:
+            tally.reads += 1
+            yield value
+
+    def __copy__(self):
+        data = self[:]  # A new list or array, read element by element
+        self.tally.writes += len(data)
+        return CountingArray(data, self.tally, auxiliary=True)
+
+    def __del__(self):
+        if self.auxiliary:
+            self.tally.release(len(self.data))
+
+    def extend(self, values):
+        """Append values, counting each as a write"""
+        size = len(self.data)
+        self.data.extend(values)
+        added = len(self.data) - size
+        self.tally.writes += added
+        if self.auxiliary:
+            self.tally.allocate(added)
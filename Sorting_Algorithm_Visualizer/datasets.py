@@ -0,0 +1,142 @@
+"""Starting data for the sorts, kept free of pygame so headless tools can use it
+
+With NumPy every distribution is generated in a few vectorized calls from its
+own seeded generator, so a (distribution, n, range, seed) always gives the
+same data, and a million values take milliseconds. load_corpus() caches such
+data as .npy files and memory-maps them, so large benchmark inputs are made
+once and then shared by every later run and every process.
+
+Without NumPy only the first three distributions exist, generated one value
+at a time from a random.Random of their own (seeded with `seed` when it is
+given).
+"""
+import os
+import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Only the pure-Python distributions are then offered
+    np = None
+
+BASIC_DISTRIBUTIONS = ("Random", "Nearly Sorted", "Reversed")
+# Names of the distributions generate_list() knows, in the order the visualizer cycles them
+DISTRIBUTIONS = BASIC_DISTRIBUTIONS
+if np is not None:
+    DISTRIBUTIONS += ("Few Unique", "Sawtooth", "Organ Pipe", "Zipf", "Sorted")
+
+SWAP_PERCENT = 10  # Nearly Sorted: adjacent pairs swapped, as a share of n
+FEW_UNIQUE = 8  # Distinct values in Few Unique
+SAWTOOTH_TEETH = 5  # Ascending ramps in Sawtooth
+ZIPF_EXPONENT = 1.5  # The k-th most common value of Zipf occurs about 1 / k^1.5 as often as the first
+DTYPE = f"i{array('i').itemsize}"  # Matches array('i'), the large-array mode's buffers
+
+
+def generate_starting_list(n, min_val, max_val, rng=random):
+    lst = []
+    for _ in range(n):
+        val = rng.randint(min_val, max_val)
+        lst.append(val)
+    return lst
+
+
+def generate_nearly_sorted_list(n, min_val, max_val, swap_percent=SWAP_PERCENT, rng=random):
+    lst = sorted(generate_starting_list(n, min_val, max_val, rng))
+    swaps = int((n * swap_percent) / 100)
+
+    for _ in range(swaps):
+        i = rng.randint(0, n-2)
+        lst[i], lst[i+1] = lst[i+1], lst[i]
+
+    return lst
+
+
+def generate_reversed_list(n, min_val, max_val, rng=random):
+    return sorted(generate_starting_list(n, min_val, max_val, rng), reverse=True)
+
+
+def generate_values(distribution, n, min_val, max_val, seed=None):
+    """NumPy array of n values in min_val..max_val following a distribution"""
+    rng = np.random.default_rng(seed)
+    span = max_val - min_val + 1
+    values = rng.integers(min_val, max_val, n, dtype=DTYPE, endpoint=True)
+
+    if distribution == "Nearly Sorted":
+        # Swap random adjacent pairs, dropping pairs that overlap so that
+        # every swap really is one exchange of neighbours
+        values.sort()
+        if n > 1:
+            i = np.unique(rng.integers(0, n - 1, n * SWAP_PERCENT // 100))
+            i = i[np.diff(i, prepend=-2) > 1]
+            values[i], values[i + 1] = values[i + 1], values[i]
+    elif distribution == "Reversed":
+        values[::-1].sort()
+    elif distribution == "Sorted":
+        values.sort()
+    elif distribution == "Few Unique":
+        values = rng.choice(rng.integers(min_val, max_val, FEW_UNIQUE, dtype=DTYPE, endpoint=True), n)
+    elif distribution == "Sawtooth":
+        # Equal ramps from min_val to max_val
+        tooth = -(-n // SAWTOOTH_TEETH) or 1
+        values = (min_val + np.arange(n) % tooth * (span - 1) // max(1, tooth - 1)).astype(DTYPE)
+    elif distribution == "Organ Pipe":
+        # Every other value of a sorted draw climbs, the rest come back down
+        values.sort()
+        values = np.concatenate((values[::2], values[1::2][::-1]))
+    elif distribution == "Zipf":
+        # Ranks follow Zipf's law; each rank gets its own random value of the range
+        ranks = np.minimum(rng.zipf(ZIPF_EXPONENT, n), span) - 1
+        values = (min_val + rng.choice(span, ranks.max(initial=0) + 1, replace=False)[ranks]).astype(DTYPE)
+    elif distribution != "Random":
+        raise ValueError(f"unknown distribution {distribution!r}")
+    return values
+
+
+def generate_list(distribution, n, min_val, max_val, seed=None):
+    """List of n values in min_val..max_val following a distribution"""
+    if np is not None:
+        return generate_values(distribution, n, min_val, max_val, seed).tolist()
+
+    rng = random.Random(seed)  # Its own generator, like NumPy's, so other users of `random` are not reseeded
+    if distribution == "Nearly Sorted":
+        return generate_nearly_sorted_list(n, min_val, max_val, rng=rng)
+    if distribution == "Reversed":
+        return generate_reversed_list(n, min_val, max_val, rng)
+    return generate_starting_list(n, min_val, max_val, rng)
+
+
+def generate_array(distribution, n, min_val, max_val, seed=None):
+    """Like generate_list(), as a compact array('i')"""
+    if np is None:
+        return array('i', generate_list(distribution, n, min_val, max_val, seed))
+    return to_array(generate_values(distribution, n, min_val, max_val, seed))
+
+
+def to_array(values):
+    """Copy a NumPy array, such as a memory-mapped corpus, into a new array('i')"""
+    result = array('i')
+    result.frombytes(np.ascontiguousarray(values, dtype=DTYPE).tobytes())
+    return result
+
+
+def corpus_path(directory, distribution, n, min_val, max_val, seed):
+    """File that load_corpus() keeps one dataset in"""
+    name = distribution.lower().replace(" ", "-")
+    return os.path.join(directory, f"{name}-n{n}-{min_val}-{max_val}-seed{seed}.npy")
+
+
+def load_corpus(directory, distribution, n, min_val, max_val, seed):
+    """Read-only memory map of a seeded dataset, generated and saved on first use
+
+    The file is written under a temporary name and renamed into place, so
+    processes that ask for the same dataset at once never see half a file;
+    at worst they generate it twice.
+    """
+    path = corpus_path(directory, distribution, n, min_val, max_val, seed)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            np.save(f, generate_values(distribution, n, min_val, max_val, seed))
+        os.replace(temp, path)
+    return np.load(path, mmap_mode="r")
@@ -0,0 +1,192 @@
+"""External merge sort of integer files larger than memory
+
+sort_file() sorts a file of native ints (array('i') items) while holding at
+most `memory` of them at once. The first pass memory-maps the input, sorts it
+one chunk of `memory` items at a time and writes each chunk to a run file.
+Every further pass merges up to `fan_in` runs at a time into a longer run
+with a heap, reading each run through its own buffer and writing through one
+more, so memory is split across fan_in + 1 buffers. The last pass writes the
+target file, so a file takes 1 + ceil(log_fan_in(runs)) passes over the data.
+
+A pass writes its output at the same positions its input came from, which
+makes the operation stream look like an in-place sort of the file:
+
+    (BLOCK, run, span)  the pass wrote items start:stop of its output for run
+                        `run` (a chunk while forming runs, then a merge), and
+                        span[2] counts the items read (READ) and written
+                        (WRITE) since the last BLOCK
+    (AUX, k, v)         runs[k] now holds v, where runs is a flat list of
+                        (start, cursor, stop) triples, one per run the pass
+                        reads, and a cursor is how far its run has been merged
+    (AUX, -1, size)     runs was reset to the runs of a new pass
+
+merge_sort() sorts an in-memory array this way through temporary files, for
+the visualizer; its `chunks` and `fan_in` options set the memory budget.
+"""
+import heapq
+import mmap
+import os
+import tempfile
+from array import array
+from contextlib import ExitStack
+
+from operations import AUX, BLOCK, OP_NAMES, READ, WRITE
+
+ITEM_SIZE = array("i").itemsize
+CHUNK_COUNTS = (16, 4, 64)  # Runs merge_sort() forms from the array, which sets its memory budget
+FAN_INS = (4, 2, 16)
+OWNER_COLORS = 128  # owners holds signed bytes, so run numbers wrap around
+
+
+class ExternalRun:
+    """The I/O totals and visualizer outputs of one external sort"""
+
+    def __init__(self, n, mirror=None, owners=None, runs=None, stats=None):
+        """Start the totals of sorting n items"""
+        self.mirror = mirror
+        self.owners = owners
+        self.runs = [] if runs is None else runs
+        self.stats = {} if stats is None else stats
+        self.stats.update(runs=0, passes=1, bytes_read=0, bytes_written=0)
+        self.counts = [0] * len(OP_NAMES)  # Items read and written since the last BLOCK
+        if owners is not None:
+            del owners[:]
+            owners.extend(array("b", [-1]) * n)
+
+    def read(self, f, items):
+        """Read up to `items` ints from an open file"""
+        block = array("i")
+        block.frombytes(f.read(items * ITEM_SIZE))
+        self.stats["bytes_read"] += len(block) * ITEM_SIZE
+        self.counts[READ] += len(block)
+        return block
+
+    def write(self, f, block, start, owner):
+        """Write a block of run `owner` to items start on of a pass's output and return its BLOCK op"""
+        f.write(block)
+        self.stats["bytes_written"] += len(block) * ITEM_SIZE
+        stop = start + len(block)
+        if self.mirror is not None:
+            self.mirror[start:stop] = block if isinstance(self.mirror, array) else block.tolist()
+        if self.owners is not None:
+            self.owners[start:stop] = array("b", [owner % OWNER_COLORS]) * len(block)
+        counts = self.counts
+        counts[WRITE] += len(block)
+        self.counts = [0] * len(counts)
+        return (BLOCK, owner, (start, stop, counts))
+
+    def start_pass(self, pending):
+        """Show the runs a pass reads, with their cursors at their starts"""
+        del self.runs[:]
+        for _, start, length in pending:
+            self.runs.extend((start, start, start + length))
+        return (AUX, -1, len(self.runs))
+
+    def merge(self, group, first, path, buffer, ascending, owner):
+        """Merge the runs in group, the pass's runs first, first + 1, ..., into file path as run `owner`"""
+        sign = 1 if ascending else -1  # The heap pops the smallest key, so descending keys are negated
+        runs = self.runs
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(run_path, "rb")) for run_path, _, _ in group]
+            out = stack.enter_context(open(path, "wb"))
+
+            blocks = [self.read(f, buffer) for f in files]
+            positions = [0] * len(group)
+            heap = [(sign * block[0], r) for r, block in enumerate(blocks) if block]
+            heapq.heapify(heap)
+
+            output = array("i")
+            written = group[0][1]
+            shown = [start for _, start, _ in group]  # Cursors as last yielded
+            while heap:
+                r = heap[0][1]
+                block = blocks[r]
+                output.append(block[positions[r]])
+                positions[r] += 1
+                k = 3 * (first + r) + 1
+                runs[k] += 1
+                if positions[r] == len(block):
+                    block = blocks[r] = self.read(files[r], buffer)
+                    positions[r] = 0
+                if block:
+                    heapq.heapreplace(heap, (sign * block[positions[r]], r))
+                else:
+                    heapq.heappop(heap)
+
+                if len(output) == buffer or not heap:
+                    # Show the cursors that moved, then the block written
+                    for r in range(len(group)):
+                        k = 3 * (first + r) + 1
+                        if runs[k] != shown[r]:
+                            shown[r] = runs[k]
+                            yield (AUX, k, runs[k])
+                    yield self.write(out, output, written, owner)
+                    written += len(output)
+                    output = array("i")
+
+
+def sort_file(source, target, memory, fan_in=FAN_INS[0], ascending=True, *, directory=None,
+              mirror=None, owners=None, runs=None, stats=None):
+    """Sort the ints in file source into file target, yielding an op per block written
+
+    Each block written is also copied into `mirror` and marked with its run
+    in `owners` when they are given. `runs` receives the (start, cursor,
+    stop) triples of the pass running, and `stats` the number of runs and
+    passes and the bytes read and written so far. Run files go in a
+    temporary directory inside `directory`.
+    """
+    memory = max(1, memory)
+    fan_in = max(2, fan_in)
+    n = os.path.getsize(source) // ITEM_SIZE
+    run = ExternalRun(n, mirror, owners, runs, stats)
+    if n == 0:
+        open(target, "wb").close()
+        return
+
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        # First pass: sort the input one chunk at a time into runs
+        pending = []  # (path, start, length) of each run, in file order
+        yield run.start_pass(pending)
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for start in range(0, n, memory):
+                stop = min(n, start + memory)
+                chunk = array("i")
+                chunk.frombytes(data[start * ITEM_SIZE:stop * ITEM_SIZE])
+                run.stats["bytes_read"] += len(chunk) * ITEM_SIZE
+                run.counts[READ] += len(chunk)
+                chunk = array("i", sorted(chunk, reverse=not ascending))
+
+                path = target if n <= memory else os.path.join(scratch, f"run-{len(pending)}.bin")
+                with open(path, "wb") as out:
+                    op = run.write(out, chunk, start, len(pending))
+                pending.append((path, start, len(chunk)))
+                run.stats["runs"] = len(pending)
+                run.runs.extend((start, start, stop))
+                yield (AUX, len(run.runs) - 2, start)
+                yield op
+
+        # Merge passes, fan_in runs at a time, until one run is left
+        buffer = max(1, memory // (fan_in + 1))
+        while len(pending) > 1:
+            run.stats["passes"] += 1
+            yield run.start_pass(pending)
+            last = len(pending) <= fan_in
+            merged = []
+            for first in range(0, len(pending), fan_in):
+                group = pending[first:first + fan_in]
+                path = target if last else os.path.join(scratch, f"pass-{run.stats['passes']}-{len(merged)}.bin")
+                yield from run.merge(group, first, path, buffer, ascending, len(merged))
+                merged.append((path, group[0][1], sum(length for _, _, length in group)))
+            for path, _, _ in pending:
+                os.remove(path)
+            pending = merged
+
+
+def merge_sort(arr, ascending=True, chunks=CHUNK_COUNTS[0], fan_in=FAN_INS[0], owners=None, runs=None, stats=None):
+    """Sort arr by writing it to a file and sorting that file externally in `chunks` runs"""
+    with tempfile.TemporaryDirectory() as scratch:
+        source = os.path.join(scratch, "input.bin")
+        with open(source, "wb") as f:
+            f.write(arr if isinstance(arr, array) else array("i", arr))
+        yield from sort_file(source, os.path.join(scratch, "output.bin"), -(-len(arr) // chunks), fan_in,
+                             ascending, directory=scratch, mirror=arr, owners=owners, runs=runs, stats=stats)
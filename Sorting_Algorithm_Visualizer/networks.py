@@ -0,0 +1,98 @@
+"""Sorting networks run one vectorized NumPy compare-exchange per stage
+
+A sorting network is a fixed schedule of comparators (i, j), grouped into
+stages of disjoint pairs that could all run at the same time. Here each stage
+really does run at once: every pair is compared and exchanged by a single
+NumPy operation, and the algorithm yields one (STAGE, pairs, swapped) op for
+it (see operations.py).
+
+Both networks are built for n padded up to a power of two, with every
+comparator putting the smaller value (the larger one when descending) at its
+lower index. Padding elements count as larger than everything, so they start
+at the top and no comparator ever moves them. Comparators that touch the
+padding are therefore dropped and the padding never needs to exist.
+
+Needs NumPy; np is None without it and algorithms.py leaves the networks out.
+"""
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # The networks are then not registered
+    np = None
+
+from operations import STAGE
+
+
+def bitonic_stages(n):
+    """Index pairs of each stage of a bitonic sorter for n elements"""
+    size = 1 << max(0, n - 1).bit_length()
+    index = np.arange(size)
+    k = 2
+    while k <= size:
+        # Mirror each block of k: compare its first half with its second half reversed
+        offset = index % k
+        lo = index[offset < k // 2]
+        yield lo, lo - lo % k + k - 1 - lo % k
+
+        # Then half-cleaners at distances k/4, k/8, ..., 1
+        j = k // 4
+        while j > 0:
+            lo = index[(index & j) == 0]
+            yield lo, lo + j
+            j //= 2
+        k *= 2
+
+
+def odd_even_merge_stages(n):
+    """Index pairs of each stage of Batcher's odd-even mergesort for n elements"""
+    size = 1 << max(0, n - 1).bit_length()
+    p = 1
+    while p < size:
+        k = p
+        while k >= 1:
+            # Compare x with x + k inside every merge of two sorted blocks of length p
+            x = np.arange(k % p, size - k)
+            keep = ((x - k % p) % (2 * k) < k) & (x // (2 * p) == (x + k) // (2 * p))
+            lo = x[keep]
+            yield lo, lo + k
+            k //= 2
+        p *= 2
+
+
+def run_network(arr, stages, ascending):
+    """Apply a network's stages to arr, yielding a STAGE op after each"""
+    n = len(arr)
+    if n < 2:
+        return
+
+    # Compact int arrays are sorted in place through a NumPy view of their
+    # buffer; other sequences through a copy that changed values are written back to
+    in_place = isinstance(arr, array)
+    values = np.frombuffer(arr, dtype=f"i{arr.itemsize}") if in_place else np.array(arr)
+
+    for lo, hi in stages:
+        real = hi < n  # Comparators that touch padding never exchange
+        lo, hi = lo[real], hi[real]
+        if len(lo) == 0:
+            continue
+
+        a, b = values[lo], values[hi]
+        swap = a > b if ascending else a < b
+        if ascending:
+            values[lo], values[hi] = np.minimum(a, b), np.maximum(a, b)
+        else:
+            values[lo], values[hi] = np.maximum(a, b), np.minimum(a, b)
+
+        if not in_place:
+            for i in np.concatenate((lo[swap], hi[swap])).tolist():
+                arr[i] = values[i].item()
+        yield (STAGE, np.stack((lo, hi)), int(np.count_nonzero(swap)))
+
+
+def bitonic_sort(arr, ascending=True):
+    yield from run_network(arr, bitonic_stages(len(arr)), ascending)
+
+
+def odd_even_merge_sort(arr, ascending=True):
+    yield from run_network(arr, odd_even_merge_stages(len(arr)), ascending)
@@ -0,0 +1,156 @@
+"""Operation stream shared by the sorting algorithms and the renderer
+
+A sorting algorithm is a generator that takes a mutable sequence and sorts it
+in place, yielding one op right after each step it performs:
+
+    (COMPARE, i, j)   arr[i] was compared with arr[j]
+    (SWAP, i, j)      arr[i] and arr[j] were exchanged
+    (WRITE, i, v)     arr[i] was set to v
+    (PIVOT, i, -1)    arr[i] is the current pivot (-1 clears it)
+    (READ, i, -1)     arr[i] was read to compute a key or digit
+    (AUX, k, v)       counter or bucket k of the auxiliary array now holds v
+    (AUX, -1, size)   the auxiliary array was reset to `size` zeros
+    (STAGE, pairs, s) every pair (pairs[0][k], pairs[1][k]) of a 2 x k index array
+                      was compare-exchanged at once; s of them were swapped
+    (BLOCK, w, span)  worker w rewrote arr[start:stop], which it owns, where span is
+                      (start, stop, counts) and counts[kind] is how many ops of each
+                      kind it ran since its last BLOCK
+    (IDLE, -1, -1)    nothing happened yet; the sort is waiting on other processes
+    (RANGE, lo, hi)   the search has narrowed to arr[lo..hi]; the rest is set aside
+
+READ and AUX come from the non-comparison sorts, which count and bucket
+values instead of comparing them. STAGE comes from the sorting networks in
+networks.py and stands for k comparisons and s swaps, and BLOCK and IDLE from
+the multi-process sorts in parallel.py, where a BLOCK stands for everything a
+worker did (see record_batch()). A consumer that draws frames should end the
+frame at an IDLE rather than wait for the next op. RANGE comes from the
+selection algorithms, which narrow down to the part of the array that holds
+the elements they look for.
+
+Ops have the layout of the Op named tuple, but the algorithms yield plain
+tuples: building a named tuple costs several times more than the rest of a
+step, which matters at millions of steps. Consumers therefore index ops
+(op[0] is the kind) rather than use attribute names.
+
+Algorithms never touch pygame. The visualizer draws each op, while
+run_headless() just drains the generator at full speed.
+"""
+from typing import NamedTuple
+
+COMPARE = 0
+SWAP = 1
+WRITE = 2
+PIVOT = 3
+READ = 4
+AUX = 5
+STAGE = 6
+BLOCK = 7
+IDLE = 8
+RANGE = 9
+
+OP_NAMES = {COMPARE: "compare", SWAP: "swap", WRITE: "write", PIVOT: "pivot", READ: "read", AUX: "aux",
+            STAGE: "stage", BLOCK: "block", IDLE: "idle", RANGE: "range"}
+
+IDLE_OP = (IDLE, -1, -1)
+
+
+class Op(NamedTuple):
+    """Layout of one step of a sorting algorithm"""
+    kind: int
+    a: int
+    b: int = -1
+
+
+class OpCounter:
+    """Running totals of the operations seen in a stream"""
+
+    def __init__(self):
+        """Start with all counts at zero"""
+        self.counts = [0] * len(OP_NAMES)  # Indexed by op kind
+
+    def record(self, op):
+        """Count one operation"""
+        self.counts[op[0]] += 1
+        if op[0] >= STAGE:
+            record_batch(self.counts, op)
+
+    @property
+    def comparisons(self):
+        return self.counts[COMPARE]
+
+    @property
+    def swaps(self):
+        return self.counts[SWAP]
+
+    @property
+    def writes(self):
+        return self.counts[WRITE]
+
+    @property
+    def reads(self):
+        return self.counts[READ]
+
+    @property
+    def aux_writes(self):
+        return self.counts[AUX]
+
+    @property
+    def stages(self):
+        return self.counts[STAGE]
+
+    def as_dict(self):
+        """Counts keyed by name, e.g. for reports"""
+        return {"comparisons": self.comparisons, "swaps": self.swaps, "writes": self.writes,
+                "reads": self.reads, "aux_writes": self.aux_writes, "stages": self.stages}
+
+
+def record_batch(counts, op):
+    """Add the operations a STAGE or BLOCK op stands for to a counts list"""
+    kind = op[0]
+    if kind == STAGE:
+        counts[COMPARE] += len(op[1][0])
+        counts[SWAP] += op[2]
+    elif kind == BLOCK:
+        for inner, count in enumerate(op[2][2]):
+            counts[inner] += count
+
+
+def notify(hooks, op):
+    """Forward an operation to the matching sorting hook, if one is attached"""
+    kind, a, b = op
+    if kind == COMPARE:
+        if hooks.on_compare:
+            hooks.on_compare(a, b)
+    elif kind == SWAP:
+        if hooks.on_swap:
+            hooks.on_swap(a, b)
+    elif kind == WRITE:
+        if hooks.on_write:
+            hooks.on_write(a, b)
+    elif kind == READ:
+        if hooks.on_read:
+            hooks.on_read(a)
+    elif kind == AUX:
+        if hooks.on_aux:
+            hooks.on_aux(a, b)
+    elif kind == STAGE:
+        if hooks.on_stage:
+            hooks.on_stage(len(a[0]), b)
+    elif kind == BLOCK:
+        if hooks.on_block:
+            hooks.on_block(a, b[0], b[1])
+    elif kind == RANGE:
+        if hooks.on_range:
+            hooks.on_range(a, b)
+
+
+def run_headless(algorithm, arr, ascending=True):
+    """Sort arr in place without drawing and return the operation counts"""
+    counter = OpCounter()
+    counts = counter.counts
+    for op in algorithm(arr, ascending):
+        kind = op[0]
+        counts[kind] += 1
+        if kind >= STAGE:
+            record_batch(counts, op)
+    return counter
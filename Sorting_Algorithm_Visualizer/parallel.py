@@ -0,0 +1,415 @@
+"""Parallel sorts: worker processes sorting one array in shared memory
+
+The array is copied into a multiprocessing.shared_memory block of C ints that
+every worker of a ProcessPoolExecutor attaches to by name, so the data itself
+is never pickled. Workers run the ordinary op-stream algorithms on their part
+of the array, counting the ops instead of yielding them, and about every
+REPORT_INTERVAL seconds write their progress back to shared memory and put a
+short (run, worker, buffer, start, stop, counts, final) message on a queue.
+
+The sort itself is a generator like any other. It turns each message into a
+BLOCK op, after copying the reported span into arr and marking it as owned by
+that worker in `owners`, so the visualizer shows the workers' progress and
+colors bars by worker. While no message is waiting it yields an IDLE op, which
+ends the frame instead of blocking the window.
+
+Wall time only counts the phases themselves (from submitting a phase to its
+last task finishing) plus the parent's serial steps, so it does not include
+time spent drawing. When stats are wanted, the sort then times its local sort
+alone on the whole input, in the parent: the speedup is that serial time over
+the parallel wall time, and efficiency is speedup per worker. Values must fit
+a C int.
+"""
+import itertools
+import os
+import random
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import Queue, shared_memory
+from queue import Empty
+
+from operations import OP_NAMES, COMPARE, WRITE, READ, BLOCK, IDLE_OP
+
+REPORT_INTERVAL = 0.02  # Seconds between a worker's progress reports
+REPORT_SHARE = 0.1  # Largest share of a worker's time spent writing progress back
+REPORT_MASK = 4095  # Workers look at the clock every 4096 steps
+IDLE_WAIT = 0.002  # Longest the parent waits for a message before yielding IDLE
+OVERSAMPLE = 16  # Samples per worker for the sample sort's splitters
+SERIAL_CHUNK = 65536  # Ops of the serial timing run between two IDLE ops
+
+# Worker counts the visualizer cycles through, this machine's core count first
+CORES = os.cpu_count() or 1
+WORKER_COUNTS = (CORES,) + tuple(w for w in (1, 2, 4, 8, 16) if w != CORES)
+
+_queue = None  # Progress queue in a worker process, set by _init_worker
+_pool = None  # (executor, queue, workers), kept between sorts
+_runs = itertools.count()  # Tells a run's messages from those of abandoned runs
+
+
+def _init_worker(queue):
+    global _queue
+    _queue = queue
+
+
+def get_pool(workers):
+    """Executor with `workers` processes and its progress queue, started on first use"""
+    global _pool
+    if _pool is None or _pool[2] != workers:
+        if _pool is not None:
+            _pool[0].shutdown(wait=False, cancel_futures=True)
+        queue = Queue()
+        _pool = (ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(queue,)), queue, workers)
+    return _pool
+
+
+def shutdown():
+    """Stop the worker processes
+
+    A process that ran a parallel sort in a worker process of its own must call
+    this before returning, or that worker waits forever for its children.
+    """
+    global _pool
+    if _pool is not None:
+        _pool[0].shutdown()
+        _pool = None
+
+
+@contextmanager
+def attached(name):
+    """Int view of the shared memory block called name"""
+    shm = shared_memory.SharedMemory(name=name)
+    values = shm.buf.cast("i")
+    try:
+        yield values
+    finally:
+        values.release()
+        shm.close()
+
+
+def split(n, parts):
+    """(start, stop) of `parts` nearly equal blocks of range(n)"""
+    return [(k * n // parts, (k + 1) * n // parts) for k in range(parts)]
+
+
+def co_rank(values, left, mid, right, k, after):
+    """How many of the first k outputs of a stable merge of values[left:mid] and values[mid:right] come from the left run"""
+    low, high = max(0, k - (right - mid)), min(k, mid - left)
+    while low < high:
+        i = (low + high) // 2
+        if after(values[left + i], values[mid + k - i - 1]):
+            high = i
+        else:
+            low = i + 1
+    return low
+
+
+# Worker tasks. Each takes the run id and its worker number first, puts
+# exactly one final message on the queue and returns (CPU seconds, finish time,
+# result).
+
+def _report(run, worker, buffer, start, stop, counts, final=False):
+    _queue.put((run, worker, buffer, start, stop, counts, final))
+
+
+def classify(run, worker, names, start, stop, splitters, ascending):
+    """Count how many values of a block fall in each bucket"""
+    began = time.process_time()
+    with attached(names[0]) as values:
+        block = values[start:stop].tolist()
+    _report(run, worker, 0, start, stop, [0] * len(OP_NAMES))
+
+    sizes = [0] * (len(splitters) + 1)
+    for value in block:
+        sizes[bisect_right(splitters, value)] += 1
+    if not ascending:
+        sizes.reverse()
+
+    counts = [0] * len(OP_NAMES)
+    counts[READ] = len(block)
+    _report(run, worker, 0, start, stop, counts, True)
+    return time.process_time() - began, time.perf_counter(), sizes
+
+
+def scatter(run, worker, names, start, stop, splitters, ascending, offsets):
+    """Deal a block's values to their buckets in the second buffer, starting at offsets"""
+    began = time.process_time()
+    with attached(names[0]) as values:
+        block = values[start:stop].tolist()
+
+    pieces = [[] for _ in range(len(splitters) + 1)]
+    for value in block:
+        pieces[bisect_right(splitters, value)].append(value)
+    if not ascending:
+        pieces.reverse()
+
+    with attached(names[1]) as values:
+        for offset, piece in zip(offsets, pieces):
+            if piece:
+                values[offset:offset + len(piece)] = array("i", piece)
+                counts = [0] * len(OP_NAMES)
+                counts[READ] = counts[WRITE] = len(piece)
+                _report(run, worker, 1, offset, offset + len(piece), counts)
+    _report(run, worker, 1, start, start, [0] * len(OP_NAMES), True)
+    return time.process_time() - began, time.perf_counter(), None
+
+
+def sort_block(run, worker, names, buffer, start, stop, ascending, local_sort):
+    """Sort values[start:stop] of a buffer with an op-stream algorithm"""
+    began = time.process_time()
+    with attached(names[buffer]) as values:
+        block = values[start:stop].tolist()
+        _report(run, worker, buffer, start, stop, [0] * len(OP_NAMES))
+
+        counts = [0] * len(OP_NAMES)
+        steps = 0
+        next_report = time.perf_counter() + REPORT_INTERVAL
+        for op in local_sort(block, ascending):
+            counts[op[0]] += 1
+            steps += 1
+            if not steps & REPORT_MASK and time.perf_counter() >= next_report:
+                # Writing a big block back takes a while, so report it less often
+                now = time.perf_counter()
+                values[start:stop] = array("i", block)
+                _report(run, worker, buffer, start, stop, counts)
+                counts = [0] * len(OP_NAMES)
+                cost = time.perf_counter() - now
+                next_report = now + cost + max(REPORT_INTERVAL, cost / REPORT_SHARE)
+        values[start:stop] = array("i", block)
+    _report(run, worker, buffer, start, stop, counts, True)
+    return time.process_time() - began, time.perf_counter(), None
+
+
+def merge_part(run, worker, names, src, left, mid, right, first, last, ascending):
+    """Write outputs first..last of merging src[left:mid] with src[mid:right] to the other buffer"""
+    began = time.process_time()
+    after = (lambda a, b: a > b) if ascending else (lambda a, b: a < b)
+    with attached(names[src]) as values:
+        i0 = co_rank(values, left, mid, right, first, after)
+        i1 = co_rank(values, left, mid, right, last, after)
+        xs = values[left + i0:left + i1].tolist()
+        ys = values[mid + first - i0:mid + last - i1].tolist()
+
+    start = left + first
+    dst = 1 - src
+    with attached(names[dst]) as values:
+        out = []
+        written = 0
+        comparisons = 0
+        i = j = 0
+        next_report = time.perf_counter() + REPORT_INTERVAL
+        while i < len(xs) and j < len(ys):
+            comparisons += 1
+            if after(xs[i], ys[j]):
+                out.append(ys[j])
+                j += 1
+            else:
+                out.append(xs[i])
+                i += 1
+            if not comparisons & REPORT_MASK and time.perf_counter() >= next_report:
+                values[start + written:start + len(out)] = array("i", out[written:])
+                counts = [0] * len(OP_NAMES)
+                counts[COMPARE], counts[WRITE] = comparisons, len(out) - written
+                _report(run, worker, dst, start + written, start + len(out), counts)
+                written, comparisons = len(out), 0
+                next_report = time.perf_counter() + REPORT_INTERVAL
+        out += xs[i:]
+        out += ys[j:]
+        values[start + written:start + len(out)] = array("i", out[written:])
+
+    counts = [0] * len(OP_NAMES)
+    counts[COMPARE], counts[WRITE] = comparisons, len(out) - written
+    _report(run, worker, dst, start + written, start + len(out), counts, True)
+    return time.process_time() - began, time.perf_counter(), None
+
+
+class ParallelRun:
+    """The shared buffers, worker pool and timings of one parallel sort"""
+
+    def __init__(self, arr, workers, owners=None, stats=None):
+        """Copy arr into the first of two shared buffers"""
+        self.executor, self.queue, self.workers = get_pool(workers)
+        self.id = next(_runs)
+        self.arr = arr
+        self.owners = owners
+        self.stats = stats
+        self.futures = []
+        self.wall = 0.0
+        self.work = 0.0
+        self.input = array("i", arr) if stats is not None else None  # For the serial timing run
+
+        n = len(arr)
+        self.shms = [shared_memory.SharedMemory(create=True, size=max(1, n * array("i").itemsize))
+                     for _ in range(2)]
+        self.names = tuple(shm.name for shm in self.shms)
+        self.values = [shm.buf.cast("i") for shm in self.shms]
+        self.values[0][:n] = array("i", arr)
+        if owners is not None:
+            del owners[:]
+            owners.extend(array("b", [-1]) * n)
+
+    @contextmanager
+    def serial(self):
+        """Time a step the parent runs alone"""
+        started = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - started
+        self.wall += elapsed
+        self.work += elapsed
+
+    def show(self, buffer, start, stop):
+        """Copy a span of a buffer into arr"""
+        if isinstance(self.arr, array):
+            with memoryview(self.arr) as view:
+                view[start:stop] = self.values[buffer][start:stop]
+        else:
+            self.arr[start:stop] = self.values[buffer][start:stop].tolist()
+
+    def phase(self, tasks):
+        """Run (task, worker, *args) tuples on the pool and return their results
+
+        Yields a BLOCK op for every progress message, and IDLE while none is
+        waiting.
+        """
+        started = time.perf_counter()
+        self.futures = [self.executor.submit(task, self.id, *args) for task, *args in tasks]
+        remaining = len(self.futures)
+        while remaining:
+            try:
+                run, worker, buffer, start, stop, counts, final = self.queue.get(timeout=IDLE_WAIT)
+            except Empty:
+                for future in self.futures:
+                    if future.done() and future.exception() is not None:
+                        raise future.exception()
+                yield IDLE_OP
+                continue
+            if run != self.id:
+                continue  # Left over from an abandoned sort
+            remaining -= final
+            if stop > start:
+                self.show(buffer, start, stop)
+                if self.owners is not None:
+                    self.owners[start:stop] = array("b", [worker % 128]) * (stop - start)
+            yield (BLOCK, worker, (start, stop, counts))
+
+        results = [future.result() for future in self.futures]
+        self.futures = []
+        if results:
+            self.wall += max(finished for _, finished, _ in results) - started
+            self.work += sum(cpu for cpu, _, _ in results)
+        return [result for _, _, result in results]
+
+    def finish(self, buffer, local_sort, ascending):
+        """Copy the sorted buffer into arr, then time local_sort alone on the input and fill in the stats
+
+        Only the serial sort's own steps are timed; it yields IDLE every
+        SERIAL_CHUNK ops so the window keeps responding meanwhile.
+        """
+        self.show(buffer, 0, len(self.arr))
+        if self.stats is None:
+            return
+        serial = 0.0
+        steps = local_sort(self.input, ascending)
+        while True:
+            started = time.perf_counter()
+            taken = sum(1 for _ in itertools.islice(steps, SERIAL_CHUNK))
+            serial += time.perf_counter() - started
+            if taken < SERIAL_CHUNK:
+                break
+            yield IDLE_OP
+        speedup = serial / self.wall if self.wall else 1.0
+        self.stats.update(workers=self.workers, wall=self.wall, work=self.work, serial=serial,
+                          speedup=speedup, efficiency=speedup / self.workers)
+
+    def close(self):
+        """Drop tasks that have not started and free the shared buffers"""
+        for future in self.futures:
+            future.cancel()
+        for values in self.values:
+            values.release()
+        for shm in self.shms:
+            shm.close()
+            shm.unlink()
+
+
+def sample_sort(arr, ascending=True, *, local_sort, workers=CORES, owners=None, stats=None):
+    """Split by sampled values into one bucket per worker, deal the values out, then sort every bucket at once
+
+    local_sort is the op-stream algorithm each worker runs on its bucket.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    run = ParallelRun(arr, workers, owners, stats)
+    try:
+        p = run.workers
+        blocks = split(n, p)
+        with run.serial():
+            sample = sorted(arr[i] for i in random.sample(range(n), min(n, OVERSAMPLE * p)))
+            splitters = [sample[k * len(sample) // p] for k in range(1, p)]
+
+        sizes = yield from run.phase([(classify, w, run.names, start, stop, splitters, ascending)
+                                      for w, (start, stop) in enumerate(blocks)])
+
+        # Bucket b starts after all smaller buckets; within it, worker w's values follow those of workers < w
+        with run.serial():
+            offsets = [[0] * p for _ in range(p)]
+            buckets = []
+            position = 0
+            for b in range(p):
+                start = position
+                for w in range(p):
+                    offsets[w][b] = position
+                    position += sizes[w][b]
+                buckets.append((start, position))
+
+        yield from run.phase([(scatter, w, run.names, start, stop, splitters, ascending, offsets[w])
+                              for w, (start, stop) in enumerate(blocks)])
+        yield from run.phase([(sort_block, b, run.names, 1, start, stop, ascending, local_sort)
+                              for b, (start, stop) in enumerate(buckets) if stop > start])
+        yield from run.finish(1, local_sort, ascending)
+    finally:
+        run.close()
+
+
+def merge_sort(arr, ascending=True, *, local_sort, workers=CORES, owners=None, stats=None):
+    """Sort one block per worker, then merge pairs of runs with every merge split across the workers
+
+    A merge's output is cut into equal parts and each part's inputs found by
+    binary search (co_rank), so the last merges keep all workers busy too.
+    local_sort is the op-stream algorithm each worker runs on its block.
+    """
+    n = len(arr)
+    if n < 2:
+        return
+    run = ParallelRun(arr, workers, owners, stats)
+    try:
+        p = run.workers
+        runs = [(start, stop) for start, stop in split(n, p) if stop > start]
+        yield from run.phase([(sort_block, w, run.names, 0, start, stop, ascending, local_sort)
+                              for w, (start, stop) in enumerate(runs)])
+
+        src = 0
+        while len(runs) > 1:
+            tasks = []
+            merged = []
+            for k in range(0, len(runs) - 1, 2):
+                left, mid, right = runs[k][0], runs[k][1], runs[k + 1][1]
+                parts = max(1, round(p * (right - left) / n))
+                for first, last in split(right - left, parts):
+                    tasks.append((merge_part, len(tasks), run.names, src, left, mid, right, first, last, ascending))
+                merged.append((left, right))
+            if len(runs) % 2:
+                with run.serial():
+                    start, stop = runs[-1]
+                    run.values[1 - src][start:stop] = run.values[src][start:stop]
+                merged.append(runs[-1])
+
+            yield from run.phase(tasks)
+            runs = merged
+            src = 1 - src
+        yield from run.finish(src, local_sort, ascending)
+    finally:
+        run.close()
@@ -0,0 +1,128 @@
+"""Sorting races: several algorithms on copies of one input, each in its own process
+
+Every entrant of a race runs in a worker of a ProcessPoolExecutor. The worker
+first times its algorithm headless on a copy of the input, then runs it again
+from the same random seed and sends the op stream back in batches of
+BATCH_SIZE ops, each packed as the (kind, a, b) ints of an array('i'), on a
+queue shared by the whole pool. The last batch carries the wall time and op
+counts of the timed run.
+
+The parent replays each entrant's stream with Race.replay(), a generator like
+the sorts themselves: it applies the swaps and writes to the entrant's own
+copy of the input as it yields them, and yields IDLE while the next batch has
+not arrived, so the visualizer can pace every entrant by ops per frame.
+
+Only the algorithms in algorithms.REPLAYABLE can race; parallel sorts also
+start processes of their own.
+"""
+import itertools
+import random
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import Queue
+from queue import Empty
+
+from algorithms import ALGORITHMS
+from operations import IDLE_OP, SWAP, WRITE, run_headless
+
+MAX_ENTRANTS = 6
+BATCH_SIZE = 4096  # Ops per message from a worker
+
+_queue = None  # Op batches in a worker process, set by _init_worker
+_pool = None  # (executor, queue), kept between races
+_races = itertools.count()  # Tells a race's batches from those of abandoned races
+
+
+def _init_worker(queue):
+    global _queue
+    _queue = queue
+    queue.cancel_join_thread()  # Batches of an abandoned race may never be read; exit anyway
+
+
+def get_pool():
+    """Executor with a process per entrant and its op queue, started on first use"""
+    global _pool
+    if _pool is None:
+        queue = Queue()
+        _pool = (ProcessPoolExecutor(MAX_ENTRANTS, initializer=_init_worker, initargs=(queue,)), queue)
+    return _pool
+
+
+def shutdown():
+    """Stop the worker processes"""
+    global _pool
+    if _pool is not None:
+        _pool[0].shutdown(cancel_futures=True)
+        _pool = None
+
+
+def run_entrant(race, entrant, name, options, values, ascending, seed):
+    """Time one entrant headless, then send its op stream to the parent"""
+    algorithm = partial(ALGORITHMS[name], **options)
+    random.seed(seed)
+    started = time.perf_counter()
+    counter = run_headless(algorithm, list(values), ascending)
+    wall = time.perf_counter() - started
+
+    random.seed(seed)  # Random pivots repeat the timed run
+    batch = array("i")
+    for op in algorithm(list(values), ascending):
+        batch.extend(op)
+        if len(batch) >= 3 * BATCH_SIZE:
+            _queue.put((race, entrant, batch.tobytes(), None))
+            batch = array("i")
+    _queue.put((race, entrant, batch.tobytes(), (wall, counter.as_dict())))
+
+
+class Race:
+    """The entrants of one race and the op batches they have sent so far"""
+
+    def __init__(self, entrants, values, ascending=True):
+        """Start every (name, options) entrant on its own worker, sorting values"""
+        self.executor, self.queue = get_pool()
+        self.id = next(_races)
+        self.batches = [deque() for _ in entrants]
+        self.results = [None] * len(entrants)  # (wall, counts) of each entrant's timed run, once known
+        seed = random.randrange(2 ** 32)
+        self.futures = [self.executor.submit(run_entrant, self.id, i, name, options, values, ascending, seed)
+                        for i, (name, options) in enumerate(entrants)]
+
+    def receive(self):
+        """File every batch waiting on the queue under its entrant"""
+        while True:
+            try:
+                race, entrant, data, result = self.queue.get_nowait()
+            except Empty:
+                return
+            if race == self.id:  # Others are left over from an abandoned race
+                self.batches[entrant].append((data, result))
+
+    def replay(self, entrant, arr):
+        """Yield an entrant's ops as they arrive, applying its swaps and writes to arr"""
+        batches = self.batches[entrant]
+        while True:
+            if not batches:
+                self.receive()
+            if not batches:
+                future = self.futures[entrant]
+                if future.done() and future.exception() is not None:
+                    raise future.exception()
+                yield IDLE_OP
+                continue
+
+            data, result = batches.popleft()
+            ops = array("i")
+            ops.frombytes(data)
+            triples = iter(ops)
+            for kind, a, b in zip(triples, triples, triples):
+                if kind == SWAP:
+                    arr[a], arr[b] = arr[b], arr[a]
+                elif kind == WRITE:
+                    arr[a] = b
+                yield (kind, a, b)
+            if result is not None:
+                self.results[entrant] = result
+                return
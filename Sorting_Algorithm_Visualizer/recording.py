@@ -0,0 +1,217 @@
+"""Reversible recordings of a sort's operation stream
+
+A Recording keeps the input of a sort and every op it yielded in four typed
+arrays: the kind, the op's two ints and what it undoes, 13 bytes an op. The
+undo column is what makes each op reversible on its own: a WRITE keeps the
+value it overwrote, an AUX the counter value it replaced (or the size of the
+counters a reset threw away), a PIVOT the previous pivot and a RANGE the
+position of the previous RANGE. Stepping back through a recording therefore
+costs O(1) an op and needs no copy of the array, except across a counter
+reset, whose counters are only kept by keyframes.
+
+Every `interval` ops (at least KEYFRAME_MIN, and at least the array's length
+so the copies cost O(1) an op) a keyframe keeps a copy of the array, the
+counters and the op counts. seek() finds the last keyframe at or before a
+position by binary search and replays forward from it, so any position is
+reached in O(log k + interval) for k keyframes.
+
+Only the algorithms in algorithms.REPLAYABLE can be recorded. save() writes
+the input and the ops to a file; load() reads them back and rebuilds the
+undo column and keyframes by recording the ops again.
+"""
+import json
+from array import array
+from bisect import bisect_right
+
+from operations import OP_NAMES, AUX, PIVOT, RANGE, SWAP, WRITE
+
+KEYFRAME_MIN = 1024  # Fewest ops between two keyframes
+MAGIC = b"SORTREC1\n"
+
+
+class Keyframe:
+    """The state of a recording after the first `position` ops"""
+
+    def __init__(self, position, values, aux, pivot, last_range, counts):
+        self.position = position
+        self.values = array('i', values)
+        self.aux = array('i', aux)
+        self.pivot = pivot
+        self.last_range = last_range  # Position of the last RANGE op so far, or -1
+        self.counts = list(counts)
+
+
+class Recording:
+    """The input and reversible op log of one sort, with keyframes for seeking"""
+
+    def __init__(self, values, algorithm="", ascending=True, options=None):
+        """Start an empty recording of `algorithm` sorting values with the given options"""
+        self.algorithm = algorithm
+        self.ascending = ascending
+        self.options = {} if options is None else options
+        self.initial = array('i', values)
+        self.kinds = array('b')
+        self.first = array('i')
+        self.second = array('i')
+        self.undo = array('i')
+        self.interval = max(KEYFRAME_MIN, len(values))
+
+        # State after the last op recorded
+        self.values = array('i', values)
+        self.aux = array('i')
+        self.pivot = -1
+        self.last_range = -1
+        self.counts = [0] * len(OP_NAMES)
+        self.keyframes = [self.keyframe()]
+        self.positions = [0]  # Of the keyframes, for bisection
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def keyframe(self):
+        return Keyframe(len(self.kinds), self.values, self.aux, self.pivot, self.last_range, self.counts)
+
+    def record(self, op):
+        """Append an op of the running sort, with what undoes it"""
+        kind, a, b = op
+        values = self.values
+        undo = 0
+        if kind == SWAP:
+            values[a], values[b] = values[b], values[a]
+        elif kind == WRITE:
+            undo = values[a]
+            values[a] = b
+        elif kind == AUX:
+            if a < 0:
+                undo = len(self.aux)
+                self.aux = array('i', [0]) * b
+            else:
+                undo = self.aux[a]
+                self.aux[a] = b
+        elif kind == PIVOT:
+            undo = self.pivot
+            self.pivot = a
+        elif kind == RANGE:
+            undo = self.last_range
+            self.last_range = len(self.kinds)
+        self.kinds.append(kind)
+        self.first.append(a)
+        self.second.append(b)
+        self.undo.append(undo)
+        self.counts[kind] += 1
+
+        if len(self.kinds) % self.interval == 0:
+            self.keyframes.append(self.keyframe())
+            self.positions.append(len(self.kinds))
+
+    def op(self, i):
+        """The i-th op recorded"""
+        return (self.kinds[i], self.first[i], self.second[i])
+
+    def apply(self, i, arr, aux):
+        """Redo op i on arr and the counters aux and return it"""
+        kind, a, b = self.kinds[i], self.first[i], self.second[i]
+        if kind == SWAP:
+            arr[a], arr[b] = arr[b], arr[a]
+        elif kind == WRITE:
+            arr[a] = b
+        elif kind == AUX:
+            if a < 0:
+                del aux[:]
+                aux.extend(array('i', [0]) * b)
+            else:
+                aux[a] = b
+        return (kind, a, b)
+
+    def replay(self, start, arr, aux):
+        """Redo the ops from position start on, yielding each like the sort did"""
+        for op in zip(self.kinds[start:], self.first[start:], self.second[start:]):
+            kind = op[0]
+            if kind == SWAP:
+                _, a, b = op
+                arr[a], arr[b] = arr[b], arr[a]
+            elif kind == WRITE:
+                arr[op[1]] = op[2]
+            elif kind == AUX:
+                _, a, b = op
+                if a < 0:
+                    del aux[:]
+                    aux.extend(array('i', [0]) * b)
+                else:
+                    aux[a] = b
+            yield op
+
+    def revert(self, i, arr, aux):
+        """Undo op i on arr and aux and return the op that shows the state before it
+
+        Returns None for a counter reset, whose counters only a keyframe
+        has; seek() to position i instead.
+        """
+        kind, a, b, undo = self.kinds[i], self.first[i], self.second[i], self.undo[i]
+        if kind == SWAP:
+            arr[a], arr[b] = arr[b], arr[a]
+        elif kind == WRITE:
+            arr[a] = undo
+            return (WRITE, a, undo)
+        elif kind == AUX:
+            if a < 0:
+                return None
+            aux[a] = undo
+            return (AUX, a, undo)
+        elif kind == PIVOT:
+            return (PIVOT, undo, -1)
+        elif kind == RANGE:
+            if undo < 0:
+                return (RANGE, 0, len(arr) - 1)
+            return (RANGE, self.first[undo], self.second[undo])
+        return (kind, a, b)
+
+    def seek(self, position, arr, aux, counts):
+        """Put arr, aux and counts in their state after the first `position` ops
+
+        Returns the pivot and the (low, high) of the last RANGE op at that
+        point, or None when there was none.
+        """
+        keyframe = self.keyframes[bisect_right(self.positions, position) - 1]
+        arr[:] = keyframe.values if isinstance(arr, array) else keyframe.values.tolist()
+        aux[:] = keyframe.aux
+        counts[:] = keyframe.counts
+        pivot, last_range = keyframe.pivot, keyframe.last_range
+        for i in range(keyframe.position, position):
+            kind, a, b = self.apply(i, arr, aux)
+            counts[kind] += 1
+            if kind == PIVOT:
+                pivot = a
+            elif kind == RANGE:
+                last_range = i
+        active = (self.first[last_range], self.second[last_range]) if last_range >= 0 else None
+        return pivot, active
+
+    def save(self, path):
+        """Write the input and the ops to a file"""
+        header = {"algorithm": self.algorithm, "ascending": self.ascending, "options": self.options,
+                  "n": len(self.initial), "ops": len(self.kinds), "itemsize": self.initial.itemsize}
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(json.dumps(header).encode() + b"\n")
+            for column in (self.initial, self.kinds, self.first, self.second):
+                column.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a recording written by save()"""
+        with open(path, "rb") as f:
+            if f.readline() != MAGIC:
+                raise ValueError(f"{path} is not a sort recording")
+            header = json.loads(f.readline())
+            if header["itemsize"] != array('i').itemsize:
+                raise ValueError(f"{path} was saved with {header['itemsize']}-byte ints")
+            initial, kinds, first, second = array('i'), array('b'), array('i'), array('i')
+            initial.fromfile(f, header["n"])
+            for column in (kinds, first, second):
+                column.fromfile(f, header["ops"])
+
+        recording = cls(initial, header["algorithm"], header["ascending"], header["options"])
+        for op in zip(kinds, first, second):
+            recording.record(op)
+        return recording
@@ -0,0 +1,95 @@
+"""Measure the external merge sort of the sorting visualizer on a real file
+
+Sorts a file of native ints (array('i') items) with a fixed memory budget and
+reports the wall time, runs, passes, bytes read and written and the I/O
+throughput, then checks the output is sorted. Without --input, a seeded file
+of --size values of the chosen distribution is generated first.
+
+    python benchmarks/external_sort.py
+    python benchmarks/external_sort.py --size 50000000 --memory 1000000 --fan-in 16
+    python benchmarks/external_sort.py --input data.bin --output sorted.bin --memory 4000000
+
+Run files go to a temporary directory next to the output, so point --output
+(or --scratch) at the disk to be measured.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SORT_DIR = os.path.join(ROOT, "Sorting_Algorithm_Visualizer")
+if SORT_DIR not in sys.path:
+    sys.path.insert(0, SORT_DIR)
+
+SIZE = 4_000_000
+MEMORY = 250_000
+MAX_VALUE = 1_000_000
+SEED = 1234
+CHECK_BLOCK = 1 << 20  # Items checked at a time when verifying the output
+
+
+def is_sorted(path, ascending):
+    """Whether the ints in a file are in order, reading it a block at a time"""
+    previous = None
+    with open(path, "rb") as f:
+        while True:
+            block = array("i")
+            block.frombytes(f.read(CHECK_BLOCK * block.itemsize))
+            if not block:
+                return True
+            values = block.tolist()
+            if previous is not None:
+                values.insert(0, previous)
+            if values != sorted(values, reverse=not ascending):
+                return False
+            previous = values[-1]
+
+
+def main(argv=None):
+    from datasets import DISTRIBUTIONS, generate_array
+    from external import FAN_INS, ITEM_SIZE, sort_file
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", metavar="FILE", help="file of native ints to sort (default: generate one)")
+    parser.add_argument("--output", metavar="FILE", help="where to write the sorted file (default: a temporary file)")
+    parser.add_argument("--scratch", metavar="DIR", help="directory for the run files (default: next to the output)")
+    parser.add_argument("--size", type=int, default=SIZE, help="values to generate without --input")
+    parser.add_argument("--distribution", default="Random", choices=DISTRIBUTIONS, help="distribution to generate")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the generated values")
+    parser.add_argument("--memory", type=int, default=MEMORY, help="values held in memory at once")
+    parser.add_argument("--fan-in", type=int, default=FAN_INS[0], help="runs merged at a time")
+    parser.add_argument("--descending", action="store_true", help="sort largest first")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp:
+        source = args.input
+        if source is None:
+            source = os.path.join(temp, "input.bin")
+            with open(source, "wb") as f:
+                f.write(generate_array(args.distribution, args.size, 0, MAX_VALUE, args.seed))
+        target = args.output or os.path.join(temp, "output.bin")
+        scratch = args.scratch or os.path.dirname(os.path.abspath(target))
+        n = os.path.getsize(source) // ITEM_SIZE
+
+        stats = {}
+        started = time.perf_counter()
+        for _ in sort_file(source, target, args.memory, args.fan_in, not args.descending,
+                           directory=scratch, stats=stats):
+            pass
+        wall = time.perf_counter() - started
+
+        moved = stats["bytes_read"] + stats["bytes_written"]
+        print(f"{n:,} values ({n * ITEM_SIZE / 2 ** 20:.1f} MB), memory {args.memory:,} values, fan-in {args.fan_in}")
+        print(f"{stats['runs']} runs, {stats['passes']} passes in {wall:.2f} s")
+        print(f"read {stats['bytes_read'] / 2 ** 20:.1f} MB, wrote {stats['bytes_written'] / 2 ** 20:.1f} MB, "
+              f"{moved / 2 ** 20 / wall:.1f} MB/s")
+        ok = is_sorted(target, not args.descending)
+        print("output sorted" if ok else "OUTPUT NOT SORTED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+"""Render and search benchmarks for both visualizers
+
+Runs headless under SDL's dummy video driver and times the hot paths: frame
+rendering at several grid/array sizes, Spot.update_neighbors, each search
+algorithm, maze generation and each sorting algorithm run headless (the
+parallel sorts on one worker and on every core). Every metric is "seconds per
+call" (lower is better), the best of --rounds runs of the suite, each in a
+fresh interpreter, and is compared against benchmarks/baselines.json. Metrics
+count the CPU time of the benchmark process, so other processes busy on the
+machine do not skew them, except for the ones in LOOSE_METRICS, whose work
+happens in worker processes or waits on files: those count wall time and are
+gated by the looser --loose-threshold. A metric only counts as a regression if
+it is slower by more than NOISE_FLOOR too, and stays too slow through
+--confirm more rounds of its half of the suite. --update records the slowest
+of the rounds instead of the best, a time the machine meets on every run.
+
+    python benchmarks/run_benchmarks.py             # compare, exit 1 on regression
+    python benchmarks/run_benchmarks.py --update    # record new baselines
+    python benchmarks/run_benchmarks.py --threshold 0.5 --only path.
+
+Baselines are machine specific; re-record them with --update when moving
+to a different machine.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATH_DIR = os.path.join(ROOT, "Path_Visualizer_Program")
+SORT_DIR = os.path.join(ROOT, "Sorting_Algorithm_Visualizer")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+GRID_ROWS = (25, 50, 75)
+ARRAY_SIZES = (50, 150, 300)
+HEADLESS_SIZE = 500
+PARALLEL_SIZE = 100_000
+SEARCH_ROWS = 75
+SEED = 1234
+ROUNDS = 3
+CONFIRM_ROUNDS = 2
+FAST_CALL = 0.01  # Seconds; metrics with faster calls are timed more (see measure())
+MIN_REPEAT = 7
+MAX_REPEAT = 50
+MIN_REPEAT_TIME = 0.02  # Seconds each repeat of a fast metric without a setup lasts, at least
+MIN_TOTAL_TIME = 0.2  # Seconds the repeats of a fast metric with a setup add up to, at least
+NOISE_FLOOR = 5e-6  # Seconds per call a metric must slow down by, whatever its threshold, to regress
+
+# Metrics that mostly time starting worker processes, passing messages between
+# them or temporary files, which vary far more between runs than computation
+# does. They are gated by --loose-threshold instead of --threshold.
+LOOSE_METRICS = ("sort.headless.parallel_", "sort.parallel.", "sort.headless.external_merge_sort.")
+
+
+def timer_for(name):
+    """Wall time for the metrics in LOOSE_METRICS, CPU time of this process for the rest"""
+    return time.perf_counter if name.startswith(LOOSE_METRICS) else time.process_time
+
+
+def measure(fn, setup=None, repeat=7, number=1, timer=time.process_time):
+    """Best-of-`repeat` seconds per call of fn by timer; setup runs untimed before each repeat
+
+    An untimed call first warms up caches and lazy imports, and tells how long
+    a call takes. Calls under FAST_CALL are timed more: at least MIN_REPEAT
+    repeats, and without a setup each repeat makes enough calls to last
+    MIN_REPEAT_TIME; with one, there are more repeats, up to MAX_REPEAT,
+    until they add up to MIN_TOTAL_TIME. The garbage collector is off while
+    timing, as in timeit.
+    """
+    if setup is not None:
+        setup()
+    start = timer()
+    fn()
+    once = max(timer() - start, 1e-9)
+    if once < FAST_CALL:
+        repeat = max(repeat, MIN_REPEAT)
+        if setup is None:
+            number = max(number, math.ceil(MIN_REPEAT_TIME / once))
+        else:
+            repeat = max(repeat, min(MAX_REPEAT, math.ceil(MIN_TOTAL_TIME / once)))
+
+    best = float("inf")
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = timer()
+            for _ in range(number):
+                fn()
+            best = min(best, (timer() - start) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+
+def load_module(name, path):
+    """Import a script by file path with its own directory on sys.path"""
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_visualizer(improved, rows):
+    """A PathfindingVisualizer with a `rows` x `rows` grid and no animation delays"""
+    vis = improved.PathfindingVisualizer(improved.WIN, improved.WIDTH)
+    vis.rows = rows
+    vis.visualization_speed = 0
+    vis.maze_delay = 0
+    vis.make_grid()
+    return vis
+
+
+def scatter_barriers(vis, density=0.3):
+    """Seeded random walls with the two corners kept open as start and end"""
+    rng = random.Random(SEED)
+    for row in vis.grid:
+        for spot in row:
+            if rng.random() < density:
+                spot.make_barrier()
+    vis.start = vis.grid[0][0]
+    vis.end = vis.grid[vis.rows - 1][vis.rows - 1]
+    vis.start.make_start()
+    vis.end.make_end()
+
+
+def bench_path(results):
+    improved = load_module("improved", os.path.join(PATH_DIR, "Improved.py"))
+
+    for rows in GRID_ROWS:
+        vis = make_visualizer(improved, rows)
+        scatter_barriers(vis)
+        results[f"path.draw.rows{rows}"] = measure(vis.draw, number=5)
+        results[f"path.update_neighbors.rows{rows}"] = measure(vis.update_neighbors, number=5)
+
+    vis = make_visualizer(improved, SEARCH_ROWS)
+    scatter_barriers(vis)
+    draw = vis.draw
+    vis.draw = lambda: None  # Time the search itself, not the per-step redraw
+
+    def reset_search():
+        for row in vis.grid:
+            for spot in row:
+                if spot != vis.start and spot != vis.end and not spot.is_barrier():
+                    spot.reset()
+        vis.update_neighbors()
+
+    for name, search in (("astar", vis.astar), ("dijkstra", vis.dijkstra), ("bfs", vis.bfs), ("dfs", vis.dfs)):
+        results[f"path.search.{name}.rows{SEARCH_ROWS}"] = measure(search, setup=reset_search, repeat=5)
+
+    def seeded_maze():
+        random.seed(SEED)
+        vis.generate_maze()
+
+    results[f"path.generate_maze.rows{SEARCH_ROWS}"] = measure(seeded_maze, repeat=5)
+    vis.draw = draw
+
+    # A fast drag of a 3x3 brush across the grid, a few cells per mouse event, applied and drawn as one batch
+    from strokes import Stroke
+
+    def paint_stroke():
+        stroke = Stroke("Brush", 3, vis.rows, (0, 0))
+        vis.queue_edits(stroke.begin(), True)
+        for i in range(7, vis.rows, 7):
+            vis.queue_edits(stroke.move((i, i // 2)), True)
+        vis.draw_spots(vis.apply_edits())
+
+    results[f"path.paint_stroke.rows{SEARCH_ROWS}"] = measure(paint_stroke, setup=vis.clear_grid, repeat=5)
+
+
+def bench_sort(results):
+    sorting = load_module("sorting_visualizer", os.path.join(SORT_DIR, "1.py"))
+    from operations import Op, SWAP
+
+    random.seed(SEED)
+    draw_info = sorting.DrawInformation(1200, 760, sorting.generate_starting_list(ARRAY_SIZES[0], 0, 100))
+    for n in ARRAY_SIZES:
+        draw_info.set_list(sorting.generate_starting_list(n, 0, 100))
+        highlight = {0: draw_info.HIGHLIGHT1, 1: draw_info.HIGHLIGHT2}
+        results[f"sort.draw_list.n{n}"] = measure(lambda: sorting.draw_list(draw_info, highlight, True), number=10)
+        results[f"sort.draw.n{n}"] = measure(lambda: sorting.draw(draw_info, "Bubble Sort", True, 1.0), number=5)
+
+        # One animated step: a swap redrawn through the dirty-bar renderer
+        renderer = sorting.OpRenderer(draw_info)
+        swap = Op(SWAP, n // 2, n // 2 + 1)
+
+        def step():
+            renderer.record(swap)
+            renderer.draw()
+
+        results[f"sort.render_step.n{n}"] = measure(step, number=20)
+
+    # Large-array mode: one envelope frame for a million elements
+    from array import array
+    draw_info.set_list(array("i", sorting.generate_starting_list(1_000_000, 0, sorting.LARGE_MAX_VAL)))
+    results["sort.draw_envelope.n1000000"] = measure(lambda: sorting.draw_envelope(draw_info), number=5)
+
+    # The algorithms alone, drained headless through the operation stream
+    from operations import run_headless
+
+    def sort_copy(algorithm, values, **options):
+        random.seed(SEED)  # Random pivots and samples are the same on every call
+        run_headless(lambda arr, ascending: algorithm(arr, ascending, **options), values)
+
+    random.seed(SEED)
+    data = sorting.generate_starting_list(HEADLESS_SIZE, 0, 100)
+    for name, algorithm in sorting.ALGORITHMS.items():
+        key = name.lower().replace(" ", "_")
+        results[f"sort.headless.{key}.n{HEADLESS_SIZE}"] = measure(
+            lambda: sort_copy(algorithm, list(data)), repeat=3, timer=timer_for(f"sort.headless.{key}."))
+
+    # Algorithms with options, once more with the last value of every option
+    for name, choices in sorting.OPTIONS.items():
+        key = name.lower().replace(" ", "_")
+        options = {option: values[-1] for option, values in choices.items()}
+        algorithm = sorting.ALGORITHMS[name]
+        results[f"sort.headless.{key}.options.n{HEADLESS_SIZE}"] = measure(
+            lambda: sort_copy(algorithm, list(data), **options), repeat=3, timer=timer_for(f"sort.headless.{key}."))
+
+    # Recordings of the same runs, replayed and seeked through as the visualizer's playback does
+    from recording import Recording
+    for name in ("Quick Sort", "Merge Sort", "Bubble Sort"):
+        key = name.lower().replace(" ", "_")
+        recording = Recording(data, name)
+        for op in sorting.ALGORITHMS[name](list(data)):
+            recording.record(op)
+        results[f"sort.replay.{key}.n{HEADLESS_SIZE}"] = measure(
+            lambda: run_headless(lambda arr, ascending: recording.replay(0, arr, array("i")), list(data)), repeat=3)
+        middle = len(recording) // 2
+        results[f"sort.seek.{key}.n{HEADLESS_SIZE}"] = measure(
+            lambda: recording.seek(middle, list(data), array("i"), [0] * len(recording.counts)), number=10)
+
+    # Parallel sorts on one worker and on every core; the ratio is their real speedup
+    import parallel
+    big = array("i", sorting.generate_starting_list(PARALLEL_SIZE, 0, sorting.LARGE_MAX_VAL))
+    for name in sorted(sorting.PARALLEL):
+        key = name.lower().replace(" ", "_")
+        algorithm = sorting.ALGORITHMS[name]
+        for workers in sorted({1, parallel.CORES}):
+            results[f"sort.parallel.{key}.w{workers}.n{PARALLEL_SIZE}"] = measure(
+                lambda: sort_copy(algorithm, array("i", big), workers=workers), repeat=3, timer=time.perf_counter)
+
+
+def run_round(only):
+    """Run the suite's metrics starting with `only` once in this process"""
+    run = {}
+    if "path.".startswith(only) or only.startswith("path."):
+        bench_path(run)
+    if "sort.".startswith(only) or only.startswith("sort."):
+        bench_sort(run)
+    return {name: value for name, value in run.items() if name.startswith(only)}
+
+
+def run_rounds(results, rounds, only, keep=min):
+    """Run the suite's metrics starting with `only` `rounds` times, keeping each metric's best in results
+
+    Every round gets a fresh interpreter: how fast a metric runs depends on where the
+    process happened to lay out its objects, so rounds in one process share its luck.
+    keep=max keeps each metric's slowest round instead.
+    """
+    for _ in range(rounds):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "round.json")
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--only", only, "--round-output", output],
+                           check=True, stdout=subprocess.DEVNULL)
+            with open(output, "r", encoding="utf-8") as f:
+                run = json.load(f)
+        for name, value in run.items():
+            results[name] = keep(value, results.get(name, value))
+
+
+def regressed(name, value, baselines, threshold, loose_threshold):
+    """Whether a metric is slower than its baseline by more than its threshold
+
+    Metrics in LOOSE_METRICS may slow down by loose_threshold, the rest by
+    threshold. A few microseconds either way is the spread between runs of the
+    fastest metrics, not a slowdown, so nothing within NOISE_FLOOR counts.
+    """
+    base = baselines.get(name)
+    if not base or value - base <= NOISE_FLOOR:
+        return False
+    return value / base - 1 > (loose_threshold if name.startswith(LOOSE_METRICS) else threshold)
+
+
+def compare(results, baselines, threshold, loose_threshold):
+    """Print a report and return the names of metrics that regressed"""
+    regressions = []
+    width = max(len(name) for name in results)
+    for name in sorted(results):
+        value = results[name]
+        base = baselines.get(name)
+        if base is None:
+            print(f"{name:<{width}}  {value * 1000:10.3f} ms  (new)")
+            continue
+        change = value / base - 1 if base else 0.0
+        flag = ""
+        if regressed(name, value, baselines, threshold, loose_threshold):
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<{width}}  {value * 1000:10.3f} ms  baseline {base * 1000:10.3f} ms  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="overwrite the baselines with this run")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--loose-threshold", type=float, default=1.0,
+                        help="allowed slowdown of the process- and file-bound metrics in LOOSE_METRICS (default 1.0)")
+    parser.add_argument("--only", default="", help="only run metrics whose name starts with this prefix")
+    parser.add_argument("--rounds", type=int, default=ROUNDS,
+                        help=f"runs of the whole suite; each metric keeps its best (default {ROUNDS})")
+    parser.add_argument("--confirm", type=int, default=CONFIRM_ROUNDS,
+                        help=f"extra rounds a regression must last through to count (default {CONFIRM_ROUNDS})")
+    parser.add_argument("--baselines", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--round-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.round_output:
+        with open(args.round_output, "w", encoding="utf-8") as f:
+            json.dump(run_round(args.only), f)
+        return 0
+
+    try:
+        with open(args.baselines, "r", encoding="utf-8") as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+
+    # The best of several rounds, so a slow spell of the machine or an unlucky process does not skew a whole run.
+    # New baselines take the slowest round's best instead: a time the machine meets every run, not its luckiest one
+    results = {}
+    run_rounds(results, max(1, args.rounds), args.only, max if args.update else min)
+
+    # A slowdown has to last through more rounds of its half of the suite to count:
+    # noise rarely does, while a real regression cannot get faster
+    for _ in range(0 if args.update else args.confirm):
+        slow = [name for name, value in results.items()
+                if regressed(name, value, baselines, args.threshold, args.loose_threshold)]
+        if not slow:
+            break
+        for group in sorted({name.split(".")[0] + "." for name in slow}):
+            run_rounds(results, 1, max(group, args.only, key=len))
+
+    regressions = compare(results, baselines, args.threshold, args.loose_threshold)
+
+    if args.update:
+        baselines.update(results)
+        with open(args.baselines, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {args.baselines}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}"
+              f" ({args.loose_threshold:.0%} for the process- and file-bound ones)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
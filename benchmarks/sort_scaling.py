@@ -0,0 +1,196 @@
+"""Headless comparison of the sorting algorithms across distributions and sizes
+
+Runs every registered algorithm of the sorting visualizer through its
+operation stream, without pygame, on every distribution at sizes from 10 to
+1,000,000, repeating each run with the next seed. Each series (one algorithm
+on one distribution) runs in its own worker process. Every run records its
+wall time and operation counts, and each series gets an empirical exponent k
+fitted by least squares on log-log axes, so that time ~ c * n^k: about 1 for
+linear sorts, 1.1 to 1.2 for n log n ones over these sizes and 2 for
+quadratic ones.
+
+    python benchmarks/sort_scaling.py
+    python benchmarks/sort_scaling.py --sizes 10 1000 100000 --repeats 5 --jobs 4
+    python benchmarks/sort_scaling.py --algorithms "Quick Sort" "Heap Sort" --csv runs.csv --json runs.json
+
+The quadratic sorts cannot reach a million elements: a series stops before
+the first size predicted, from its last two sizes, to take longer than
+--budget seconds a run. Parallel series compete for the CPU and memory
+bandwidth, so use --jobs 1 for the steadiest timings.
+
+Inputs of 10,000 values or more are generated once per seed and cached in
+benchmarks/corpus as .npy files, which later runs and the other series'
+processes memory-map instead of generating again.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SORT_DIR = os.path.join(ROOT, "Sorting_Algorithm_Visualizer")
+if SORT_DIR not in sys.path:
+    sys.path.insert(0, SORT_DIR)
+
+SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+MAX_VALUE = 1_000_000
+SEED = 1234
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+CORPUS_MIN_SIZE = 10_000  # Smaller inputs are quicker to generate than to load
+FIT_MIN_SIZE = 100  # Smaller sizes are dominated by fixed costs and left out of the fit
+COUNTS = ("comparisons", "swaps", "writes", "reads", "aux_writes")
+FIELDS = ("algorithm", "distribution", "size", "seed", "wall") + COUNTS
+
+
+def predict(timed, n):
+    """Seconds a run of size n should take, extrapolated from the (size, seconds) timed so far"""
+    if not timed:
+        return 0.0
+    if len(timed) == 1:
+        exponent = 1.0  # Small sizes are mostly fixed costs; the next size gives the slope
+    else:
+        (n1, t1), (n2, t2) = timed[-2:]
+        exponent = max(1.0, math.log(max(t2, 1e-9) / max(t1, 1e-9)) / math.log(n2 / n1))
+    size, seconds = timed[-1]
+    return seconds * (n / size) ** exponent
+
+
+def run_series(algorithm_name, distribution, sizes, repeats, seed, budget, max_value, corpus):
+    """Time one algorithm on one distribution at growing sizes and return a row per run"""
+    import parallel
+    from algorithms import ALGORITHMS
+    from datasets import generate_list, load_corpus, np
+    from operations import run_headless
+
+    algorithm = ALGORITHMS[algorithm_name]
+    rows = []
+    timed = []
+    try:
+        for n in sizes:
+            if predict(timed, n) > budget:
+                break
+            walls = []
+            for repeat in range(repeats):
+                if corpus and np is not None and n >= CORPUS_MIN_SIZE:
+                    data = load_corpus(corpus, distribution, n, 0, max_value, seed + repeat).tolist()
+                else:
+                    data = generate_list(distribution, n, 0, max_value, seed + repeat)
+                start = time.perf_counter()
+                counter = run_headless(algorithm, data)
+                walls.append(time.perf_counter() - start)
+                counts = counter.as_dict()
+                rows.append({"algorithm": algorithm_name, "distribution": distribution, "size": n,
+                             "seed": seed + repeat, "wall": walls[-1], **{name: counts[name] for name in COUNTS}})
+            timed.append((n, statistics.median(walls)))
+    finally:
+        parallel.shutdown()  # This runs in a worker process, which cannot exit while the sort's workers live
+    return rows
+
+
+def fit_exponent(points):
+    """Least-squares slope of log(y) against log(n) for (n, y) points, or None"""
+    logs = [(math.log(n), math.log(y)) for n, y in points if y > 0]
+    if len({x for x, _ in logs}) < 2:
+        return None
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in logs)
+            / sum((x - mean_x) ** 2 for x, _ in logs))
+
+
+def fit_series(rows):
+    """Exponents of the median wall time and of the total op count for every series"""
+    series = {}
+    for row in rows:
+        series.setdefault((row["algorithm"], row["distribution"]), {}).setdefault(row["size"], []).append(row)
+
+    fits = []
+    for (algorithm, distribution), by_size in series.items():
+        walls, ops = [], []
+        for n, runs in sorted(by_size.items()):
+            if n >= FIT_MIN_SIZE:
+                walls.append((n, statistics.median(run["wall"] for run in runs)))
+                ops.append((n, statistics.median(sum(run[name] for name in COUNTS) for run in runs)))
+        largest = max(by_size)
+        fits.append({"algorithm": algorithm, "distribution": distribution, "max_size": largest,
+                     "wall_at_max": statistics.median(run["wall"] for run in by_size[largest]),
+                     "time_exponent": fit_exponent(walls), "ops_exponent": fit_exponent(ops)})
+    return fits
+
+
+def print_fits(fits):
+    width = max(len("algorithm"), *(len(fit["algorithm"]) for fit in fits))
+    dist_width = max(len("distribution"), *(len(fit["distribution"]) for fit in fits))
+    print(f"{'algorithm':<{width}}  {'distribution':<{dist_width}}  {'max n':>9}  {'wall':>10}  "
+          f"{'time k':>6}  {'ops k':>6}")
+    for fit in fits:
+        time_k = "-" if fit["time_exponent"] is None else f"{fit['time_exponent']:.2f}"
+        ops_k = "-" if fit["ops_exponent"] is None else f"{fit['ops_exponent']:.2f}"
+        print(f"{fit['algorithm']:<{width}}  {fit['distribution']:<{dist_width}}  {fit['max_size']:>9,}  "
+              f"{fit['wall_at_max'] * 1000:>8.1f}ms  {time_k:>6}  {ops_k:>6}")
+
+
+def main(argv=None):
+    from algorithms import ALGORITHMS
+    from datasets import DISTRIBUTIONS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS),
+                        metavar="NAME", help="algorithms to run (default: all)")
+    parser.add_argument("--distributions", nargs="+", default=list(DISTRIBUTIONS), choices=DISTRIBUTIONS,
+                        metavar="NAME", help="distributions to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES), help="array sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per size, seeded seed, seed + 1, ...")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the first repeat")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="series run at once")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="skip sizes predicted to take longer than this many seconds a run")
+    parser.add_argument("--max-value", type=int, default=MAX_VALUE, help="values range over 0..MAX_VALUE")
+    parser.add_argument("--corpus", metavar="DIR", default=CORPUS_DIR,
+                        help="cache inputs of 10,000 values or more here as .npy files, or '' not to "
+                             "(default: benchmarks/corpus)")
+    parser.add_argument("--csv", metavar="FILE", help="write every run as CSV")
+    parser.add_argument("--json", metavar="FILE", help="write every run and the fits as JSON")
+    args = parser.parse_args(argv)
+
+    sizes = sorted(set(args.sizes))
+    series = [(algorithm, distribution) for algorithm in args.algorithms for distribution in args.distributions]
+    rows = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max(1, args.jobs)) as executor:
+        futures = {executor.submit(run_series, algorithm, distribution, sizes, args.repeats, args.seed,
+                                   args.budget, args.max_value, args.corpus): (algorithm, distribution)
+                   for algorithm, distribution in series}
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            rows += result
+            algorithm, distribution = futures[future]
+            largest = max((row["size"] for row in result), default=0)
+            print(f"[{done}/{len(series)}] {algorithm} on {distribution}: up to n={largest:,}", file=sys.stderr)
+    print(f"{len(rows)} runs in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+    order = {name: i for i, name in enumerate(args.algorithms)}
+    dist_order = {name: i for i, name in enumerate(args.distributions)}
+    rows.sort(key=lambda row: (order[row["algorithm"]], dist_order[row["distribution"]], row["size"], row["seed"]))
+    fits = fit_series(rows)
+    print_fits(fits)
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"runs": rows, "fits": fits}, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Font loading that skips the system font scan on every start
+
+pygame.font.SysFont() asks fontconfig for the whole font list the first time
+it is called, which dominates start-up on Linux. The resolved file for each
+font name is cached on disk so later runs go straight to pygame.font.Font(),
+and names that cannot be found fall back to pygame's bundled default font.
+"""
+import json
+import os
+
+import pygame
+
+# Delete this file (or point the variable elsewhere) to force a fresh scan
+CACHE_FILE = os.environ.get(
+    "VISUALIZER_FONT_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pygame_visualizers", "fonts.json"),
+)
+
+_resolved = None
+
+
+def _load_cache():
+    """Read the name -> path cache, ignoring a missing or corrupt file"""
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    """Write the cache, silently giving up if the location is not writable"""
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
+
+
+def resolve_font(name):
+    """Return the font file for a system font name, or None for the default font"""
+    global _resolved
+    if _resolved is None:
+        _resolved = _load_cache()
+
+    if name in _resolved:
+        path = _resolved[name]
+        if path is None or os.path.exists(path):
+            return path
+
+    # Cache miss (or the file went away): pay for the fontconfig scan once
+    path = pygame.font.match_font(name)
+    _resolved[name] = path
+    _save_cache(_resolved)
+    return path
+
+
+class LazyFont:
+    """Drop-in stand-in for a pygame Font that is only loaded on first use"""
+
+    def __init__(self, name, size):
+        """Remember the font name and size without touching the font system"""
+        self.name = name
+        self.size_px = size
+        self._font = None
+
+    def load(self):
+        """Resolve and load the underlying pygame Font"""
+        if self._font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._font = pygame.font.Font(resolve_font(self.name), self.size_px)
+        return self._font
+
+    def render(self, *args, **kwargs):
+        """Render text, loading the font first if needed"""
+        return self.load().render(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        # Anything else (size, get_linesize, ...) goes to the real font
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
@@ -0,0 +1,158 @@
+"""Named hook points and a Chrome trace-event listener
+
+A Hooks object exposes one attribute per hook name. With no listener attached
+every attribute is None, so an instrumented loop pays a single local test:
+
+    on_pop = hooks.on_pop
+    ...
+    if on_pop:
+        on_pop(spot)
+
+Attaching listeners rebinds the attributes to the listeners' methods (or to a
+small fan-out when several listen to the same hook). Hot loops read the hook
+into a local once when they start, so attach before starting a run.
+
+An IdleMeter measures how much CPU a main loop burns while it waits for input.
+"""
+import json
+import time
+
+
+class Hooks:
+    """A set of named hook slots that listeners can attach to"""
+
+    def __init__(self, *names):
+        """Create an empty slot for every hook name"""
+        self.names = names
+        self.listeners = []
+        for name in names:
+            setattr(self, name, None)
+
+    def attach(self, listener):
+        """Route every hook the listener implements to it"""
+        self.listeners.append(listener)
+        self._rebind()
+        return listener
+
+    def detach(self, listener):
+        """Stop routing hooks to a listener"""
+        self.listeners.remove(listener)
+        self._rebind()
+
+    def _rebind(self):
+        for name in self.names:
+            callbacks = [getattr(l, name) for l in self.listeners if callable(getattr(l, name, None))]
+            if not callbacks:
+                setattr(self, name, None)
+            elif len(callbacks) == 1:
+                setattr(self, name, callbacks[0])
+            else:
+                setattr(self, name, _fan_out(callbacks))
+
+
+def _fan_out(callbacks):
+    def call_all(*args):
+        for callback in callbacks:
+            callback(*args)
+    return call_all
+
+
+def _plain(value):
+    """Make a hook argument JSON friendly"""
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    if hasattr(value, "get_pos"):
+        return list(value.get_pos())
+    if isinstance(value, (tuple, list)):
+        return [_plain(v) for v in value]
+    return repr(value)
+
+
+class ChromeTraceListener:
+    """Records hook calls as Chrome trace events (chrome://tracing, Perfetto)
+
+    Each hook call becomes an instant event and bumps a running count; the
+    counts are written as a counter series every `counter_every` calls. For
+    very long runs set `instants=False` to keep only the counters.
+    """
+
+    def __init__(self, hook_names, process_name="visualizer", instants=True, counter_every=1):
+        """Listen to the given hook names"""
+        self.instants = instants
+        self.counter_every = max(1, counter_every)
+        self.counts = {name: 0 for name in hook_names}
+        self.calls = 0
+        self.events = [{"name": "process_name", "ph": "M", "pid": 1, "tid": 1,
+                        "args": {"name": process_name}}]
+        self._t0 = time.perf_counter()
+        for name in hook_names:
+            setattr(self, name, self._recorder(name))
+
+    def _now(self):
+        return (time.perf_counter() - self._t0) * 1e6
+
+    def _recorder(self, name):
+        events = self.events
+        counts = self.counts
+
+        def record(*args):
+            ts = self._now()
+            counts[name] += 1
+            self.calls += 1
+            if self.instants:
+                events.append({"name": name, "ph": "i", "s": "t", "ts": ts, "pid": 1, "tid": 1,
+                               "args": {"args": [_plain(a) for a in args]}})
+            if self.calls % self.counter_every == 0:
+                events.append({"name": "counts", "ph": "C", "ts": ts, "pid": 1, "tid": 1,
+                               "args": dict(counts)})
+        return record
+
+    def span(self, name):
+        """Context manager that records a complete ("X") event around a block"""
+        listener = self
+
+        class _Span:
+            def __enter__(self):
+                self.start = listener._now()
+                return self
+
+            def __exit__(self, *exc):
+                listener.events.append({"name": name, "ph": "X", "ts": self.start,
+                                        "dur": listener._now() - self.start, "pid": 1, "tid": 1})
+                return False
+
+        return _Span()
+
+    def save(self, path):
+        """Write the trace as Chrome trace-event JSON"""
+        events = self.events + [{"name": "counts", "ph": "C", "ts": self._now(), "pid": 1, "tid": 1,
+                                 "args": dict(self.counts)}]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class IdleMeter:
+    """CPU time a main loop spends waiting for input, as a share of the time waited
+
+    Use it as a context manager around each wait. CPU time is the whole
+    process's, so background threads running meanwhile count too.
+    """
+
+    def __init__(self):
+        """Start with nothing measured"""
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def __enter__(self):
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall += time.perf_counter() - self._wall
+        self.cpu += time.process_time() - self._cpu
+        return False
+
+    def report(self):
+        """One line with the time spent idle and the CPU used meanwhile"""
+        share = self.cpu / self.wall if self.wall else 0.0
+        return f"Idle for {self.wall:.1f} s at {share:.1%} CPU"